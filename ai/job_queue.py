@@ -0,0 +1,250 @@
+"""
+In-process queue running workflow projects as background jobs
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Any, AsyncIterator, List, Optional
+
+from core.timeline.tracker import ProjectTimeline
+
+logger = logging.getLogger(__name__)
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+FINISHED_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+class QueueFull(Exception):
+    '''Raised when a job is submitted while the queue is at capacity'''
+    pass
+
+def timeline_snapshot(timeline: ProjectTimeline) -> Dict[str, Any]:
+    '''Progress of a timeline without the (possibly large) phase results'''
+    return {
+        "project_id": timeline.project_id,
+        "start_time": timeline.start_time,
+        "phases": {
+            name: {key: value for key, value in phase.items() if key != "result"}
+            for name, phase in timeline.phases.items()
+        }
+    }
+
+class Job:
+    '''A submitted project and everything known about its execution'''
+
+    def __init__(self, project_spec: Dict[str, Any], timeline: ProjectTimeline, job_id: str):
+        self.id = job_id
+        self.spec = project_spec
+        self.timeline = timeline
+        self.status = JobStatus.QUEUED
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        # Engine events in order; followers of the job replay them
+        self.events: List[Dict[str, Any]] = []
+        self._changed = asyncio.Condition()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    async def _publish(self, event: Optional[Dict[str, Any]] = None):
+        '''Append an event (if any) and wake everyone following the job'''
+        async with self._changed:
+            if event is not None:
+                self.events.append(event)
+            self._changed.notify_all()
+
+    async def follow(self, since: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        '''
+        Yield the job's events from index ``since``, then new ones as they
+        happen, until the job finishes
+
+        :param since: Number of events already seen
+        :return: Async iterator of engine events
+        '''
+        index = since
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.events) > index or self.finished)
+                pending = self.events[index:]
+                finished = self.finished
+            for event in pending:
+                yield event
+            index += len(pending)
+            if finished and index >= len(self.events):
+                return
+
+    def snapshot(self) -> Dict[str, Any]:
+        '''Status and phase progress of the job'''
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "timeline": timeline_snapshot(self.timeline)
+        }
+
+class JobQueue:
+    '''
+    Runs submitted projects on a bounded pool of worker tasks
+
+    Submission only enqueues the project, so callers get a job id back
+    immediately and follow progress through the job's timeline and events.
+    '''
+
+    def __init__(
+        self,
+        engine: Any,
+        workers: int = 4,
+        max_pending: int = 1000,
+        max_finished: int = 1000
+    ):
+        '''
+        Initialize the queue
+
+        :param engine: DetailedAIWorkflowEngine executing the projects
+        :param workers: Projects executed at once
+        :param max_pending: Queued projects before submissions are rejected
+        :param max_finished: Finished jobs kept for result retrieval
+        '''
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.engine = engine
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._finished: deque = deque()
+        self._stats = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "cancelled": 0}
+
+    async def start(self):
+        '''Start the worker tasks'''
+        if self._workers:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        '''Cancel running jobs and stop the workers'''
+        for job in self._jobs.values():
+            if job._task is not None and not job._task.done():
+                job._task.cancel()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, project_spec: Dict[str, Any]) -> Job:
+        '''
+        Enqueue a project
+
+        :param project_spec: Project specification
+        :return: The queued job
+        :raises QueueFull: If max_pending jobs are already waiting
+        '''
+        await self.start()
+        if self._queue.qsize() >= self.max_pending:
+            self._stats["rejected"] += 1
+            raise QueueFull(f"{self._queue.qsize()} jobs already queued")
+
+        job_id = uuid.uuid4().hex
+        # The job id doubles as the run id, so checkpoints can resume the job
+        spec = {**project_spec, "run_id": project_spec.get("run_id") or job_id}
+        timeline = ProjectTimeline(
+            project_id=spec.get("project_id") or job_id,
+            writer=getattr(self.engine, "timeline_writer", None)
+        )
+        job = Job(spec, timeline, job_id)
+        self._jobs[job_id] = job
+        self._queue.put_nowait(job)
+        self._stats["submitted"] += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        '''Get a job by id, None if unknown or already evicted'''
+        return self._jobs.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        '''
+        Cancel a queued or running job
+
+        :param job_id: Job ID
+        :return: The job, None if unknown
+        '''
+        job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        if job._task is not None:
+            job._task.cancel()
+            await asyncio.gather(job._task, return_exceptions=True)
+        else:
+            await self._finish(job, JobStatus.CANCELLED)
+        return job
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.finished:
+                    continue
+                job._task = asyncio.create_task(self._run(job))
+                # Wait without propagating the job's own cancellation into the worker
+                await asyncio.wait({job._task})
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.now()
+        await job._publish()
+        try:
+            async for event in self.engine.execute_project_stream(job.spec, timeline=job.timeline):
+                if event["event"] == "project_completed":
+                    job.result = event["result"]
+                elif event["event"] == "project_failed":
+                    job.error = event["error"]
+                await job._publish(event)
+        except asyncio.CancelledError:
+            await self._finish(job, JobStatus.CANCELLED)
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.id} crashed: {e}", exc_info=True)
+            job.error = str(e)
+        await self._finish(job, JobStatus.FAILED if job.error else JobStatus.COMPLETED)
+
+    async def _finish(self, job: Job, status: JobStatus):
+        job.status = status
+        job.finished_at = datetime.now()
+        self._stats[status.value] += 1
+        await job._publish()
+
+        self._finished.append(job.id)
+        while len(self._finished) > self.max_finished:
+            self._jobs.pop(self._finished.popleft(), None)
+
+    def stats(self) -> Dict[str, Any]:
+        '''Return queue depth, running jobs and outcome counts'''
+        running = sum(1 for job in self._jobs.values() if job.status == JobStatus.RUNNING)
+        return {
+            **self._stats,
+            "queued": self._queue.qsize(),
+            "running": running,
+            "workers": self.workers
+        }
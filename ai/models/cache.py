@@ -0,0 +1,220 @@
+"""
+Content-addressed response cache for model invocations
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+def cache_key(
+    model_name: str,
+    parameters: Dict[str, Any],
+    prompt: Any,
+    endpoint: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build a content-addressed cache key
+
+    :param model_name: Provider model name
+    :param parameters: Model parameters affecting the response
+    :param prompt: Prompt sent to the model
+    :param endpoint: Provider and base URL serving the model, so the same
+        model name behind different endpoints does not share entries
+    :return: Hex SHA-256 digest of the canonicalized request
+    """
+    payload = json.dumps(
+        {"model": model_name, "endpoint": endpoint, "parameters": parameters, "prompt": prompt},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    Two-tier response cache: an in-memory LRU in front of an optional
+    SQLite store that survives restarts
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: Optional[float] = 3600.0,
+        path: Optional[str] = None,
+        disk_max_bytes: int = 512 * 1024 * 1024
+    ):
+        """
+        Initialize the cache
+
+        :param max_entries: Maximum entries held in memory
+        :param max_bytes: Maximum total size of values held in memory
+        :param ttl: Seconds an entry stays valid, None for no expiry
+        :param path: SQLite database file for the disk tier, None to disable it
+        :param disk_max_bytes: Maximum total size of values stored on disk
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory: "OrderedDict[str, Tuple[Optional[float], str]]" = OrderedDict()
+        self._memory_bytes = 0
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0
+        }
+
+        self._disk: Optional[sqlite3.Connection] = None
+        self._disk_lock = threading.Lock()
+        if path:
+            self._disk = sqlite3.connect(path, check_same_thread=False)
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "expires_at REAL, last_access REAL NOT NULL)"
+            )
+            self._disk.execute(
+                "CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)"
+            )
+            self._disk.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response
+
+        :param key: Cache key from cache_key()
+        :return: Cached response or None on a miss
+        """
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at is None or expires_at > now:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return value
+            self._remove_from_memory(key)
+
+        if self._disk is not None:
+            found = await asyncio.to_thread(self._disk_get, key, now)
+            if found is not None:
+                expires_at, value = found
+                self._store_in_memory(key, value, expires_at)
+                self._stats["disk_hits"] += 1
+                return value
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: str):
+        """
+        Store a response in both tiers
+
+        :param key: Cache key from cache_key()
+        :param value: Response text
+        """
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        self._store_in_memory(key, value, expires_at)
+        if self._disk is not None:
+            await asyncio.to_thread(self._disk_set, key, value, expires_at)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current memory usage"""
+        hits = self._stats["memory_hits"] + self._stats["disk_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": len(self._memory),
+            "bytes": self._memory_bytes
+        }
+
+    def clear(self):
+        """Remove all entries from both tiers"""
+        self._memory.clear()
+        self._memory_bytes = 0
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.execute("DELETE FROM responses")
+                self._disk.commit()
+
+    def close(self):
+        """Close the disk tier"""
+        if self._disk is not None:
+            with self._disk_lock:
+                self._disk.close()
+            self._disk = None
+
+    def _store_in_memory(self, key: str, value: str, expires_at: Optional[float]):
+        """Insert into the LRU tier, evicting least recently used entries"""
+        self._remove_from_memory(key)
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        self._memory[key] = (expires_at, value)
+        self._memory_bytes += size
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            oldest = next(iter(self._memory))
+            self._remove_from_memory(oldest)
+            self._stats["evictions"] += 1
+
+    def _remove_from_memory(self, key: str):
+        """Drop a key from the LRU tier if present"""
+        entry = self._memory.pop(key, None)
+        if entry is not None:
+            self._memory_bytes -= len(entry[1].encode("utf-8"))
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[Optional[float], str]]:
+        """Read an unexpired entry from SQLite, refreshing its access time"""
+        with self._disk_lock:
+            row = self._disk.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._disk.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._disk.commit()
+                return None
+            self._disk.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._disk.commit()
+            return expires_at, value
+
+    def _disk_set(self, key: str, value: str, expires_at: Optional[float]):
+        """Write an entry to SQLite and enforce expiry and the size budget"""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._disk_lock:
+            self._disk.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, expires_at, now)
+            )
+            self._disk.execute(
+                "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            )
+            total = self._disk.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.disk_max_bytes:
+                rows = self._disk.execute(
+                    "SELECT key, size FROM responses ORDER BY last_access"
+                ).fetchall()
+                evicted = []
+                for old_key, old_size in rows:
+                    if total <= self.disk_max_bytes:
+                        break
+                    evicted.append((old_key,))
+                    total -= old_size
+                self._disk.executemany("DELETE FROM responses WHERE key = ?", evicted)
+                self._stats["evictions"] += len(evicted)
+            self._disk.commit()
@@ -0,0 +1,149 @@
+"""
+Process-wide cache of pooled chat-model clients
+"""
+
+import os
+import threading
+from typing import Dict, Any, Optional, Tuple, Callable, TYPE_CHECKING
+
+from .fake import fake_client
+
+# Provider SDKs are imported inside the client factories, so importing this
+# module (and every phase) does not pay for LangChain, OpenAI or httpx
+if TYPE_CHECKING:
+    import httpx
+
+# Connection pool settings shared by every cached client
+_pool_settings: Dict[str, Any] = {
+    "max_connections": int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+    "max_keepalive_connections": int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+    "keepalive_expiry": float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30")),
+    "timeout": float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+}
+
+_clients: Dict[Tuple, Any] = {}
+_lock = threading.Lock()
+
+def configure_pool(
+    max_connections: Optional[int] = None,
+    max_keepalive_connections: Optional[int] = None,
+    keepalive_expiry: Optional[float] = None,
+    timeout: Optional[float] = None
+):
+    """
+    Configure connection pool limits for clients created afterwards
+
+    :param max_connections: Maximum concurrent connections per client
+    :param max_keepalive_connections: Idle connections kept open for reuse
+    :param keepalive_expiry: Seconds an idle connection is kept alive
+    :param timeout: Default request timeout in seconds
+    """
+    updates = {
+        "max_connections": max_connections,
+        "max_keepalive_connections": max_keepalive_connections,
+        "keepalive_expiry": keepalive_expiry,
+        "timeout": timeout
+    }
+    _pool_settings.update({k: v for k, v in updates.items() if v is not None})
+
+def pool_limits() -> "httpx.Limits":
+    """Build httpx pool limits from the current settings"""
+    import httpx
+
+    return httpx.Limits(
+        max_connections=_pool_settings["max_connections"],
+        max_keepalive_connections=_pool_settings["max_keepalive_connections"],
+        keepalive_expiry=_pool_settings["keepalive_expiry"]
+    )
+
+def pool_timeout() -> float:
+    """Request timeout in seconds from the current settings"""
+    return _pool_settings["timeout"]
+
+def _openai_client(
+    model_name: str,
+    temperature: float,
+    api_key: Optional[str],
+    base_url: Optional[str],
+    **parameters
+) -> Any:
+    """Create an OpenAI chat client backed by pooled HTTP clients"""
+    import httpx
+    from langchain_openai import ChatOpenAI
+
+    timeout = pool_timeout()
+    return ChatOpenAI(
+        model_name=model_name,
+        temperature=temperature,
+        api_key=api_key or os.getenv("OPENAI_API_KEY"),
+        base_url=base_url,
+        http_client=httpx.Client(limits=pool_limits(), timeout=timeout),
+        http_async_client=httpx.AsyncClient(limits=pool_limits(), timeout=timeout),
+        **parameters
+    )
+
+# Client constructors by provider name
+_providers: Dict[str, Callable[..., Any]] = {
+    "openai": _openai_client,
+    # Deterministic offline stand-in, see ai.models.fake
+    "fake": fake_client
+}
+
+def register_provider(provider: str, factory: Callable[..., Any]):
+    """
+    Register a client constructor for a provider
+
+    :param provider: Provider name as used in ModelConfig.provider
+    :param factory: Callable taking (model_name, temperature, api_key, base_url, **parameters)
+    """
+    _providers[provider] = factory
+
+def get_chat_client(
+    model_name: str,
+    temperature: float = 0.7,
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    provider: str = "openai",
+    **parameters
+) -> Any:
+    """
+    Get a shared chat client for a model configuration
+
+    Clients are created once per (provider, model_name, temperature, api_key,
+    base_url, parameters) and reused, so calls share one pooled HTTP
+    connection set instead of paying connection setup on every request.
+
+    :param model_name: Provider model name
+    :param temperature: Sampling temperature
+    :param api_key: API key, defaults to the provider's environment variable
+    :param base_url: Optional API base URL
+    :param provider: Provider name
+    :param parameters: Additional model parameters (e.g. max_tokens)
+    :return: Chat model client
+    :raises ValueError: If the provider is unknown
+    """
+    factory = _providers.get(provider)
+    if factory is None:
+        raise ValueError(f"Unknown model provider: {provider}")
+
+    key = (
+        provider,
+        model_name,
+        temperature,
+        api_key,
+        base_url,
+        tuple(sorted((k, repr(v)) for k, v in parameters.items()))
+    )
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = factory(model_name, temperature, api_key, base_url, **parameters)
+                _clients[key] = client
+    return client
+
+def clear_clients():
+    """Drop all cached clients so the next request creates fresh ones"""
+    with _lock:
+        _clients.clear()
@@ -0,0 +1,162 @@
+"""
+Deterministic fake chat model for tests and offline benchmarks
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+import time
+from typing import Dict, Any, AsyncIterator, Iterator, Optional
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+class FakeProviderError(Exception):
+    """Injected provider failure, classified as retryable (HTTP 503)"""
+    status_code = 503
+
+class FakeMessage:
+    """Minimal stand-in for a chat model message"""
+
+    __slots__ = ("content", "usage_metadata")
+
+    def __init__(self, content: str, usage_metadata: Optional[Dict[str, int]] = None):
+        self.content = content
+        self.usage_metadata = usage_metadata
+
+class FakeChatModel:
+    """
+    Chat model returning deterministic text after a simulated delay
+
+    Every call draws its latency, failure and response from a random
+    generator seeded by (seed, prompt, call number for that prompt), so a
+    run with the same prompts yields the same results regardless of how
+    calls interleave.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "fake",
+        latency: float = 0.05,
+        latency_distribution: str = "fixed",
+        latency_spread: float = 0.5,
+        tokens_per_second: Optional[float] = None,
+        response_tokens: int = 32,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        **parameters
+    ):
+        """
+        Initialize the fake model
+
+        :param model_name: Name echoed in responses
+        :param latency: Mean time to first token in seconds
+        :param latency_distribution: "fixed", "uniform" (latency +/- spread),
+            "exponential" or "lognormal" (sigma = spread)
+        :param latency_spread: Relative spread of the latency distribution
+        :param tokens_per_second: Generation speed; None returns all tokens at once
+        :param response_tokens: Tokens per response
+        :param error_rate: Probability (0-1) a call raises FakeProviderError
+        :param seed: Seed of all random draws
+        :param parameters: Other model parameters, ignored
+        """
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {latency_distribution}")
+        self.model_name = model_name
+        self.latency = latency
+        self.latency_distribution = latency_distribution
+        self.latency_spread = latency_spread
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self.seed = seed
+        self.calls = 0
+        self.errors = 0
+        self._prompt_calls: Dict[str, int] = {}
+
+    def _plan(self, prompt: Any) -> Dict[str, Any]:
+        """Draw the latency, outcome and tokens of the next call for a prompt"""
+        text = str(prompt)
+        count = self._prompt_calls.get(text, 0)
+        self._prompt_calls[text] = count + 1
+        self.calls += 1
+
+        digest = hashlib.sha256(f"{self.seed}:{count}:{text}".encode("utf-8")).digest()
+        rng = random.Random(digest)
+
+        if self.latency_distribution == "uniform":
+            delay = rng.uniform(self.latency * (1 - self.latency_spread), self.latency * (1 + self.latency_spread))
+        elif self.latency_distribution == "exponential":
+            delay = rng.expovariate(1 / self.latency) if self.latency > 0 else 0.0
+        elif self.latency_distribution == "lognormal":
+            sigma = self.latency_spread
+            # Shift mu so the mean stays at ``latency``
+            delay = rng.lognormvariate(math.log(self.latency) - sigma ** 2 / 2, sigma) if self.latency > 0 else 0.0
+        else:
+            delay = self.latency
+
+        failed = rng.random() < self.error_rate
+        if failed:
+            self.errors += 1
+        word = digest.hex()[:6]
+        tokens = [f"{word}{i}" if i == 0 else f" {word}{i}" for i in range(self.response_tokens)]
+        return {"delay": max(0.0, delay), "failed": failed, "tokens": tokens, "prompt_tokens": len(text) // 4 + 1}
+
+    def _token_delay(self) -> float:
+        return 1 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def _message(self, plan: Dict[str, Any]) -> FakeMessage:
+        return FakeMessage("".join(plan["tokens"]), {
+            "input_tokens": plan["prompt_tokens"],
+            "output_tokens": len(plan["tokens"]),
+            "total_tokens": plan["prompt_tokens"] + len(plan["tokens"])
+        })
+
+    async def ainvoke(self, prompt: Any, **kwargs) -> FakeMessage:
+        plan = self._plan(prompt)
+        await asyncio.sleep(plan["delay"] + self._token_delay() * len(plan["tokens"]))
+        if plan["failed"]:
+            raise FakeProviderError(f"{self.model_name}: injected failure")
+        return self._message(plan)
+
+    def invoke(self, prompt: Any, **kwargs) -> FakeMessage:
+        plan = self._plan(prompt)
+        time.sleep(plan["delay"] + self._token_delay() * len(plan["tokens"]))
+        if plan["failed"]:
+            raise FakeProviderError(f"{self.model_name}: injected failure")
+        return self._message(plan)
+
+    async def astream(self, prompt: Any, **kwargs) -> AsyncIterator[FakeMessage]:
+        plan = self._plan(prompt)
+        await asyncio.sleep(plan["delay"])
+        if plan["failed"]:
+            raise FakeProviderError(f"{self.model_name}: injected failure")
+        token_delay = self._token_delay()
+        for token in plan["tokens"]:
+            if token_delay:
+                await asyncio.sleep(token_delay)
+            yield FakeMessage(token)
+
+    def stream(self, prompt: Any, **kwargs) -> Iterator[FakeMessage]:
+        plan = self._plan(prompt)
+        time.sleep(plan["delay"])
+        if plan["failed"]:
+            raise FakeProviderError(f"{self.model_name}: injected failure")
+        for token in plan["tokens"]:
+            time.sleep(self._token_delay())
+            yield FakeMessage(token)
+
+def fake_client(
+    model_name: str,
+    temperature: float,
+    api_key: Optional[str],
+    base_url: Optional[str],
+    **parameters
+) -> FakeChatModel:
+    """
+    Provider factory for get_chat_client(provider="fake")
+
+    FakeChatModel options (latency, error_rate, ...) are taken from the
+    model parameters, e.g. ModelConfig(provider="fake", parameters={"latency": 0.2}).
+    """
+    return FakeChatModel(model_name=model_name, **parameters)
@@ -1,18 +1,33 @@
 from typing import Dict, Any
 from .base import BaseModel
-from langchain_openai import ChatOpenAI
+from .invocation import provider_invoker
+from .clients import get_chat_client
 
 class GPTModel(BaseModel):
     '''GPT model implementation'''
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
-        self.model = ChatOpenAI(
-            model_name=config.get("model_name", "gpt-4-turbo"),
-            temperature=config.get("temperature", 0.7)
+        model_name = config.get("model_name", "gpt-4-turbo")
+        temperature = config.get("temperature", 0.7)
+        provider = config.get("provider", "openai")
+        client_parameters = config.get("client_parameters", {})
+        self.model = get_chat_client(
+            model_name,
+            temperature=temperature,
+            provider=provider,
+            **client_parameters
+        )
+        self.invoker = provider_invoker(
+            self.model,
+            model_name=model_name,
+            provider=provider,
+            parameters={"temperature": temperature},
+            base_url=client_parameters.get("base_url"),
+            cache=config.get("response_cache")
         )
     
     async def process(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         '''Process input with GPT model'''
-        response = await self.model.invoke(input_data["prompt"])
-        return {"response": response.content if hasattr(response, "content") else response}
\ No newline at end of file
+        response = await self.invoker.invoke(input_data["prompt"])
+        return {"response": response}
\ No newline at end of file
@@ -0,0 +1,271 @@
+"""
+Async invocation helpers for chat models
+"""
+
+import asyncio
+import inspect
+from contextlib import nullcontext
+from typing import Dict, Any, Optional, AsyncIterator, Sequence
+
+from .cache import ResponseCache, cache_key
+from .rate_limit import RateLimiter, estimate_tokens, get_provider_limiter
+from .retry import RetryPolicy, LatencyTracker, call_with_retry, is_retryable, backoff_delay
+from .singleflight import SingleFlight
+from core.registries.model_metrics import ModelMetrics
+from core.tracing import tracer
+
+# Statistics of invocations made outside any AIModelRegistry (the phase
+# default model, GPTModel), exported on /metrics with the registries'
+default_metrics = ModelMetrics()
+
+async def ainvoke(model: Any, prompt: Any) -> Any:
+    """
+    Invoke a chat model without blocking the event loop
+
+    Uses the model's native ``ainvoke`` coroutine when it has one and falls
+    back to running the synchronous ``invoke`` in the default executor.
+
+    :param model: Chat model exposing ``ainvoke`` and/or ``invoke``
+    :param prompt: Prompt passed to the model
+    :return: Raw model response
+    """
+    native = getattr(model, "ainvoke", None)
+    if native is not None and inspect.iscoroutinefunction(native):
+        return await native(prompt)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, model.invoke, prompt)
+
+def response_text(response: Any) -> str:
+    """Extract text content from a model response"""
+    return response.content if hasattr(response, "content") else response
+
+def completion_tokens(response: Any) -> int:
+    """
+    Output tokens of a model response, from provider usage when reported
+    and otherwise estimated from the text
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if isinstance(usage, dict) and usage.get("output_tokens"):
+        return usage["output_tokens"]
+    return estimate_tokens(response_text(response))
+
+async def astream(model: Any, prompt: Any) -> AsyncIterator[str]:
+    """
+    Stream text chunks from a chat model
+
+    Uses the model's native ``astream`` when available and otherwise yields
+    the whole non-streamed response as a single chunk.
+
+    :param model: Chat model client
+    :param prompt: Prompt passed to the model
+    :return: Async iterator of text chunks
+    """
+    native = getattr(model, "astream", None)
+    if native is None:
+        yield response_text(await ainvoke(model, prompt))
+        return
+
+    async for chunk in native(prompt):
+        text = response_text(chunk)
+        if text:
+            yield text
+
+class ModelInvoker:
+    """
+    Invokes a chat model, optionally through a response cache, rate limiters
+    and a retry policy
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        model_name: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        cache: Optional[ResponseCache] = None,
+        rate_limiters: Sequence[RateLimiter] = (),
+        retry_policy: Optional[RetryPolicy] = None,
+        latency: Optional[LatencyTracker] = None,
+        metrics: Optional[Any] = None,
+        single_flight: Optional[SingleFlight] = None,
+        endpoint: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize the invoker
+
+        :param model: Chat model client
+        :param model_name: Provider model name, part of the cache key
+        :param parameters: Model parameters, part of the cache key
+        :param cache: Response cache, None to always call the model
+        :param rate_limiters: Limiters every provider call must be admitted by
+        :param retry_policy: Retry/hedging policy, None for a single attempt
+        :param latency: Latency tracker used to time hedged requests
+        :param metrics: ModelStats recording latency, tokens and errors of
+            every provider call
+        :param single_flight: Coalesces identical concurrent invocations into
+            one provider call
+        :param endpoint: Provider and base URL serving the model, part of
+            the cache key
+        """
+        self.model = model
+        self.model_name = model_name
+        self.parameters = parameters or {}
+        self.cache = cache
+        self.rate_limiters = list(rate_limiters)
+        self.retry_policy = retry_policy
+        self.latency = latency
+        self.metrics = metrics
+        self.single_flight = single_flight
+        self.endpoint = endpoint
+
+    def request_key(self, prompt: Any) -> str:
+        """Cache and coalescing key of a request for prompt"""
+        return cache_key(self.model_name, self.parameters, prompt, self.endpoint)
+
+    async def _admit(self, prompt: Any):
+        """Wait for admission by every rate limiter"""
+        if self.rate_limiters:
+            tokens = estimate_tokens(prompt, self.parameters.get("max_tokens", 0))
+            for limiter in self.rate_limiters:
+                await limiter.acquire(tokens)
+
+    async def _call_model(self, prompt: Any) -> Any:
+        """Send one request to the provider, recording it in the model metrics"""
+        prompt_tokens = estimate_tokens(prompt)
+        with tracer.span("model.call", model=self.model_name, prompt_tokens=prompt_tokens) as span:
+            tracked = self.metrics.track(prompt_tokens) if self.metrics is not None else nullcontext()
+            with tracked as call:
+                response = await ainvoke(self.model, prompt)
+                tokens = completion_tokens(response)
+                if call is not None:
+                    call.completion_tokens = tokens
+            span.set(completion_tokens=tokens)
+        return response
+
+    async def invoke(self, prompt: Any) -> str:
+        """
+        Invoke the model and return the response text
+
+        :param prompt: Prompt passed to the model
+        :return: Response text
+        """
+        with tracer.span("model.invoke", model=self.model_name) as span:
+            key = None
+            if self.cache is not None or self.single_flight is not None:
+                key = self.request_key(prompt)
+            if self.cache is not None:
+                cached = await self.cache.get(key)
+                span.set(cache_hit=cached is not None)
+                if cached is not None:
+                    return cached
+
+            if self.single_flight is not None:
+                return await self.single_flight.do(key, lambda: self._invoke_model(prompt, key))
+            return await self._invoke_model(prompt, key)
+
+    async def _invoke_model(self, prompt: Any, key: Optional[str]) -> str:
+        """Call the provider (with retries) and cache the response text"""
+        if self.retry_policy is None:
+            await self._admit(prompt)
+            response = await self._call_model(prompt)
+        else:
+            response = await call_with_retry(
+                lambda: self._call_model(prompt),
+                self.retry_policy,
+                latency=self.latency,
+                before_attempt=lambda: self._admit(prompt)
+            )
+        text = response_text(response)
+
+        if self.cache is not None:
+            await self.cache.set(key, text)
+        return text
+
+    async def stream(self, prompt: Any) -> AsyncIterator[str]:
+        """
+        Stream the model response as text chunks
+
+        A cache hit is yielded as a single chunk; a streamed miss is stored
+        in the cache once complete. Transient failures are retried only
+        before the first chunk has been yielded.
+
+        :param prompt: Prompt passed to the model
+        :return: Async iterator of text chunks
+        """
+        # Not made current: the generator suspends while its consumer runs
+        span = tracer.start("model.stream", model=self.model_name)
+        try:
+            key = None
+            if self.cache is not None:
+                key = self.request_key(prompt)
+                cached = await self.cache.get(key)
+                span.set(cache_hit=cached is not None)
+                if cached is not None:
+                    yield cached
+                    tracer.end(span)
+                    return
+
+            max_attempts = self.retry_policy.max_attempts if self.retry_policy else 1
+            chunks = []
+            for attempt in range(max_attempts):
+                await self._admit(prompt)
+                try:
+                    tracked = self.metrics.track(estimate_tokens(prompt)) if self.metrics is not None else nullcontext()
+                    with tracked as call:
+                        async for chunk in astream(self.model, prompt):
+                            chunks.append(chunk)
+                            yield chunk
+                        if call is not None:
+                            call.completion_tokens = estimate_tokens("".join(chunks))
+                    break
+                except Exception as e:
+                    if chunks or attempt == max_attempts - 1 or not is_retryable(e):
+                        raise
+                    await asyncio.sleep(backoff_delay(self.retry_policy, attempt))
+
+            if key is not None:
+                await self.cache.set(key, "".join(chunks))
+        except GeneratorExit:
+            # The consumer stopped early
+            tracer.end(span)
+            raise
+        except BaseException as e:
+            tracer.end(span, e)
+            raise
+        span.set(chunks=len(chunks))
+        tracer.end(span)
+
+def provider_invoker(
+    model: Any,
+    model_name: str,
+    provider: str,
+    parameters: Optional[Dict[str, Any]] = None,
+    metrics: Optional[ModelMetrics] = None,
+    base_url: Optional[str] = None,
+    **options: Any
+) -> ModelInvoker:
+    """
+    Invoker for a model that is not registered with an AIModelRegistry
+
+    Calls pass the provider's shared rate limiter and are recorded in
+    ``metrics`` under the model name, like those of registered models.
+
+    :param model: Chat model client
+    :param model_name: Provider model name
+    :param provider: Provider whose rate limiter applies
+    :param parameters: Model parameters, part of the cache key
+    :param metrics: Metrics collection, default_metrics by default
+    :param base_url: API base URL the client sends requests to
+    :param options: Other ModelInvoker arguments, e.g. cache or retry_policy
+    :return: Configured invoker
+    """
+    limiter = get_provider_limiter(provider)
+    return ModelInvoker(
+        model,
+        model_name=model_name,
+        parameters=parameters,
+        rate_limiters=[] if limiter.unlimited else [limiter],
+        metrics=(metrics or default_metrics).model(model_name),
+        endpoint={"provider": provider, "base_url": base_url},
+        **options
+    )
@@ -0,0 +1,161 @@
+"""
+Async token-bucket rate limiting for model providers
+"""
+
+import asyncio
+import os
+import time
+from typing import Dict, Any, Optional
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (amounts above capacity wait for a full bucket)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.available) / self.rate)
+
+    def take(self, amount: float):
+        """Consume ``amount`` (callers check wait_time first)"""
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+class RateLimiter:
+    """
+    Admission control for requests/minute and tokens/minute budgets
+
+    Callers are admitted strictly in arrival order, so a burst from one
+    project cannot starve others that queued earlier.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        name: str = ""
+    ):
+        """
+        Initialize the limiter
+
+        :param requests_per_minute: Request budget, None for unlimited
+        :param tokens_per_minute: Token budget, None for unlimited
+        :param name: Name used in metrics
+        """
+        self.name = name
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = asyncio.Lock()
+        self._waiting = 0
+        self._stats = {"admitted": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+    @property
+    def unlimited(self) -> bool:
+        return self._requests is None and self._tokens is None
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """
+        Wait until a request of ``tokens`` tokens fits within the budgets
+
+        :param tokens: Estimated tokens the request will consume
+        :return: Seconds spent waiting
+        """
+        if self.unlimited:
+            self._stats["admitted"] += 1
+            return 0.0
+
+        start = time.monotonic()
+        self._waiting += 1
+        try:
+            # The lock queues callers FIFO; only the head of the queue sleeps on the buckets
+            async with self._lock:
+                while True:
+                    delay = max(
+                        self._requests.wait_time(1) if self._requests else 0.0,
+                        self._tokens.wait_time(tokens) if self._tokens and tokens else 0.0
+                    )
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                if self._requests:
+                    self._requests.take(1)
+                if self._tokens and tokens:
+                    self._tokens.take(tokens)
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - start
+        self._stats["admitted"] += 1
+        self._stats["total_wait"] += waited
+        self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+        return waited
+
+    def stats(self) -> Dict[str, Any]:
+        """Return admission and wait-time metrics"""
+        admitted = self._stats["admitted"]
+        return {
+            "name": self.name,
+            **self._stats,
+            "mean_wait": self._stats["total_wait"] / admitted if admitted else 0.0,
+            "waiting": self._waiting
+        }
+
+def estimate_tokens(prompt: Any, max_tokens: int = 0) -> int:
+    """
+    Roughly estimate the tokens a request consumes
+
+    :param prompt: Prompt sent to the model
+    :param max_tokens: Completion budget requested from the provider
+    :return: Estimated prompt plus completion tokens
+    """
+    return len(str(prompt)) // 4 + 1 + (max_tokens or 0)
+
+# Process-wide limiters shared by every registry and endpoint calling a provider
+_provider_limiters: Dict[str, RateLimiter] = {}
+
+def configure_provider_limits(
+    provider: str,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None
+) -> RateLimiter:
+    """
+    Set the rate limits for a provider
+
+    :param provider: Provider name as used in ModelConfig.provider
+    :param requests_per_minute: Request budget, None for unlimited
+    :param tokens_per_minute: Token budget, None for unlimited
+    :return: The provider's limiter
+    """
+    _provider_limiters[provider] = RateLimiter(requests_per_minute, tokens_per_minute, name=provider)
+    return _provider_limiters[provider]
+
+def get_provider_limiter(provider: str) -> RateLimiter:
+    """
+    Get the shared limiter for a provider
+
+    Unless configured explicitly, limits come from the
+    <PROVIDER>_REQUESTS_PER_MINUTE and <PROVIDER>_TOKENS_PER_MINUTE
+    environment variables and default to unlimited.
+    """
+    limiter = _provider_limiters.get(provider)
+    if limiter is None:
+        prefix = provider.upper().replace("-", "_")
+        rpm = os.getenv(f"{prefix}_REQUESTS_PER_MINUTE")
+        tpm = os.getenv(f"{prefix}_TOKENS_PER_MINUTE")
+        limiter = configure_provider_limits(
+            provider,
+            float(rpm) if rpm else None,
+            float(tpm) if tpm else None
+        )
+    return limiter
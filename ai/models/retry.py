@@ -0,0 +1,201 @@
+"""
+Retry, deadline and request-hedging policy for model calls
+"""
+
+import asyncio
+import logging
+import random
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Provider exception types that indicate a transient failure, matched by name
+# so provider SDKs do not have to be imported here
+_RETRYABLE_ERROR_NAMES = {
+    "APITimeoutError",
+    "APIConnectionError",
+    "RateLimitError",
+    "InternalServerError",
+    "ServiceUnavailableError",
+    "TimeoutException",
+    "ConnectError",
+    "ReadError",
+    "RemoteProtocolError"
+}
+
+class RetryPolicy(BaseModel):
+    '''Retry and hedging configuration for model calls'''
+    max_attempts: int = 3
+    # Exponential backoff: attempt n sleeps up to base_delay * 2**n, capped at max_delay
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    # Timeout of a single attempt in seconds
+    attempt_timeout: Optional[float] = 120.0
+    # Overall budget across all attempts and backoff sleeps
+    deadline: Optional[float] = None
+    # Fire a duplicate request when the first is slower than the observed quantile
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_min_samples: int = 20
+    # Fixed hedge delay overriding the latency quantile
+    hedge_delay: Optional[float] = None
+
+def is_retryable(error: BaseException) -> bool:
+    '''
+    Classify an error as transient: timeouts, connection errors, 429 and 5xx
+
+    :param error: Exception raised by a model call
+    :return: True if the call may succeed when retried
+    '''
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 409, 429) or status >= 500
+
+    return any(cls.__name__ in _RETRYABLE_ERROR_NAMES for cls in type(error).__mro__)
+
+def backoff_delay(policy: RetryPolicy, attempt: int) -> float:
+    '''Full-jitter exponential backoff before retry number ``attempt`` (0-based)'''
+    return random.uniform(0, min(policy.max_delay, policy.base_delay * (2 ** attempt)))
+
+class LatencyTracker:
+    '''Sliding window of recent successful call latencies'''
+
+    def __init__(self, window: int = 1000):
+        self._samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def quantile(self, q: float) -> Optional[float]:
+        '''Latency at quantile ``q`` (0-1), None without samples'''
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+async def call_with_retry(
+    call: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    latency: Optional[LatencyTracker] = None,
+    before_attempt: Optional[Callable[[], Awaitable[Any]]] = None
+) -> T:
+    '''
+    Run a model call with classified retries, deadlines and optional hedging
+
+    :param call: Zero-argument coroutine factory performing one request
+    :param policy: Retry policy
+    :param latency: Tracker of successful latencies, used for hedge delays
+    :param before_attempt: Awaited before every request (e.g. rate limiter
+        admission). Waiting counts against the deadline; the primary request
+        is admitted before its attempt timeout starts, a hedge request after
+        the hedge delay and within the attempt timeout.
+    :return: Result of the first successful request
+    :raises Exception: The last error once retries are exhausted or not allowed
+    '''
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + policy.deadline if policy.deadline else None
+
+    def remaining() -> Optional[float]:
+        if deadline is None:
+            return None
+        left = deadline - loop.time()
+        if left <= 0:
+            raise asyncio.TimeoutError("Model call deadline exceeded")
+        return left
+
+    for attempt in range(policy.max_attempts):
+        if before_attempt is not None:
+            await asyncio.wait_for(before_attempt(), remaining())
+
+        timeout = policy.attempt_timeout
+        left = remaining()
+        if left is not None:
+            timeout = min(timeout, left) if timeout else left
+
+        try:
+            return await asyncio.wait_for(
+                _hedged_attempt(call, policy, latency, before_attempt), timeout
+            )
+        except Exception as e:
+            last_attempt = attempt == policy.max_attempts - 1
+            if last_attempt or not is_retryable(e):
+                raise
+            delay = backoff_delay(policy, attempt)
+            if deadline is not None and loop.time() + delay >= deadline:
+                raise
+            logger.warning(f"Model call failed ({e!r}), retry {attempt + 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+async def _single_attempt(
+    call: Callable[[], Awaitable[T]],
+    latency: Optional[LatencyTracker],
+    before_attempt: Optional[Callable[[], Awaitable[Any]]] = None
+) -> T:
+    '''One request, recording its latency on success'''
+    if before_attempt is not None:
+        await before_attempt()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    result = await call()
+    if latency is not None:
+        latency.record(loop.time() - start)
+    return result
+
+async def _hedged_attempt(
+    call: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    latency: Optional[LatencyTracker],
+    before_attempt: Optional[Callable[[], Awaitable[Any]]]
+) -> T:
+    '''
+    One attempt, hedged with a second request if the first is slow
+
+    The primary request has already been admitted by the caller; the hedge
+    fires after the configured delay or the observed latency quantile and
+    waits for its own admission while the primary keeps running. Whichever request succeeds first wins and the other
+    is cancelled.
+    '''
+    hedge_delay = None
+    if policy.hedge:
+        hedge_delay = policy.hedge_delay
+        if hedge_delay is None and latency is not None and len(latency) >= policy.hedge_min_samples:
+            hedge_delay = latency.quantile(policy.hedge_quantile)
+    if hedge_delay is None:
+        return await _single_attempt(call, latency)
+
+    primary = asyncio.create_task(_single_attempt(call, latency))
+    tasks = {primary}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+        if not done:
+            tasks.add(asyncio.create_task(_single_attempt(call, latency, before_attempt)))
+
+        error: BaseException = asyncio.CancelledError()
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                tasks.discard(task)
+                if task.cancelled():
+                    continue
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        # Every request failed (or was cancelled); surface the last error
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,140 @@
+"""
+Semantic response cache matching near-duplicate prompts
+"""
+
+import itertools
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core.embeddings import Embedder
+
+class SemanticCache:
+    """
+    Response cache hit by prompts similar to, not only identical to, a
+    cached one
+
+    Prompt embeddings live in one VectorIndex; a lookup is a top-k cosine
+    search whose best candidate in the same namespace above ``threshold``
+    is returned. Namespaces keep responses of different models, parameters
+    or prompt templates apart, since their prompts may embed alike.
+    """
+
+    def __init__(
+        self,
+        embedder: Optional["Embedder"] = None,
+        threshold: float = 0.95,
+        max_entries: int = 4096,
+        ttl: Optional[float] = 3600.0,
+        candidates: int = 8
+    ):
+        """
+        Initialize the cache
+
+        :param embedder: Prompt embedder, a HashingEmbedder by default
+        :param threshold: Minimum cosine similarity of a hit
+        :param max_entries: Entries kept; the least recently used are evicted
+        :param ttl: Seconds an entry stays valid, None for no expiry
+        :param candidates: Nearest entries examined per lookup
+        """
+        # Imported here so importing the model registry does not load numpy
+        from core.embeddings import HashingEmbedder, VectorIndex
+
+        self.embedder = embedder or HashingEmbedder()
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.candidates = candidates
+        self._index = VectorIndex(self.embedder.dim, capacity=min(max_entries, 1024))
+        # Entry id (an int, returned by the index as a Hashable key) ->
+        # (namespace, expires_at, response), in LRU order
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, Optional[float], str]]" = OrderedDict()
+        self._ids = itertools.count()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "lookup_seconds": 0.0, "max_lookup_seconds": 0.0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, namespace: Hashable, text: str) -> Optional[str]:
+        """
+        Look up the response of a similar prompt
+
+        :param namespace: Model, parameters and template the prompt belongs to
+        :param text: Prompt text compared by similarity
+        :return: Cached response or None on a miss
+        """
+        return self.get_many(namespace, [text])[0]
+
+    def get_many(self, namespace: Hashable, texts: Sequence[str]) -> List[Optional[str]]:
+        """
+        Look up several prompts with one batched similarity search
+
+        :param namespace: Model, parameters and template the prompts belong to
+        :param texts: Prompt texts compared by similarity
+        :return: Cached response or None for each text
+        """
+        start = time.perf_counter()
+        results: List[Optional[str]] = [None] * len(texts)
+        if self._entries and texts:
+            matches = self._index.search_many(
+                self.embedder.embed(texts), k=self.candidates, threshold=self.threshold
+            )
+            now = time.time()
+            for position, candidates in enumerate(matches):
+                for entry_id, _ in candidates:
+                    entry = self._entries.get(entry_id)
+                    if entry is None or entry[0] != namespace:
+                        continue
+                    if entry[1] is not None and entry[1] <= now:
+                        self._remove(entry_id)
+                        continue
+                    self._entries.move_to_end(entry_id)
+                    results[position] = entry[2]
+                    break
+
+        elapsed = time.perf_counter() - start
+        hits = sum(result is not None for result in results)
+        self._stats["hits"] += hits
+        self._stats["misses"] += len(texts) - hits
+        self._stats["lookup_seconds"] += elapsed
+        self._stats["max_lookup_seconds"] = max(self._stats["max_lookup_seconds"], elapsed)
+        return results
+
+    def set(self, namespace: Hashable, text: str, response: str):
+        """
+        Cache a response
+
+        :param namespace: Model, parameters and template the prompt belongs to
+        :param text: Prompt text compared by similarity
+        :param response: Response text
+        """
+        entry_id = next(self._ids)
+        expires_at = time.time() + self.ttl if self.ttl is not None else None
+        self._index.add(entry_id, self.embedder.embed([text])[0])
+        self._entries[entry_id] = (namespace, expires_at, response)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self._stats["evictions"] += 1
+
+    def _remove(self, entry_id: Hashable):
+        del self._entries[entry_id]
+        self._index.remove(entry_id)
+
+    def clear(self):
+        """Remove all entries"""
+        for entry_id in list(self._entries):
+            self._remove(entry_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and lookup latency"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "hits": self._stats["hits"],
+            "misses": self._stats["misses"],
+            "evictions": self._stats["evictions"],
+            "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "mean_lookup_us": self._stats["lookup_seconds"] / lookups * 1e6 if lookups else 0.0,
+            "max_lookup_us": self._stats["max_lookup_seconds"] * 1e6
+        }
@@ -0,0 +1,75 @@
+"""
+Coalescing of identical in-flight model requests
+"""
+
+import asyncio
+from typing import Dict, Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class _Flight:
+    """A running call and the number of callers awaiting it"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time
+
+    The first caller for a key (the leader) starts the call; callers arriving
+    while it runs (followers) await the same result or error instead of
+    issuing their own. The call runs in its own task, so a cancelled caller
+    does not fail the others; it is only cancelled once nobody awaits it.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._stats = {"leaders": 0, "followers": 0}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``call``, or join the identical call already in flight
+
+        :param key: Identity of the request
+        :param call: Zero-argument coroutine factory performing the request
+        :return: Result of the shared call
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._finish(key, flight))
+            self._stats["leaders"] += 1
+        else:
+            self._stats["followers"] += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                # Later callers must start a fresh call rather than join a cancelled one
+                self._finish(key, flight)
+
+    def _finish(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return how many calls were made and how many were coalesced"""
+        total = self._stats["leaders"] + self._stats["followers"]
+        return {
+            **self._stats,
+            "in_flight": self.in_flight,
+            "coalesced_rate": self._stats["followers"] / total if total else 0.0
+        }
@@ -1,55 +1,357 @@
-from typing import Dict, Any
-from core.registries import WorkflowRegistry, PhaseRegistry, AIModelRegistry
+import asyncio
+import logging
+import uuid
+from typing import Dict, Any, List, AsyncIterator, Optional, Tuple, Union
+from core.registries import WorkflowRegistry, PhaseRegistry, AIModelRegistry, WorkflowType, PhaseConfig
 from core.timeline.tracker import ProjectTimeline
+from core.timeline.store import TimelineWriter
+from core.checkpoint import CheckpointStore, phase_fingerprint
+from core.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+class ProjectExecutionError(Exception):
+    '''Raised when a project fails; carries the run id needed to resume it'''
+
+    def __init__(self, message: str, run_id: str):
+        super().__init__(message)
+        self.run_id = run_id
 
 class DetailedAIWorkflowEngine:
     '''Main workflow engine'''
-    
-    def __init__(self):
+
+    def __init__(
+        self,
+        max_concurrency: int = 10,
+        timeline_writer: Optional[TimelineWriter] = None,
+        checkpoint_store: Optional[CheckpointStore] = None
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
         self.workflow_registry = WorkflowRegistry()
         self.phase_registry = PhaseRegistry()
         self.model_registry = AIModelRegistry()
-        self.timeline = ProjectTimeline()
-    
-    async def execute_project(self, project_spec: Dict[str, Any]) -> Dict[str, Any]:
-        '''Execute complete project workflow'''
+        self.max_concurrency = max_concurrency
+        # Optional background writer persisting every project's timeline
+        self.timeline_writer = timeline_writer
+        # Optional store of completed phase results for resuming failed runs
+        self.checkpoint_store = checkpoint_store
+
+    async def execute_project(
+        self,
+        project_spec: Dict[str, Any],
+        timeline: Optional[ProjectTimeline] = None,
+        events: Optional[asyncio.Queue] = None,
+        resume_run_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        '''
+        Execute complete project workflow
+
+        :param project_spec: Project specification
+        :param timeline: Timeline to record progress on, a new one by default
+        :param events: Queue receiving streamed phase events, see execute_project_stream
+        :param resume_run_id: Run to resume; phases with valid checkpoints are skipped
+        :return: Run id, workflow type, phase results and timeline
+        :raises ProjectExecutionError: If the project fails
+        '''
+        run_id = resume_run_id or project_spec.get("run_id") or uuid.uuid4().hex
+        # Every project gets its own timeline so concurrent runs never share state
+        timeline = timeline or ProjectTimeline(
+            project_id=project_spec.get("project_id") or run_id,
+            writer=self.timeline_writer
+        )
         try:
-            # Identify workflow type
-            workflow_type = await self.workflow_registry.identify_workflow_type(
-                project_spec.get("description", "")
-            )
-            
-            # Get workflow
-            workflow = await self.workflow_registry.get_workflow(workflow_type)
-            if not workflow:
-                raise ValueError(f"Unknown workflow type: {workflow_type}")
-            
-            results = {}
-            
-            # Execute phases
-            for phase_config in workflow.phases:
-                await self.timeline.start_phase(phase_config.phase_name)
-                
+            with tracer.span("execute_project", run_id=run_id, project_id=timeline.project_id) as span:
+                # Use the explicit workflow type if given, otherwise identify it
+                workflow_type = project_spec.get("workflow_type") or \
+                    await self.workflow_registry.identify_workflow_type(
+                        project_spec.get("description", "")
+                    )
+
+                # Get workflow
+                workflow = await self.workflow_registry.get_workflow(workflow_type)
+                if not workflow:
+                    if workflow_type is None:
+                        raise ValueError("No workflow type matches the project description")
+                    raise ValueError(f"Unknown workflow type: {workflow_type}")
+                span.set(workflow_type=workflow_type, phases=len(workflow.phases))
+
+                checkpoints = {}
+                if resume_run_id and self.checkpoint_store is not None:
+                    checkpoints = await self.checkpoint_store.load(resume_run_id)
+
+                results = await self._execute_phases(
+                    workflow, project_spec, timeline, events, run_id, checkpoints
+                )
+
+                return {
+                    "run_id": run_id,
+                    "project_id": timeline.project_id,
+                    "workflow_type": workflow_type,
+                    "results": results,
+                    "timeline": timeline.phases
+                }
+
+        except Exception as e:
+            raise ProjectExecutionError(f"Project execution failed: {str(e)}", run_id) from e
+
+    async def _execute_phases(
+        self,
+        workflow: WorkflowType,
+        project_spec: Dict[str, Any],
+        timeline: ProjectTimeline,
+        events: Optional[asyncio.Queue] = None,
+        run_id: Optional[str] = None,
+        checkpoints: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        '''
+        Run workflow phases as a DAG, launching every phase whose dependencies
+        have completed so independent phases execute concurrently
+
+        :param workflow: Workflow whose phases should be executed
+        :param project_spec: Project specification passed to every phase
+        :param timeline: Timeline recording phase progress
+        :param events: Optional queue receiving streamed phase events
+        :param run_id: Run id under which phase results are checkpointed
+        :param checkpoints: Checkpoints of a previous attempt of this run
+        :return: Phase results keyed by phase name, in topological order
+        '''
+        configs = {phase.phase_name: phase for phase in workflow.phases}
+        dependencies = workflow.phase_dependencies()
+        order = workflow.topological_order()
+        checkpoints = checkpoints or {}
+
+        results: Dict[str, Any] = {}
+        fingerprints: Dict[str, str] = {}
+        restored = set()
+        pending = list(order)
+        running: Dict[asyncio.Task, str] = {}
+
+        async def run_phase(name: str, phase_input: Dict[str, Any]) -> Dict[str, Any]:
+            result = await self._execute_phase(configs[name], phase_input, timeline, events)
+            if self.checkpoint_store is not None and run_id \
+                    and not (isinstance(result, dict) and "error" in result):
                 try:
-                    # Get phase implementation
-                    phase = self.phase_registry.get_phase(phase_config)
-                    
-                    # Execute phase
-                    result = await phase.execute(project_spec)
-                    
-                    # Store result
-                    results[phase_config.phase_name] = result
-                    await self.timeline.complete_phase(phase_config.phase_name, result)
-                    
+                    await self.checkpoint_store.save(run_id, name, fingerprints[name], result)
                 except Exception as e:
-                    await self.timeline.fail_phase(phase_config.phase_name, str(e))
-                    raise
-            
-            return {
-                "workflow_type": workflow_type,
-                "results": results,
-                "timeline": self.timeline.phases
-            }
-            
+                    logger.warning(f"Failed to checkpoint phase {name} of run {run_id}: {e}")
+            return result
+
+        try:
+            while pending or running:
+                ready = [name for name in pending if all(dep in results for dep in dependencies[name])]
+                for name in ready:
+                    pending.remove(name)
+                    fingerprints[name] = phase_fingerprint(
+                        configs[name].model_dump(),
+                        project_spec,
+                        [fingerprints[dep] for dep in dependencies[name]]
+                    )
+
+                    # Reuse a checkpoint only if its inputs are unchanged and every
+                    # upstream phase was reused as well
+                    checkpoint = checkpoints.get(name)
+                    if checkpoint and checkpoint["fingerprint"] == fingerprints[name] \
+                            and all(dep in restored for dep in dependencies[name]):
+                        results[name] = checkpoint["result"]
+                        restored.add(name)
+                        await self._restore_phase(name, checkpoint["result"], timeline, events)
+                        continue
+
+                    phase_input = self._phase_input(project_spec, dependencies[name], results)
+                    running[asyncio.create_task(run_phase(name, phase_input))] = name
+
+                if not running:
+                    continue
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                errors: List[BaseException] = []
+                for task in done:
+                    name = running.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        errors.append(error)
+                    else:
+                        results[name] = task.result()
+                if errors:
+                    raise errors[0]
+        finally:
+            # A failed phase cancels its still-running siblings
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+        return {name: results[name] for name in order}
+
+    @staticmethod
+    async def _restore_phase(
+        phase_name: str,
+        result: Dict[str, Any],
+        timeline: ProjectTimeline,
+        events: Optional[asyncio.Queue] = None
+    ):
+        '''Record a phase restored from a checkpoint as completed'''
+        await timeline.start_phase(phase_name)
+        await timeline.complete_phase(phase_name, result)
+        timeline.phases[phase_name]["resumed"] = True
+        if events is not None:
+            events.put_nowait({"event": "phase_completed", "phase": phase_name, "result": result, "resumed": True})
+
+    @staticmethod
+    def _phase_input(
+        project_spec: Dict[str, Any],
+        dependencies: List[str],
+        results: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        '''Build phase input: the project spec plus results of its dependencies'''
+        if not dependencies:
+            return project_spec
+        return {
+            **project_spec,
+            "phase_results": {dep: results[dep] for dep in dependencies}
+        }
+
+    async def _execute_phase(
+        self,
+        phase_config: PhaseConfig,
+        phase_input: Dict[str, Any],
+        timeline: ProjectTimeline,
+        events: Optional[asyncio.Queue] = None
+    ) -> Dict[str, Any]:
+        '''Execute a single phase, recording it on the timeline'''
+        phase_name = phase_config.phase_name
+        await timeline.start_phase(phase_name)
+        if events is not None:
+            events.put_nowait({"event": "phase_started", "phase": phase_name})
+
+        try:
+            # Get phase implementation
+            phase = self.phase_registry.get_phase(phase_config, model_registry=self.model_registry)
+
+            # Execute phase, forwarding partial output when streaming
+            with tracer.span("phase", phase=phase_name) as span, \
+                    self.model_registry.metrics.phase(phase_name).track():
+                if events is None:
+                    result = await phase.execute(phase_input)
+                else:
+                    result = None
+                    async for event in phase.execute_stream(phase_input):
+                        if event["type"] == "token":
+                            events.put_nowait({"event": "token", "phase": phase_name, "content": event["content"]})
+                        elif event["type"] == "result":
+                            result = event["result"]
+                if isinstance(result, dict) and "prompt_tokens" in result:
+                    span.set(prompt_tokens=result["prompt_tokens"])
+
+        except asyncio.CancelledError:
+            await timeline.fail_phase(phase_name, "cancelled")
+            raise
         except Exception as e:
-            raise Exception(f"Project execution failed: {str(e)}")
\ No newline at end of file
+            await timeline.fail_phase(phase_name, str(e))
+            if events is not None:
+                events.put_nowait({"event": "phase_failed", "phase": phase_name, "error": str(e)})
+            raise
+
+        await timeline.complete_phase(phase_name, result)
+        if events is not None:
+            events.put_nowait({"event": "phase_completed", "phase": phase_name, "result": result})
+        return result
+
+    async def execute_project_stream(
+        self,
+        project_spec: Dict[str, Any],
+        timeline: Optional[ProjectTimeline] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        '''
+        Execute a project, yielding progress events as they happen
+
+        Events are dicts with an "event" key: "phase_started", "token"
+        (partial model output with "content"), "phase_completed",
+        "phase_failed", and finally "project_completed" carrying the full
+        execute_project result or "project_failed" carrying the error.
+
+        :param project_spec: Project specification
+        :param timeline: Timeline to record progress on, a new one by default
+        :return: Async iterator of events
+        '''
+        events: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def run():
+            try:
+                result = await self.execute_project(project_spec, timeline=timeline, events=events)
+                events.put_nowait({"event": "project_completed", "result": result})
+            except Exception as e:
+                events.put_nowait({"event": "project_failed", "error": str(e)})
+            finally:
+                events.put_nowait(done)
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event = await events.get()
+                if event is done:
+                    break
+                yield event
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def execute_projects(
+        self,
+        project_specs: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = False
+    ) -> List[Union[Dict[str, Any], BaseException]]:
+        '''
+        Execute several projects concurrently, bounded by a semaphore
+
+        :param project_specs: Project specifications to execute
+        :param max_concurrency: Maximum number of projects running at once
+        :param return_exceptions: Return failures in place of results instead of raising
+        :return: Results in the same order as project_specs
+        '''
+        results: List[Any] = [None] * len(project_specs)
+        async for index, result in self.execute_projects_as_completed(
+            project_specs, max_concurrency=max_concurrency, return_exceptions=return_exceptions
+        ):
+            results[index] = result
+        return results
+
+    async def execute_projects_as_completed(
+        self,
+        project_specs: List[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = False
+    ) -> AsyncIterator[Tuple[int, Union[Dict[str, Any], BaseException]]]:
+        '''
+        Execute several projects concurrently and yield results as they finish
+
+        :param project_specs: Project specifications to execute
+        :param max_concurrency: Maximum number of projects running at once
+        :param return_exceptions: Yield failures instead of raising
+        :return: Async iterator of (index into project_specs, result) pairs
+        '''
+        limit = self.max_concurrency if max_concurrency is None else max_concurrency
+        if limit < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(index: int, spec: Dict[str, Any]):
+            async with semaphore:
+                try:
+                    return index, await self.execute_project(spec)
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    return index, e
+
+        tasks = [asyncio.create_task(run(i, spec)) for i, spec in enumerate(project_specs)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Abandoned iteration or a failure cancels the remaining projects
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,71 @@
+"""
+Default model and workflow registrations shared by the CLI and the backend
+"""
+
+import logging
+
+# Explicitly import to ensure phases are registered
+from core.phases.base_phase import register_phases, INPUT_ANALYSIS_TEMPLATE, CONTENT_GENERATION_TEMPLATE
+
+from core.registries.model_registry import ModelConfig
+from core.registries.workflow_registry import WorkflowType
+from core.registries.phase_registry import PhaseConfig
+
+logger = logging.getLogger(__name__)
+
+async def setup_project_registry(engine):
+    """Setup initial project registries"""
+    try:
+        # Ensure phases are registered
+        register_phases()
+        logger.info("Phases registered")
+
+        # Register a GPT model
+        gpt_model_config = ModelConfig(
+            model_id="gpt_default",
+            provider="openai",
+            model_name="gpt-4-turbo",
+            version="1.0.0",
+            capabilities=["text_generation", "qa", "summarization"],
+            parameters={
+                "temperature": 0.7,
+                "max_tokens": 1000
+            }
+        )
+        await engine.model_registry.register_model(gpt_model_config)
+
+        # Define multiple workflow types
+        workflows = [
+            WorkflowType(
+                type_code="text_generation",
+                name="Text Generation Workflow",
+                description="Workflow for generating text-based content",
+                phases=[
+                    PhaseConfig(
+                        phase_number=1,
+                        phase_name="input_analysis",
+                        description="Analyze input requirements",
+                        required_capabilities=["text_generation"],
+                        prompt_template=INPUT_ANALYSIS_TEMPLATE,
+                        cache_responses=True
+                    ),
+                    PhaseConfig(
+                        phase_number=2,
+                        phase_name="content_generation",
+                        description="Generate content based on analysis",
+                        required_capabilities=["text_generation"],
+                        prompt_template=CONTENT_GENERATION_TEMPLATE,
+                        depends_on=["input_analysis"]
+                    )
+                ]
+            )
+        ]
+
+        # Register workflows
+        for workflow in workflows:
+            await engine.workflow_registry.register_workflow(workflow)
+        
+        logger.info("Project registries setup complete")
+    except Exception as e:
+        logger.error(f"Error setting up project registries: {e}", exc_info=True)
+        raise
@@ -1,22 +1,386 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import os
+from contextlib import AsyncExitStack, aclosing, asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import PlainTextResponse, StreamingResponse
 import openai
 
-app = FastAPI()
+from ai.job_queue import JobQueue, QueueFull
+from ai.models.clients import pool_limits, pool_timeout
+from ai.models.rate_limit import get_provider_limiter, estimate_tokens
+from ai.models.singleflight import SingleFlight
+from core.registries.model_metrics import ModelMetrics, render_prometheus
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = asyncio.Lock()
+
+async def get_job_queue() -> JobQueue:
+    '''
+    Get the job queue, creating a workflow engine with the default
+    registrations on first use
+
+    Worker count and queue capacity come from the JOB_WORKERS and
+    JOB_MAX_PENDING environment variables.
+    '''
+    global _job_queue
+    async with _job_queue_lock:
+        if _job_queue is None:
+            from ai.workflow_engine import DetailedAIWorkflowEngine
+            from ai.workflow_setup import setup_project_registry
+
+            engine = DetailedAIWorkflowEngine()
+            await setup_project_registry(engine)
+            _job_queue = JobQueue(
+                engine,
+                workers=int(os.getenv("JOB_WORKERS", "4")),
+                max_pending=int(os.getenv("JOB_MAX_PENDING", "1000"))
+            )
+            await _job_queue.start()
+    return _job_queue
+
+def set_job_queue(queue: Optional[JobQueue]):
+    '''Replace the job queue, e.g. with one backed by a preconfigured engine'''
+    global _job_queue
+    _job_queue = queue
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    if _job_queue is not None:
+        await _job_queue.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 # OpenAI API Key (Replace with a valid key)
 openai.api_key = "your-openai-api-key"
 
+DEFAULT_PROMPT = "Explain how AI improves workflow automation in business."
+MODEL_NAME = "gpt-4"
+
+# Statistics of the calls made by this app, exported with every registry's on /metrics
+metrics = ModelMetrics()
+
+# Identical concurrent /generate prompts share one completion
+generate_flight = SingleFlight()
+
+class Overloaded(Exception):
+    '''Raised when too many requests already wait for a completion slot'''
+    pass
+
+class ConcurrencyGate:
+    '''
+    Caps concurrent provider calls, shedding load once the queue of
+    waiting requests is full
+    '''
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def check(self):
+        '''Raise Overloaded if a new request would be shed'''
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(f"{self.waiting} requests already queued")
+
+    @asynccontextmanager
+    async def slot(self):
+        '''Hold one of the concurrency slots, raising Overloaded if the queue is full'''
+        self.check()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+def configure_generate_limits(
+    max_concurrency: Optional[int] = None,
+    max_queue: Optional[int] = None,
+    timeout: Optional[float] = None
+):
+    '''
+    Configure /generate admission, shared by the streaming endpoints
+
+    Defaults come from the GENERATE_MAX_CONCURRENCY, GENERATE_MAX_QUEUE and
+    GENERATE_TIMEOUT environment variables.
+
+    :param max_concurrency: Provider calls running at once
+    :param max_queue: Requests allowed to wait for a slot before 503s
+    :param timeout: Seconds before a request fails with 504
+    :raises ValueError: If max_concurrency is below 1, max_queue is negative
+        or timeout is not positive
+    '''
+    global generate_gate, GENERATE_TIMEOUT
+    if max_concurrency is None:
+        max_concurrency = int(os.getenv("GENERATE_MAX_CONCURRENCY", "64"))
+    if max_queue is None:
+        max_queue = int(os.getenv("GENERATE_MAX_QUEUE", "256"))
+    if timeout is None:
+        timeout = float(os.getenv("GENERATE_TIMEOUT", "60"))
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+    if max_queue < 0:
+        raise ValueError(f"max_queue must not be negative, got {max_queue}")
+    if timeout <= 0:
+        raise ValueError(f"timeout must be positive, got {timeout}")
+    generate_gate = ConcurrencyGate(max_concurrency, max_queue)
+    GENERATE_TIMEOUT = timeout
+
+generate_gate: ConcurrencyGate
+GENERATE_TIMEOUT: float
+configure_generate_limits()
+
+_async_client = None
+
+def get_async_client() -> openai.AsyncOpenAI:
+    '''Get the shared async OpenAI client, backed by a pooled HTTP client'''
+    global _async_client
+    if _async_client is None:
+        _async_client = openai.AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY") or openai.api_key,
+            http_client=httpx.AsyncClient(limits=pool_limits(), timeout=pool_timeout())
+        )
+    return _async_client
+
+def set_async_client(client: Optional[openai.AsyncOpenAI]):
+    '''Replace the shared async client, e.g. to point at a stand-in server'''
+    global _async_client
+    _async_client = client
+
+async def stream_completion(prompt: str) -> AsyncIterator[str]:
+    '''Yield completion tokens as the provider produces them'''
+    await get_provider_limiter("openai").acquire(estimate_tokens(prompt))
+    with metrics.model(MODEL_NAME).track(estimate_tokens(prompt)) as call:
+        stream = await get_async_client().chat.completions.create(
+            model=MODEL_NAME,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                call.completion_tokens += 1
+                yield chunk.choices[0].delta.content
+
+async def gated_stream(prompt: str) -> AsyncIterator[str]:
+    '''
+    Stream completion tokens within the /generate concurrency cap
+
+    The slot is held until the stream ends; waiting for it and streaming
+    share the GENERATE_TIMEOUT budget.
+
+    :raises Overloaded: If too many requests already wait for a slot
+    :raises asyncio.TimeoutError: If the stream does not finish in time
+    '''
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + GENERATE_TIMEOUT
+    async with AsyncExitStack() as stack:
+        await asyncio.wait_for(stack.enter_async_context(generate_gate.slot()), GENERATE_TIMEOUT)
+        tokens = stream_completion(prompt)
+        stack.push_async_callback(tokens.aclose)
+        while True:
+            try:
+                token = await asyncio.wait_for(tokens.__anext__(), deadline - loop.time())
+            except StopAsyncIteration:
+                return
+            yield token
+
+def stream_error(error: Exception) -> str:
+    '''Message of a streaming failure, matching the /generate status details'''
+    if isinstance(error, Overloaded):
+        return f"Server overloaded: {error}"
+    if isinstance(error, asyncio.TimeoutError):
+        return "AI API Error: request timed out"
+    return f"AI API Error: {error}"
+
+def sse_event(event: str, data: dict) -> str:
+    '''Format a Server-Sent Events message'''
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def complete(prompt: str) -> str:
+    '''Request a whole completion within the /generate concurrency cap'''
+    async with generate_gate.slot():
+        await get_provider_limiter("openai").acquire(estimate_tokens(prompt))
+        with metrics.model(MODEL_NAME).track(estimate_tokens(prompt)) as call:
+            response = await get_async_client().chat.completions.create(
+                model=MODEL_NAME,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            output = response.choices[0].message.content
+            call.completion_tokens = estimate_tokens(output or "")
+    return output
+
 @app.post("/generate")
 async def generate_ai_response(request: dict):
-    user_prompt = request.get("prompt", "Explain how AI improves workflow automation in business.")
+    user_prompt = request.get("prompt", DEFAULT_PROMPT)
 
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": user_prompt}]
+        ai_output = await asyncio.wait_for(
+            generate_flight.do((MODEL_NAME, user_prompt), lambda: complete(user_prompt)),
+            GENERATE_TIMEOUT
         )
-        ai_output = response.choices[0].message.content
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=f"Server overloaded: {e}", headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="AI API Error: request timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI API Error: {e}")
 
     return {"input": user_prompt, "output": ai_output}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    '''Export per-model and per-phase statistics in the Prometheus text format'''
+    gate = generate_gate
+    lines = [
+        "# HELP spark_generate_active Completions running for /generate",
+        "# TYPE spark_generate_active gauge",
+        f"spark_generate_active {gate.active}",
+        "# HELP spark_generate_queued Requests waiting for a /generate slot",
+        "# TYPE spark_generate_queued gauge",
+        f"spark_generate_queued {gate.waiting}",
+        "# HELP spark_generate_rejected_total Requests shed with 503",
+        "# TYPE spark_generate_rejected_total counter",
+        f"spark_generate_rejected_total {gate.rejected}"
+    ]
+    if _job_queue is not None:
+        stats = _job_queue.stats()
+        lines += [
+            "# HELP spark_jobs_queued Jobs waiting for a worker",
+            "# TYPE spark_jobs_queued gauge",
+            f"spark_jobs_queued {stats['queued']}",
+            "# HELP spark_jobs_running Jobs being executed",
+            "# TYPE spark_jobs_running gauge",
+            f"spark_jobs_running {stats['running']}"
+        ]
+    body = render_prometheus() + "\n".join(lines) + "\n"
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+@app.post("/generate/stream")
+async def stream_ai_response(request: dict):
+    '''Stream completion tokens as Server-Sent Events'''
+    user_prompt = request.get("prompt", DEFAULT_PROMPT)
+    # Shed load before the response starts; the slot is taken by the stream
+    try:
+        generate_gate.check()
+    except Overloaded as e:
+        raise HTTPException(status_code=503, detail=f"Server overloaded: {e}", headers={"Retry-After": "1"})
+
+    async def events():
+        chunks = []
+        try:
+            # Closed explicitly so a disconnecting client frees the slot at once
+            async with aclosing(gated_stream(user_prompt)) as tokens:
+                async for token in tokens:
+                    chunks.append(token)
+                    yield sse_event("token", {"content": token})
+        except Exception as e:
+            yield sse_event("error", {"detail": stream_error(e)})
+            return
+        yield sse_event("done", {"input": user_prompt, "output": "".join(chunks)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _get_job(job_id: str):
+    job = (await get_job_queue()).get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+@app.post("/jobs", status_code=202)
+async def submit_job(project_spec: dict):
+    '''Queue a project for execution and return its job id immediately'''
+    try:
+        job = await (await get_job_queue()).submit(project_spec)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Job queue full: {e}", headers={"Retry-After": "5"})
+    return {"job_id": job.id, "status": job.status}
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    '''Get a job's status and per-phase timeline progress'''
+    return jsonable_encoder((await _get_job(job_id)).snapshot())
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    '''Get the result of a finished job'''
+    job = await _get_job(job_id)
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+    return jsonable_encoder({
+        "job_id": job.id,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error
+    })
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, since: int = 0):
+    '''
+    Stream a job's progress as Server-Sent Events
+
+    Past events are replayed first (skip them with ``since``); the stream
+    ends with a "job_finished" event.
+    '''
+    job = await _get_job(job_id)
+
+    async def events():
+        async for event in job.follow(since):
+            yield sse_event(event["event"], jsonable_encoder(event))
+        yield sse_event("job_finished", jsonable_encoder({
+            "job_id": job.id, "status": job.status, "error": job.error
+        }))
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    '''Cancel a queued or running job'''
+    await _get_job(job_id)
+    job = await (await get_job_queue()).cancel(job_id)
+    return {"job_id": job.id, "status": job.status}
+
+@app.websocket("/ws/generate")
+async def websocket_generate(websocket: WebSocket):
+    '''Stream completion tokens over a WebSocket, one prompt per message'''
+    await websocket.accept()
+    try:
+        while True:
+            request = await websocket.receive_json()
+            user_prompt = request.get("prompt", DEFAULT_PROMPT)
+            chunks = []
+            try:
+                async with aclosing(gated_stream(user_prompt)) as tokens:
+                    async for token in tokens:
+                        chunks.append(token)
+                        await websocket.send_json({"type": "token", "content": token})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                await websocket.send_json({"type": "error", "detail": stream_error(e)})
+                continue
+            await websocket.send_json({"type": "done", "input": user_prompt, "output": "".join(chunks)})
+    except WebSocketDisconnect:
+        pass
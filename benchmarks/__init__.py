@@ -0,0 +1,3 @@
+"""
+Offline performance benchmarks, run with ``python -m benchmarks.<name>``
+"""
@@ -0,0 +1,192 @@
+"""
+End-to-end benchmark of DetailedAIWorkflowEngine.execute_project on the
+deterministic fake provider
+
+Runs every workflow shape at every concurrency level and reports project
+throughput, latency percentiles and the engine's own overhead per phase
+(measured with a zero-latency model, so it excludes simulated model time).
+
+    python -m benchmarks.bench_engine --projects 200 --concurrency 1,10,50 --phases 4
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, Any, List, Optional
+
+from ai.models.retry import RetryPolicy
+from ai.workflow_engine import DetailedAIWorkflowEngine
+from core.phases.base_phase import LLMPhase
+from core.registries import PhaseRegistry, PhaseConfig, WorkflowType, ModelConfig
+
+SHAPES = ("chain", "fanout", "parallel")
+
+class BenchPhase(LLMPhase):
+    """Sends one prompt naming the phase and the project topic"""
+
+    def build_prompt(self, input_data: Dict[str, Any]) -> str:
+        return f"{self.config.phase_name}: {input_data.get('topic', '')}"
+
+def build_workflow(shape: str, phases: int) -> WorkflowType:
+    '''
+    Build a workflow of ``phases`` BenchPhases
+
+    chain: each phase depends on the previous one; fanout: one root, parallel
+    middle phases and a join; parallel: independent phases
+    '''
+    names = [f"bench_{i}" for i in range(phases)]
+    for name in names:
+        if name not in PhaseRegistry._phases:
+            PhaseRegistry.register(name, BenchPhase)
+
+    def depends_on(i: int) -> Optional[List[str]]:
+        if shape == "chain":
+            return None
+        if shape == "parallel" or i == 0:
+            return []
+        if i == phases - 1 and phases > 2:
+            return names[1:-1]
+        return [names[0]]
+
+    return WorkflowType(
+        type_code=f"bench_{shape}",
+        name=f"Benchmark {shape}",
+        description=f"Benchmark workflow shaped as a {shape}",
+        phases=[
+            PhaseConfig(
+                phase_number=i + 1,
+                phase_name=name,
+                description=f"Benchmark phase {i}",
+                required_capabilities=["bench"],
+                prompt_template="",
+                model_id="bench",
+                depends_on=depends_on(i)
+            )
+            for i, name in enumerate(names)
+        ]
+    )
+
+async def build_engine(shape: str, phases: int, model: Dict[str, Any], concurrency: int) -> DetailedAIWorkflowEngine:
+    engine = DetailedAIWorkflowEngine(max_concurrency=concurrency)
+    await engine.model_registry.register_model(ModelConfig(
+        model_id="bench",
+        provider="fake",
+        model_name="bench",
+        version="1.0",
+        capabilities=["bench"],
+        parameters=model,
+        retry=RetryPolicy(max_attempts=5, base_delay=0.01),
+        coalesce_requests=False
+    ))
+    await engine.workflow_registry.register_workflow(build_workflow(shape, phases))
+    return engine
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+async def run_projects(engine: DetailedAIWorkflowEngine, shape: str, projects: int, concurrency: int) -> Dict[str, Any]:
+    '''Execute ``projects`` projects, at most ``concurrency`` at once'''
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def run(i: int):
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await engine.execute_project({
+                    "workflow_type": f"bench_{shape}",
+                    "topic": f"project {i}"
+                })
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(i) for i in range(projects)))
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "projects_per_sec": projects / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000,
+        "failures": failures
+    }
+
+async def measure_overhead(shape: str, phases: int, projects: int) -> float:
+    '''Engine time per phase in microseconds with an instant model'''
+    engine = await build_engine(shape, phases, {"latency": 0.0}, 1)
+    result = await run_projects(engine, shape, projects, 1)
+    return result["seconds"] / (projects * phases) * 1e6
+
+async def run_benchmark(
+    shapes: List[str],
+    concurrency_levels: List[int],
+    projects: int,
+    phases: int,
+    model: Dict[str, Any]
+) -> List[Dict[str, Any]]:
+    '''Run every shape at every concurrency level'''
+    rows = []
+    for shape in shapes:
+        overhead = await measure_overhead(shape, phases, min(projects, 50))
+        for concurrency in concurrency_levels:
+            engine = await build_engine(shape, phases, model, concurrency)
+            result = await run_projects(engine, shape, projects, concurrency)
+            rows.append({
+                "shape": shape,
+                "phases": phases,
+                "concurrency": concurrency,
+                "projects": projects,
+                "overhead_us_per_phase": overhead,
+                **result
+            })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the workflow engine offline")
+    parser.add_argument("--projects", type=int, default=100)
+    parser.add_argument("--phases", type=int, default=4)
+    parser.add_argument("--concurrency", default="1,10,50", help="Comma-separated concurrency levels")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help=f"Comma-separated of {SHAPES}")
+    parser.add_argument("--latency", type=float, default=0.02, help="Mean model latency in seconds")
+    parser.add_argument("--distribution", default="lognormal", help="Model latency distribution")
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    model = {
+        "latency": args.latency,
+        "latency_distribution": args.distribution,
+        "tokens_per_second": args.tokens_per_second,
+        "error_rate": args.error_rate,
+        "seed": args.seed
+    }
+    rows = asyncio.run(run_benchmark(
+        [shape for shape in args.shapes.split(",") if shape],
+        [int(level) for level in args.concurrency.split(",")],
+        args.projects,
+        args.phases,
+        model
+    ))
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'shape':>8} {'conc':>5} {'proj/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'fail':>5} {'overhead us/phase':>18}")
+    for row in rows:
+        print(f"{row['shape']:>8} {row['concurrency']:>5} {row['projects_per_sec']:>9.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+              f"{row['failures']:>5} {row['overhead_us_per_phase']:>18.1f}")
+
+if __name__ == "__main__":
+    main()
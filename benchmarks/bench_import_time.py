@@ -0,0 +1,87 @@
+"""
+Measure module import time with ``python -X importtime``
+
+Each module is imported in a fresh interpreter; the report lists the total
+import time and the slowest modules pulled in. With --budget-ms the exit
+status is non-zero if any module exceeds its budget, so the check can run
+in CI.
+
+    python -m benchmarks.bench_import_time main ai.workflow_engine --budget-ms 500
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, Any, List, Optional
+
+# Modules that must never be imported just to start the CLI
+HEAVY_MODULES = ("langchain_openai", "langchain_core", "openai", "asyncpg", "httpx", "fastapi", "numpy")
+
+def measure_import(module: str, repeat: int = 3) -> Dict[str, Any]:
+    '''
+    Import ``module`` in fresh interpreters and parse the -X importtime report
+
+    :param module: Module to import
+    :param repeat: Interpreter runs; the fastest is reported
+    :return: Total import time, the slowest modules and the heavy modules loaded
+    '''
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            check=True
+        )
+        entries = []
+        for line in completed.stderr.splitlines():
+            if not line.startswith("import time:"):
+                continue
+            _, cumulative_us, name = line[len("import time:"):].split("|")
+            if cumulative_us.strip().isdigit():
+                entries.append((name.rstrip(), int(cumulative_us)))
+
+        # -X importtime prints in post-order, nested imports indented deeper:
+        # the module's subtree is the run of deeper entries right before it
+        end = max(i for i, (name, _) in enumerate(entries) if name.strip() == module)
+        depth = len(entries[end][0]) - len(entries[end][0].lstrip())
+        start = end
+        while start > 0 and len(entries[start - 1][0]) - len(entries[start - 1][0].lstrip()) > depth:
+            start -= 1
+        imports = [(name.strip(), us) for name, us in entries[start:end + 1]]
+
+        total_us = imports[-1][1]
+        loaded = {name for name, _ in imports}
+        result = {
+            "module": module,
+            "total_ms": total_us / 1000,
+            "slowest": sorted(imports, key=lambda item: item[1], reverse=True)[1:11],
+            "heavy_modules": sorted(name for name in HEAVY_MODULES if name in loaded)
+        }
+        if best is None or result["total_ms"] < best["total_ms"]:
+            best = result
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure module import time")
+    parser.add_argument("modules", nargs="*", default=["main", "ai.workflow_engine"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, help="Fail if any module takes longer")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        result = measure_import(module, args.repeat)
+        print(f"{module}: {result['total_ms']:.1f} ms")
+        print(f"  heavy modules loaded: {', '.join(result['heavy_modules']) or 'none'}")
+        for name, us in result["slowest"]:
+            print(f"  {us / 1000:>8.1f} ms  {name}")
+        if args.budget_ms is not None and result["total_ms"] > args.budget_ms:
+            print(f"  over budget of {args.budget_ms:.0f} ms")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
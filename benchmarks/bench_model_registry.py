@@ -0,0 +1,90 @@
+"""
+Benchmark AIModelRegistry.find_best_model with thousands of registered models
+
+Compares the indexed lookup against the previous linear scan, which rebuilt
+a capability set for every model on every call.
+
+    python -m benchmarks.bench_model_registry --models 5000 --lookups 2000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from core.registries.model_registry import AIModelRegistry, ModelConfig
+
+def linear_find_best_model(registry: AIModelRegistry, requirements: Dict[str, Any]) -> Optional[str]:
+    '''The original linear-scan lookup, kept as a baseline'''
+    best_model, best_score = None, 0.0
+    req_capabilities = set(requirements.get("capabilities", []))
+    for model_id, data in registry._models.items():
+        config = data["config"]
+        if config.status != "active":
+            continue
+        score = len(req_capabilities & set(config.capabilities)) / len(req_capabilities)
+        if score > best_score:
+            best_score, best_model = score, model_id
+    return best_model
+
+async def build_registry(models: int, capabilities: int, per_model: int, seed: int) -> AIModelRegistry:
+    '''Register ``models`` models with random capability subsets'''
+    rng = random.Random(seed)
+    pool = [f"capability-{i}" for i in range(capabilities)]
+    registry = AIModelRegistry()
+    for i in range(models):
+        await registry.register_model(ModelConfig(
+            model_id=f"model-{i}",
+            provider="openai",
+            model_name="gpt-4",
+            version="1.0",
+            capabilities=rng.sample(pool, per_model),
+            parameters={}
+        ))
+    return registry
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    registry = await build_registry(args.models, args.capabilities, args.per_model, args.seed)
+    rng = random.Random(args.seed + 1)
+    pool = [f"capability-{i}" for i in range(args.capabilities)]
+    queries = [{"capabilities": rng.sample(pool, args.required)} for _ in range(args.lookups)]
+
+    async def linear(query):
+        return linear_find_best_model(registry, query)
+
+    async def indexed(query):
+        return await registry.find_best_model(query)
+
+    async def load_aware(query):
+        return await registry.find_best_model(query, routing="load_aware")
+
+    results = []
+    for name, lookup in (("linear", linear), ("indexed", indexed), ("load_aware", load_aware)):
+        start = time.perf_counter()
+        for query in queries:
+            await lookup(query)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "mode": name,
+            "lookups_per_sec": len(queries) / elapsed,
+            "us_per_lookup": elapsed / len(queries) * 1e6
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark model capability lookup")
+    parser.add_argument("--models", type=int, default=5000)
+    parser.add_argument("--capabilities", type=int, default=200, help="Distinct capabilities")
+    parser.add_argument("--per-model", type=int, default=5, help="Capabilities per model")
+    parser.add_argument("--required", type=int, default=2, help="Capabilities per lookup")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{args.models} models, {args.capabilities} capabilities, {args.lookups} lookups")
+    for row in asyncio.run(run(args)):
+        print(f"{row['mode']:>10}: {row['lookups_per_sec']:>12,.0f} lookups/s  {row['us_per_lookup']:>9.1f} us/lookup")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark WorkflowRegistry.identify_workflow_type with thousands of workflows
+
+Registers synthetic workflows whose descriptions mix a few topic words, then
+classifies project descriptions drawn from the same topics and reports
+lookup latency and how often the source workflow was identified.
+
+    python -m benchmarks.bench_workflow_routing --workflows 5000 --lookups 2000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict
+
+from core.registries.phase_registry import PhaseConfig
+from core.registries.workflow_registry import WorkflowRegistry, WorkflowType
+
+def vocabulary(size: int, seed: int):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(size)]
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    words = vocabulary(args.vocabulary, args.seed)
+    registry = WorkflowRegistry()
+    phase = PhaseConfig(
+        phase_number=1,
+        phase_name="input_analysis",
+        description="Analyze",
+        required_capabilities=[],
+        prompt_template=""
+    )
+
+    descriptions = []
+    start = time.perf_counter()
+    for i in range(args.workflows):
+        description = " ".join(rng.sample(words, args.words))
+        descriptions.append(description)
+        await registry.register_workflow(WorkflowType(
+            type_code=f"workflow-{i}",
+            name=f"Workflow {i}",
+            description=description,
+            phases=[phase]
+        ))
+    register_seconds = time.perf_counter() - start
+
+    # Projects reuse most words of one workflow's description, in another order
+    queries = []
+    for _ in range(args.lookups):
+        source = rng.randrange(args.workflows)
+        picked = descriptions[source].split()
+        rng.shuffle(picked)
+        queries.append((source, " ".join(picked[:max(1, len(picked) * 3 // 4)])))
+
+    hits = 0
+    start = time.perf_counter()
+    for source, query in queries:
+        if await registry.identify_workflow_type(query) == f"workflow-{source}":
+            hits += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "register_us_per_workflow": register_seconds / args.workflows * 1e6,
+        "us_per_lookup": elapsed / len(queries) * 1e6,
+        "lookups_per_sec": len(queries) / elapsed,
+        "accuracy": hits / len(queries)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark workflow type identification")
+    parser.add_argument("--workflows", type=int, default=5000)
+    parser.add_argument("--vocabulary", type=int, default=2000, help="Distinct description words")
+    parser.add_argument("--words", type=int, default=8, help="Words per workflow description")
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    print(f"{args.workflows} workflows, {args.lookups} lookups")
+    print(f"register: {result['register_us_per_workflow']:.1f} us/workflow")
+    print(f"identify: {result['us_per_lookup']:.1f} us/lookup ({result['lookups_per_sec']:,.0f}/s), "
+          f"accuracy {result['accuracy']:.1%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Minimal stand-in for the OpenAI chat completions API
+
+Serves POST /v1/chat/completions with a configurable latency so the
+backend can be load tested without network access or API keys.
+"""
+
+import asyncio
+import random
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+
+def create_fake_openai_app(latency: float = 0.05, jitter: float = 0.0, seed: int = 0) -> FastAPI:
+    """
+    Build the fake API
+
+    :param latency: Mean seconds per completion
+    :param jitter: Uniform +/- seconds added to the latency
+    :param seed: Seed of the latency jitter
+    :return: ASGI app
+    """
+    app = FastAPI()
+    rng = random.Random(seed)
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        await asyncio.sleep(max(0.0, latency + rng.uniform(-jitter, jitter)))
+        prompt = body["messages"][-1]["content"]
+        content = f"Echo: {prompt}"
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt) // 4 + 1,
+                "completion_tokens": len(content) // 4 + 1,
+                "total_tokens": (len(prompt) + len(content)) // 4 + 2
+            }
+        }
+
+    return app
@@ -0,0 +1,98 @@
+"""
+Load test POST /generate against a fake OpenAI server
+
+Both the backend and the fake API run in-process over ASGI transports, so
+the test needs no network access. Pass --url to load test a running
+server instead.
+
+    python -m benchmarks.load_generate --requests 2000 --concurrency 200 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+import httpx
+import openai
+
+from backend import websocket_server
+from benchmarks.fake_openai import create_fake_openai_app
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+async def run_load(client: httpx.AsyncClient, requests: int, concurrency: int, unique_prompts: int) -> Dict[str, Any]:
+    '''Send ``requests`` POSTs from ``concurrency`` workers and summarize them'''
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    counter = iter(range(requests))
+
+    async def worker():
+        for i in counter:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/generate", json={"prompt": f"prompt {i % unique_prompts}"})
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests": requests,
+        "seconds": elapsed,
+        "rps": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "statuses": dict(statuses)
+    }
+
+async def main_async(args: argparse.Namespace) -> Dict[str, Any]:
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout) as client:
+            return await run_load(client, args.requests, args.concurrency, args.unique_prompts)
+
+    fake = create_fake_openai_app(latency=args.latency, jitter=args.jitter)
+    websocket_server.set_async_client(openai.AsyncOpenAI(
+        api_key="fake",
+        base_url="http://fake-openai/v1",
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake))
+    ))
+    websocket_server.configure_generate_limits(args.max_concurrency, args.max_queue, args.timeout)
+    try:
+        transport = httpx.ASGITransport(app=websocket_server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://backend", timeout=args.timeout) as client:
+            return await run_load(client, args.requests, args.concurrency, args.unique_prompts)
+    finally:
+        websocket_server.set_async_client(None)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test POST /generate")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100, help="Concurrent clients")
+    parser.add_argument("--unique-prompts", type=int, default=1_000_000,
+                        help="Distinct prompts; fewer means more coalescing")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake completion latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--max-concurrency", type=int, default=64, help="Backend concurrency cap")
+    parser.add_argument("--max-queue", type=int, default=256, help="Backend queue before 503s")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--url", help="Load test a running server instead of the in-process app")
+    args = parser.parse_args()
+
+    result = asyncio.run(main_async(args))
+    print(f"{result['requests']} requests in {result['seconds']:.2f}s")
+    print(f"RPS: {result['rps']:.1f}")
+    print(f"p50: {result['p50_ms']:.1f} ms  p99: {result['p99_ms']:.1f} ms  mean: {result['mean_ms']:.1f} ms")
+    print(f"Statuses: {result['statuses']}")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,23 @@
 # Core package initialization
 
-# Import key modules to make them easily accessible
-from . import registries
-from . import phases
-from . import timeline
-from . import database
-from . import loopback
+import importlib
 
+# Subpackages are imported on first attribute access (PEP 562), so importing
+# one of them does not pull in the others (e.g. asyncpg for core.database)
 __all__ = [
     'registries',
     'phases',
     'timeline',
     'database',
-    'loopback'
+    'loopback',
+    'embeddings',
+    'tracing'
 ]
+
+def __getattr__(name):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(f".{name}", __name__)
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,23 @@
+# Expose checkpoint stores, imported on first access (PEP 562)
+import importlib
+
+_exports = {
+    'CheckpointStore': '.store',
+    'FileCheckpointStore': '.store',
+    'SQLiteCheckpointStore': '.store',
+    'PostgresCheckpointStore': '.store',
+    'phase_fingerprint': '.store'
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,210 @@
+"""
+Checkpoint stores for resuming partially completed workflows
+"""
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Any, List
+
+from core.database import DatabaseManager
+
+# Spec keys that identify a run rather than describe the work
+_RUN_KEYS = ("run_id", "project_id")
+
+def phase_fingerprint(
+    phase_config: Dict[str, Any],
+    project_spec: Dict[str, Any],
+    dependency_fingerprints: List[str]
+) -> str:
+    """
+    Fingerprint everything that determines a phase result
+
+    A checkpoint is only reused when its fingerprint matches, so changing the
+    phase configuration, the project spec or any upstream phase invalidates it.
+
+    :param phase_config: Phase configuration as a dict
+    :param project_spec: Project specification
+    :param dependency_fingerprints: Fingerprints of the phase's dependencies
+    :return: Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        {
+            "phase": phase_config,
+            "spec": {k: v for k, v in project_spec.items() if k not in _RUN_KEYS},
+            "dependencies": dependency_fingerprints
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class CheckpointStore(ABC):
+    """Base class for phase checkpoint stores"""
+
+    @abstractmethod
+    async def save(self, run_id: str, phase_name: str, fingerprint: str, result: Dict[str, Any]):
+        """Store the result of a completed phase"""
+        pass
+
+    @abstractmethod
+    async def load(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Load all checkpoints of a run
+
+        :param run_id: Project run ID
+        :return: {phase_name: {"fingerprint": ..., "result": ...}}
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, run_id: str):
+        """Remove all checkpoints of a run"""
+        pass
+
+class FileCheckpointStore(CheckpointStore):
+    """
+    Stores checkpoints as one JSON file per phase under a run directory
+
+    Run ids and phase names are hashed into the directory and file names, so
+    caller-supplied values can never address paths outside the store.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def _path_component(name: str) -> str:
+        return hashlib.sha256(name.encode("utf-8")).hexdigest()
+
+    def _run_dir(self, run_id: str) -> Path:
+        return self.directory / self._path_component(run_id)
+
+    async def save(self, run_id: str, phase_name: str, fingerprint: str, result: Dict[str, Any]):
+        payload = json.dumps(
+            {"phase_name": phase_name, "fingerprint": fingerprint, "result": result}, default=str
+        )
+        await asyncio.to_thread(
+            self._write, self._run_dir(run_id), self._path_component(phase_name), payload
+        )
+
+    @staticmethod
+    def _write(run_dir: Path, file_stem: str, payload: str):
+        run_dir.mkdir(parents=True, exist_ok=True)
+        # Write then rename so a crash never leaves a truncated checkpoint
+        tmp = run_dir / f"{file_stem}.json.tmp"
+        tmp.write_text(payload)
+        tmp.replace(run_dir / f"{file_stem}.json")
+
+    async def load(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        return await asyncio.to_thread(self._read, self._run_dir(run_id))
+
+    @staticmethod
+    def _read(run_dir: Path) -> Dict[str, Dict[str, Any]]:
+        if not run_dir.is_dir():
+            return {}
+        checkpoints = {}
+        for path in run_dir.glob("*.json"):
+            checkpoint = json.loads(path.read_text())
+            checkpoints[checkpoint.pop("phase_name")] = checkpoint
+        return checkpoints
+
+    async def delete(self, run_id: str):
+        await asyncio.to_thread(self._remove, self._run_dir(run_id))
+
+    @staticmethod
+    def _remove(run_dir: Path):
+        if run_dir.is_dir():
+            for path in run_dir.iterdir():
+                path.unlink()
+            run_dir.rmdir()
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Stores checkpoints in a local SQLite database"""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS workflow_checkpoints ("
+            "run_id TEXT NOT NULL, phase_name TEXT NOT NULL, fingerprint TEXT NOT NULL, "
+            "result TEXT NOT NULL, PRIMARY KEY (run_id, phase_name))"
+        )
+        self._conn.commit()
+
+    def _execute(self, query: str, args: tuple) -> List[tuple]:
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+            self._conn.commit()
+            return rows
+
+    async def save(self, run_id: str, phase_name: str, fingerprint: str, result: Dict[str, Any]):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT OR REPLACE INTO workflow_checkpoints (run_id, phase_name, fingerprint, result) "
+            "VALUES (?, ?, ?, ?)",
+            (run_id, phase_name, fingerprint, json.dumps(result, default=str))
+        )
+
+    async def load(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        rows = await asyncio.to_thread(
+            self._execute,
+            "SELECT phase_name, fingerprint, result FROM workflow_checkpoints WHERE run_id = ?",
+            (run_id,)
+        )
+        return {name: {"fingerprint": fp, "result": json.loads(result)} for name, fp, result in rows}
+
+    async def delete(self, run_id: str):
+        await asyncio.to_thread(
+            self._execute, "DELETE FROM workflow_checkpoints WHERE run_id = ?", (run_id,)
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class PostgresCheckpointStore(CheckpointStore):
+    """Stores checkpoints in Postgres through the shared DatabaseManager pool"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS workflow_checkpoints (
+        run_id TEXT NOT NULL,
+        phase_name TEXT NOT NULL,
+        fingerprint TEXT NOT NULL,
+        result JSONB NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        PRIMARY KEY (run_id, phase_name)
+    )
+    """
+
+    async def ensure_schema(self):
+        """Create the checkpoint table if it does not exist"""
+        await DatabaseManager.execute_query(self.SCHEMA)
+
+    async def save(self, run_id: str, phase_name: str, fingerprint: str, result: Dict[str, Any]):
+        await DatabaseManager.execute_query(
+            "INSERT INTO workflow_checkpoints (run_id, phase_name, fingerprint, result) "
+            "VALUES ($1, $2, $3, $4) "
+            "ON CONFLICT (run_id, phase_name) DO UPDATE "
+            "SET fingerprint = EXCLUDED.fingerprint, result = EXCLUDED.result, created_at = now()",
+            run_id, phase_name, fingerprint, json.dumps(result, default=str)
+        )
+
+    async def load(self, run_id: str) -> Dict[str, Dict[str, Any]]:
+        rows = await DatabaseManager.fetch(
+            "SELECT phase_name, fingerprint, result FROM workflow_checkpoints WHERE run_id = $1",
+            run_id
+        )
+        return {
+            row["phase_name"]: {"fingerprint": row["fingerprint"], "result": json.loads(row["result"])}
+            for row in rows
+        }
+
+    async def delete(self, run_id: str):
+        await DatabaseManager.execute_query(
+            "DELETE FROM workflow_checkpoints WHERE run_id = $1", run_id
+        )
@@ -1,25 +1,116 @@
-import asyncpg
+import asyncio
 import os
-from typing import Dict, Any, List
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional, AsyncIterator, Iterable, TYPE_CHECKING
+
+# asyncpg is imported on first use so importing this module stays cheap
+if TYPE_CHECKING:
+    import asyncpg
+
+def _connection_options() -> Dict[str, Any]:
+    '''Connection settings from the DB_* environment variables'''
+    return {
+        "database": os.getenv("DB_NAME", "spark_db"),
+        "user": os.getenv("DB_USER", "postgres"),
+        "password": os.getenv("DB_PASSWORD", "your_password"),
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": os.getenv("DB_PORT", "5432")
+    }
+
+def _pool_options() -> Dict[str, Any]:
+    '''Pool settings from the DB_POOL_* environment variables'''
+    command_timeout = os.getenv("DB_COMMAND_TIMEOUT")
+    return {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        "statement_cache_size": int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100")),
+        "max_inactive_connection_lifetime": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        "command_timeout": float(command_timeout) if command_timeout else None
+    }
 
 async def get_db_connection():
-    '''Get database connection'''
-    return await asyncpg.connect(
-        database=os.getenv("DB_NAME", "spark_db"),
-        user=os.getenv("DB_USER", "postgres"),
-        password=os.getenv("DB_PASSWORD", "your_password"),
-        host=os.getenv("DB_HOST", "localhost"),
-        port=os.getenv("DB_PORT", "5432")
-    )
+    '''Get a standalone database connection outside the pool'''
+    import asyncpg
+
+    return await asyncpg.connect(**_connection_options())
 
 class DatabaseManager:
-    '''Database operations manager'''
-    
-    @staticmethod
-    async def execute_query(query: str, *args) -> Any:
+    '''Database operations manager backed by a shared connection pool'''
+
+    _pool: Optional["asyncpg.Pool"] = None
+    _pool_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    async def init_pool(cls, **options) -> "asyncpg.Pool":
+        '''
+        Create the shared connection pool if it does not exist yet
+
+        :param options: Overrides for asyncpg.create_pool arguments
+        :return: The shared pool
+        '''
+        if cls._pool is not None:
+            return cls._pool
+
+        if cls._pool_lock is None:
+            cls._pool_lock = asyncio.Lock()
+        async with cls._pool_lock:
+            if cls._pool is None:
+                import asyncpg
+
+                cls._pool = await asyncpg.create_pool(
+                    **{**_connection_options(), **_pool_options(), **options}
+                )
+        return cls._pool
+
+    @classmethod
+    async def close_pool(cls):
+        '''Close the shared pool, waiting for connections to be released'''
+        pool, cls._pool = cls._pool, None
+        if pool is not None:
+            await pool.close()
+
+    @classmethod
+    @asynccontextmanager
+    async def acquire(cls) -> AsyncIterator["asyncpg.Connection"]:
+        '''Acquire a pooled connection for the duration of the block'''
+        pool = await cls.init_pool()
+        async with pool.acquire() as conn:
+            yield conn
+
+    @classmethod
+    @asynccontextmanager
+    async def transaction(cls) -> AsyncIterator["asyncpg.Connection"]:
+        '''Run the block in a transaction on a pooled connection'''
+        async with cls.acquire() as conn:
+            async with conn.transaction():
+                yield conn
+
+    @classmethod
+    async def execute_query(cls, query: str, *args) -> Any:
         '''Execute database query'''
-        conn = await get_db_connection()
-        try:
+        async with cls.acquire() as conn:
             return await conn.execute(query, *args)
-        finally:
-            await conn.close()
\ No newline at end of file
+
+    @classmethod
+    async def executemany(cls, query: str, args: Iterable[tuple]) -> None:
+        '''Execute a statement once per argument tuple'''
+        async with cls.acquire() as conn:
+            await conn.executemany(query, args)
+
+    @classmethod
+    async def fetch(cls, query: str, *args) -> List["asyncpg.Record"]:
+        '''Fetch all rows of a query'''
+        async with cls.acquire() as conn:
+            return await conn.fetch(query, *args)
+
+    @classmethod
+    async def fetchrow(cls, query: str, *args) -> Optional["asyncpg.Record"]:
+        '''Fetch the first row of a query'''
+        async with cls.acquire() as conn:
+            return await conn.fetchrow(query, *args)
+
+    @classmethod
+    async def fetchval(cls, query: str, *args) -> Any:
+        '''Fetch a single value of a query'''
+        async with cls.acquire() as conn:
+            return await conn.fetchval(query, *args)
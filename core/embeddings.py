@@ -0,0 +1,218 @@
+"""
+Text embeddings and an in-memory cosine-similarity index
+"""
+
+import math
+import re
+import zlib
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Words too common to tell descriptions apart
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or our that the this to with "
+    "about me my we you your".split()
+)
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words without stop words, with a trailing plural "s" removed"""
+    return [
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in _TOKEN.findall(text.lower())
+        if word not in STOP_WORDS
+    ]
+
+class Embedder:
+    """
+    Maps texts to fixed-size vectors
+
+    Subclasses set ``dim`` and implement ``embed``; any object with both can
+    be passed where an embedder is expected, e.g. a wrapper around a hosted
+    embedding model.
+    """
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed texts
+
+        :param texts: Texts to embed
+        :return: float32 array of shape (len(texts), dim)
+        """
+        raise NotImplementedError("Subclasses must implement embed method")
+
+class HashingEmbedder(Embedder):
+    """
+    Offline embedder hashing word n-grams into a fixed number of buckets
+
+    Tokens are lowercased words without stop words; each n-gram adds a
+    signed, sublinearly scaled count to the bucket given by its CRC32, which
+    is stable across processes. No model or vocabulary is needed, so texts can be embedded
+    one at a time as they arrive.
+    """
+
+    def __init__(self, dim: int = 512, ngrams: int = 2):
+        """
+        Initialize the embedder
+
+        :param dim: Number of buckets, a power of two
+        :param ngrams: Longest word n-gram hashed
+        """
+        if dim < 1 or dim & (dim - 1):
+            raise ValueError("dim must be a power of two")
+        self.dim = dim
+        self.ngrams = ngrams
+
+    def features(self, text: str) -> Dict[int, float]:
+        """Bucket weights of one text"""
+        words = tokenize(text)
+        counts: Dict[int, float] = {}
+        for n in range(1, self.ngrams + 1):
+            for i in range(len(words) - n + 1):
+                h = zlib.crc32(" ".join(words[i:i + n]).encode("utf-8"))
+                # Low bits choose the bucket, the top bit the sign, so
+                # colliding n-grams tend to cancel out rather than add up
+                bucket = h & (self.dim - 1)
+                counts[bucket] = counts.get(bucket, 0.0) + (1.0 if h >> 31 else -1.0)
+        return {bucket: math.copysign(1 + math.log(abs(c)), c) for bucket, c in counts.items() if c}
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, weight in self.features(text).items():
+                vectors[row, bucket] = weight
+        return vectors
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length; zero rows stay zero"""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+class VectorIndex:
+    """
+    Keyed unit vectors in one contiguous matrix, searched by cosine similarity
+
+    Rows are stored normalized, so a search is a single matrix-vector
+    product. Adding grows the matrix geometrically and removing moves the
+    last row into the gap, both amortized O(dim).
+    """
+
+    def __init__(self, dim: int, capacity: int = 64):
+        """
+        Initialize the index
+
+        :param dim: Vector dimension
+        :param capacity: Rows allocated up front
+        """
+        self.dim = dim
+        self._matrix = np.zeros((max(1, capacity), dim), dtype=np.float32)
+        self._keys: List[Hashable] = []
+        self._rows: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._rows
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Normalized vectors, one row per key in ``keys`` order"""
+        return self._matrix[:len(self._keys)]
+
+    @property
+    def keys(self) -> List[Hashable]:
+        return list(self._keys)
+
+    def add(self, key: Hashable, vector: np.ndarray):
+        """
+        Add or replace the vector of a key
+
+        :param key: Key returned by searches
+        :param vector: Vector of shape (dim,)
+        """
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._keys)
+            if row == len(self._matrix):
+                grown = np.zeros((2 * len(self._matrix), self.dim), dtype=np.float32)
+                grown[:row] = self._matrix
+                self._matrix = grown
+            self._keys.append(key)
+            self._rows[key] = row
+        self._matrix[row] = normalize(vector)
+
+    def remove(self, key: Hashable) -> bool:
+        """
+        Remove a key
+
+        :param key: Key to remove
+        :return: Whether the key was present
+        """
+        row = self._rows.pop(key, None)
+        if row is None:
+            return False
+        last = len(self._keys) - 1
+        if row != last:
+            moved = self._keys[last]
+            self._matrix[row] = self._matrix[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+        self._keys.pop()
+        return True
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = 1,
+        threshold: Optional[float] = None
+    ) -> List[Tuple[Hashable, float]]:
+        """
+        Find the keys most similar to a vector
+
+        :param vector: Query vector of shape (dim,)
+        :param k: Maximum number of matches
+        :param threshold: Minimum cosine similarity of a match
+        :return: (key, similarity) pairs, most similar first
+        """
+        return self.search_many(np.asarray(vector)[None, :], k=k, threshold=threshold)[0]
+
+    def search_many(
+        self,
+        vectors: np.ndarray,
+        k: int = 1,
+        threshold: Optional[float] = None
+    ) -> List[List[Tuple[Hashable, float]]]:
+        """
+        Find the keys most similar to each of several vectors with one
+        matrix product
+
+        :param vectors: Query vectors of shape (n, dim)
+        :param k: Maximum number of matches per query
+        :param threshold: Minimum cosine similarity of a match
+        :return: For each query, (key, similarity) pairs, most similar first
+        """
+        count = len(self._keys)
+        if not count or k < 1:
+            return [[] for _ in range(len(vectors))]
+        scores = normalize(vectors) @ self._matrix[:count].T
+        if k == 1:
+            top = np.argmax(scores, axis=1)[:, None]
+        elif k < count:
+            top = np.argpartition(-scores, k, axis=1)[:, :k]
+            order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+        else:
+            top = np.argsort(-scores, axis=1, kind="stable")
+        return [
+            [
+                (self._keys[col], float(row_scores[col]))
+                for col in row_top
+                if threshold is None or row_scores[col] >= threshold
+            ]
+            for row_scores, row_top in zip(scores, top)
+        ]
@@ -1,7 +1,20 @@
-# Import loopback manager for easy access
-from .loopback import loopback_manager, LoopbackManager
+# Expose the loopback manager, imported on first access (PEP 562)
+import importlib
 
-__all__ = [
-    'loopback_manager',
-    'LoopbackManager'
-]
+_exports = {
+    'loopback_manager': '.loopback',
+    'LoopbackManager': '.loopback'
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
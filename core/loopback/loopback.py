@@ -2,76 +2,578 @@
 Loopback Mechanism for AI Workflow Responses
 """
 
+import asyncio
+import itertools
+import json
 import logging
-from typing import Dict, Any
+import os
+import re
+import tempfile
+import time
+from collections import deque
+from fnmatch import fnmatchcase
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+from core.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
+# What a full queue does with a new response: wait for a consumer, discard
+# the oldest queued response, or append the response to a file on disk
+OVERFLOW_POLICIES = ("block", "drop_oldest", "spill")
+
+class _SpillFile:
+    """Responses appended to a JSON-lines file and read back in order"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.pending = 0
+        self._offset = 0
+
+    def append(self, response: Any):
+        # A new spill truncates whatever a previous process left behind
+        with open(self.path, "a" if self.pending else "w", encoding="utf-8") as f:
+            f.write(json.dumps(response, default=str) + "\n")
+        self.pending += 1
+
+    def pop(self) -> Any:
+        with open(self.path, "r", encoding="utf-8") as f:
+            f.seek(self._offset)
+            line = f.readline()
+            self._offset = f.tell()
+        self.pending -= 1
+        if not self.pending:
+            # Everything was read back; start the next spill from an empty file
+            os.remove(self.path)
+            self._offset = 0
+        return json.loads(line)
+
+class WorkflowQueue:
+    """
+    Bounded FIFO of undelivered responses for one workflow
+
+    Responses spilled to disk stay behind the ones held in memory, and new
+    responses keep spilling until the spilled ones have been consumed, so
+    delivery order always matches send order.
+    """
+
+    def __init__(self, workflow_id: str, max_size: int, overflow: str, spill_dir: str):
+        """
+        Initialize the queue
+
+        :param workflow_id: Workflow the queue belongs to
+        :param max_size: Responses held in memory
+        :param overflow: One of OVERFLOW_POLICIES
+        :param spill_dir: Directory of the spill file of the "spill" policy
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.workflow_id = workflow_id
+        self.max_size = max_size
+        self.overflow = overflow
+        self.spill_dir = spill_dir
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self._spill: Optional[_SpillFile] = None
+        self._stats = {
+            "enqueued": 0, "delivered": 0, "dropped": 0, "spilled": 0, "max_depth": 0, "blocked_seconds": 0.0
+        }
+
+    @property
+    def depth(self) -> int:
+        """Responses waiting, in memory and on disk"""
+        return self._queue.qsize() + (self._spill.pending if self._spill else 0)
+
+    async def put(self, response: Any):
+        """
+        Queue a response, applying the overflow policy when full
+
+        :param response: Response to queue
+        """
+        spilling = self._spill is not None and self._spill.pending
+        if spilling or (self._queue.full() and self.overflow == "spill"):
+            if self._spill is None:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                name = re.sub(r"[^A-Za-z0-9_.-]", "_", self.workflow_id)
+                self._spill = _SpillFile(os.path.join(self.spill_dir, f"{name}-{os.getpid()}-{id(self)}.jsonl"))
+            self._spill.append(response)
+            self._stats["spilled"] += 1
+        elif self._queue.full() and self.overflow == "drop_oldest":
+            self._queue.get_nowait()
+            self._stats["dropped"] += 1
+            self._queue.put_nowait(response)
+        elif self._queue.full():
+            start = time.perf_counter()
+            await self._queue.put(response)
+            self._stats["blocked_seconds"] += time.perf_counter() - start
+        else:
+            self._queue.put_nowait(response)
+        self._stats["enqueued"] += 1
+        self._stats["max_depth"] = max(self._stats["max_depth"], self.depth)
+
+    def get_nowait(self) -> Optional[Any]:
+        """Take the oldest response, None if the queue is empty"""
+        if not self._queue.empty():
+            response = self._queue.get_nowait()
+        elif self._spill is not None and self._spill.pending:
+            response = self._spill.pop()
+        else:
+            return None
+        self._stats["delivered"] += 1
+        return response
+
+    async def get(self) -> Any:
+        """Take the oldest response, waiting for one if the queue is empty"""
+        if self.depth:
+            return self.get_nowait()
+        response = await self._queue.get()
+        self._stats["delivered"] += 1
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Return depth, capacity and delivery counters"""
+        return {
+            **self._stats,
+            "depth": self.depth,
+            "spill_pending": self._spill.pending if self._spill else 0,
+            "max_size": self.max_size,
+            "overflow": self.overflow
+        }
+
+class Subscription:
+    """
+    A callback subscribed to the topics matching a pattern
+
+    Messages wait in the subscription's own bounded queue and are delivered
+    by one background task, so each subscriber sees its messages in publish
+    order and a slow subscriber never delays publishers or other
+    subscribers; once ``max_in_flight`` messages wait, its overflow policy
+    applies.
+    """
+
+    def __init__(
+        self,
+        subscription_id: int,
+        pattern: str,
+        callback: Callable[[Any], Awaitable[Any]],
+        max_in_flight: int,
+        overflow: str,
+        batch_size: int,
+        batch_interval: float,
+        spill_dir: str
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.id = subscription_id
+        self.pattern = pattern
+        self.wildcard = any(char in pattern for char in "*?[")
+        self.callback = callback
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.queue = WorkflowQueue(f"subscriber-{subscription_id}", max_in_flight, overflow, spill_dir)
+        self.active = True
+        self._in_flight = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._stats = {"delivered": 0, "failed": 0, "batches": 0}
+
+    @property
+    def name(self) -> str:
+        return f"{self.pattern}#{self.id}"
+
+    def matches(self, topic: str) -> bool:
+        return fnmatchcase(topic, self.pattern) if self.wildcard else topic == self.pattern
+
+    def _start(self, manager: "LoopbackManager"):
+        """Start the delivery task on the running loop, if not running there yet"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        self._loop = loop
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._task = loop.create_task(self._deliver(manager))
+
+    async def enqueue(self, manager: "LoopbackManager", topic: str, message: Any):
+        self._start(manager)
+        await self.queue.put((topic, message))
+        self._idle.clear()
+        self._ready.set()
+
+    async def _next_batch(self) -> List[Tuple[str, Any]]:
+        """Wait for a message, then gather up to batch_size within batch_interval"""
+        while not self.queue.depth:
+            self._idle.set()
+            self._ready.clear()
+            await self._ready.wait()
+
+        batch = [self.queue.get_nowait()]
+        self._in_flight = 1
+        deadline = time.monotonic() + self.batch_interval
+        while len(batch) < self.batch_size:
+            item = self.queue.get_nowait()
+            if item is not None:
+                batch.append(item)
+                self._in_flight += 1
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _deliver(self, manager: "LoopbackManager"):
+        while True:
+            batch = await self._next_batch()
+            try:
+                # A trace of its own: the task outlives the span it was started under
+                with tracer.span("loopback.deliver", root=True, subscriber=self.name, messages=len(batch)):
+                    if self.batch_size > 1:
+                        await self.callback([message for _, message in batch])
+                    else:
+                        await self.callback(batch[0][1])
+                self._stats["delivered"] += len(batch)
+                self._stats["batches"] += 1
+            except Exception as e:
+                logger.error(f"Error processing response for subscriber {self.name}: {e}")
+                self._stats["failed"] += len(batch)
+                # Store the responses in their topic queues for potential later processing
+                for topic, message in batch:
+                    await manager.queue(topic).put(message)
+            finally:
+                self._in_flight = 0
+
+    async def wait_idle(self):
+        """Wait until every queued message has been delivered"""
+        while self._task is not None and not self._task.done() and (self.queue.depth or self._in_flight):
+            self._idle.clear()
+            await self._idle.wait()
+
+    def stop(self):
+        self.active = False
+        if self._task is not None:
+            self._task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "pattern": self.pattern,
+            "in_flight": self._in_flight,
+            "queue": self.queue.stats()
+        }
+
 class LoopbackManager:
     """
     Manages the loopback mechanism for routing AI workflow responses
     """
-    
-    def __init__(self):
+
+    def __init__(
+        self,
+        max_queue_size: int = 1000,
+        overflow: str = "drop_oldest",
+        spill_dir: Optional[str] = None,
+        max_pending: int = 10000
+    ):
         """
         Initialize the loopback manager
+
+        :param max_queue_size: Undelivered responses held in memory per workflow
+        :param overflow: Default policy of a full queue, one of OVERFLOW_POLICIES
+        :param spill_dir: Directory of spilled responses, a temporary directory by default
+        :param max_pending: Published messages waiting for the dispatcher
+            before publish waits
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.max_queue_size = max_queue_size
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.spill_dir = spill_dir or os.path.join(tempfile.gettempdir(), "spark_loopback")
+        self._queues: Dict[str, WorkflowQueue] = {}
+        self._queue_configs: Dict[str, Dict[str, Any]] = {}
+        self._callback_registry: Dict[str, Subscription] = {}
+
+        # Subscriptions by exact topic, wildcard subscriptions, and the
+        # resolved subscribers of every published topic
+        self._subscriptions: Dict[str, List[Subscription]] = {}
+        self._wildcards: List[Subscription] = []
+        self._routes: Dict[str, Tuple[Subscription, ...]] = {}
+        self._subscription_ids = itertools.count(1)
+
+        # Published messages waiting for the dispatcher task, at most
+        # max_pending; the dispatcher stalls behind subscribers that block
+        self._pending: deque = deque()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._dispatch_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dispatch_ready: Optional[asyncio.Event] = None
+        self._dispatch_idle: Optional[asyncio.Event] = None
+        self._pending_space: Optional[asyncio.Event] = None
+        self._stats = {"published": 0, "queued": 0, "publish_blocked_seconds": 0.0}
+
+    def subscribe(
+        self,
+        pattern: str,
+        callback: Callable[[Any], Awaitable[Any]],
+        max_in_flight: int = 1000,
+        overflow: str = "drop_oldest",
+        batch_size: int = 1,
+        batch_interval: float = 0.0
+    ) -> Subscription:
+        """
+        Subscribe a callback to the topics matching a pattern
+
+        :param pattern: Topic, or fnmatch pattern such as "workflow_*"
+        :param callback: Async function called with each message, or with a
+            list of messages when batch_size > 1
+        :param max_in_flight: Messages waiting for this subscriber before
+            the overflow policy applies
+        :param overflow: One of OVERFLOW_POLICIES; "block" slows down the
+            dispatch to every subscriber
+        :param batch_size: Messages delivered per callback call
+        :param batch_interval: Seconds to wait for a batch to fill up
+        :return: The subscription, for unsubscribe
+        """
+        subscription = Subscription(
+            next(self._subscription_ids), pattern, callback, max_in_flight,
+            overflow, batch_size, batch_interval, self.spill_dir
+        )
+        if subscription.wildcard:
+            self._wildcards.append(subscription)
+        else:
+            self._subscriptions.setdefault(pattern, []).append(subscription)
+        self._routes.clear()
+        logger.debug(f"Subscribed {subscription.name}")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """
+        Remove a subscription; messages it has not received yet are dropped
+
+        :param subscription: Subscription returned by subscribe
+        """
+        subscription.stop()
+        if subscription.wildcard:
+            if subscription in self._wildcards:
+                self._wildcards.remove(subscription)
+        else:
+            subscribers = self._subscriptions.get(subscription.pattern, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscriptions.pop(subscription.pattern, None)
+        self._routes.clear()
+
+    def _all_subscriptions(self) -> List[Subscription]:
+        return [s for subscribers in self._subscriptions.values() for s in subscribers] + self._wildcards
+
+    def _route(self, topic: str) -> Tuple[Subscription, ...]:
+        """Subscribers of a topic, resolved once per topic until subscriptions change"""
+        subscribers = self._routes.get(topic)
+        if subscribers is None:
+            subscribers = tuple(self._subscriptions.get(topic, ())) + tuple(
+                subscription for subscription in self._wildcards if subscription.matches(topic)
+            )
+            if len(self._routes) >= 10000:
+                self._routes.clear()
+            self._routes[topic] = subscribers
+        return subscribers
+
+    async def publish(self, topic: str, message: Any) -> int:
         """
-        self._response_queue = {}
-        self._callback_registry = {}
-    
+        Publish a message to every subscriber of a topic
+
+        Delivery happens on background tasks, so publishing costs the same
+        whatever the number or speed of subscribers, until max_pending
+        messages wait for the dispatcher; publish then waits for room.
+        Messages of topics nobody subscribes to are queued, see consume.
+
+        :param topic: Topic, e.g. a workflow id
+        :param message: Message delivered to the subscribers
+        :return: Number of subscribers the message is dispatched to
+        """
+        subscribers = self._route(topic)
+        with tracer.span("loopback.publish", topic=topic, subscribers=len(subscribers)):
+            if not subscribers:
+                logger.debug(f"No subscribers for topic: {topic}")
+                self._stats["queued"] += 1
+                await self.queue(topic).put(message)
+                return 0
+
+            self._start_dispatcher()
+            if len(self._pending) >= self.max_pending:
+                start = time.perf_counter()
+                while len(self._pending) >= self.max_pending:
+                    self._pending_space.clear()
+                    await self._pending_space.wait()
+                self._stats["publish_blocked_seconds"] += time.perf_counter() - start
+            self._pending.append((subscribers, topic, message))
+            self._stats["published"] += 1
+            self._dispatch_idle.clear()
+            self._dispatch_ready.set()
+            return len(subscribers)
+
+    def _start_dispatcher(self):
+        """Start the dispatcher task on the running loop, if not running there yet"""
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is not None and not self._dispatcher.done() and self._dispatch_loop is loop:
+            return
+        self._dispatch_loop = loop
+        self._dispatch_ready = asyncio.Event()
+        self._dispatch_idle = asyncio.Event()
+        self._pending_space = asyncio.Event()
+        self._dispatcher = loop.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        """Move published messages into the queues of their subscribers"""
+        while True:
+            while self._pending:
+                subscribers, topic, message = self._pending.popleft()
+                self._pending_space.set()
+                for subscription in subscribers:
+                    if subscription.active:
+                        await subscription.enqueue(self, topic, message)
+            self._dispatch_idle.set()
+            self._dispatch_ready.clear()
+            await self._dispatch_ready.wait()
+
+    async def flush(self):
+        """Wait until every published message has been delivered"""
+        if self._dispatcher is not None and not self._dispatcher.done():
+            await self._dispatch_idle.wait()
+        for subscription in self._all_subscriptions():
+            await subscription.wait_idle()
+
+    async def close(self):
+        """Stop the dispatcher and every subscription's delivery task"""
+        tasks = [self._dispatcher] if self._dispatcher is not None else []
+        for subscription in self._all_subscriptions():
+            subscription.stop()
+            if subscription._task is not None:
+                tasks.append(subscription._task)
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._dispatcher = None
+        # Undispatched messages are discarded; release waiting publishers
+        self._pending.clear()
+        if self._pending_space is not None:
+            self._pending_space.set()
+
     async def register_callback(self, workflow_id: str, callback_fn):
         """
         Register a callback function for a specific workflow
-        
+
+        Replaces the workflow's previous callback; other subscribers of the
+        workflow id are unaffected.
+
         :param workflow_id: Unique identifier for the workflow
         :param callback_fn: Async callback function to process responses
         """
-        self._callback_registry[workflow_id] = callback_fn
+        previous = self._callback_registry.pop(workflow_id, None)
+        if previous is not None:
+            self.unsubscribe(previous)
+        self._callback_registry[workflow_id] = self.subscribe(workflow_id, callback_fn)
         logger.info(f"Callback registered for workflow: {workflow_id}")
-    
+
+    def configure_queue(self, workflow_id: str, max_size: Optional[int] = None, overflow: Optional[str] = None):
+        """
+        Set the capacity and overflow policy of a workflow's queue
+
+        :param workflow_id: Unique identifier for the workflow
+        :param max_size: Responses held in memory, the manager default if None
+        :param overflow: One of OVERFLOW_POLICIES, the manager default if None
+        :raises ValueError: If the policy is unknown or responses are already queued
+        """
+        if overflow is not None and overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        queue = self._queues.get(workflow_id)
+        if queue is not None and queue.depth:
+            raise ValueError(f"Responses are already queued for workflow: {workflow_id}")
+        self._queues.pop(workflow_id, None)
+        self._queue_configs[workflow_id] = {"max_size": max_size, "overflow": overflow}
+
+    def queue(self, workflow_id: str) -> WorkflowQueue:
+        """Get the queue of a workflow, creating it on first use"""
+        queue = self._queues.get(workflow_id)
+        if queue is None:
+            config = self._queue_configs.get(workflow_id, {})
+            queue = WorkflowQueue(
+                workflow_id,
+                max_size=config.get("max_size") or self.max_queue_size,
+                overflow=config.get("overflow") or self.overflow,
+                spill_dir=self.spill_dir
+            )
+            self._queues[workflow_id] = queue
+        return queue
+
     async def send_response(self, workflow_id: str, response: Dict[str, Any]):
         """
-        Send a response back through the registered callback
-        
+        Send a response to the subscribers of a workflow
+
+        Responses without subscribers, or whose callback fails, are queued
+        for consumers of the workflow.
+
         :param workflow_id: Unique identifier for the workflow
         :param response: Response data to be processed
         """
-        try:
-            # Check if a callback is registered for this workflow
-            callback = self._callback_registry.get(workflow_id)
-            
-            if not callback:
-                logger.warning(f"No callback registered for workflow: {workflow_id}")
-                self._response_queue[workflow_id] = response
-                return
-            
-            # Call the callback with the response
-            await callback(response)
-            logger.info(f"Response processed for workflow: {workflow_id}")
-        
-        except Exception as e:
-            logger.error(f"Error processing response for workflow {workflow_id}: {e}")
-            # Store the response in queue for potential later processing
-            self._response_queue[workflow_id] = response
-    
+        await self.publish(workflow_id, response)
+
     async def retrieve_queued_response(self, workflow_id: str):
         """
-        Retrieve a queued response for a specific workflow
-        
+        Retrieve the oldest queued response for a specific workflow
+
         :param workflow_id: Unique identifier for the workflow
         :return: Queued response or None
         """
-        return self._response_queue.pop(workflow_id, None)
-    
+        queue = self._queues.get(workflow_id)
+        return queue.get_nowait() if queue is not None else None
+
+    async def consume(self, workflow_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield queued responses of a workflow in order, waiting for new ones
+
+        :param workflow_id: Unique identifier for the workflow
+        :return: Async iterator of responses; it ends only when the caller stops
+        """
+        queue = self.queue(workflow_id)
+        while True:
+            yield await queue.get()
+
+    def queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get depth and delivery counters of every workflow queue"""
+        return {workflow_id: queue.stats() for workflow_id, queue in self._queues.items()}
+
+    def subscription_stats(self) -> Dict[str, Any]:
+        """Get publish counters and the delivery counters of every subscription"""
+        return {
+            **self._stats,
+            "dispatch_pending": len(self._pending),
+            "subscriptions": {subscription.name: subscription.stats() for subscription in self._all_subscriptions()}
+        }
+
     def clear_callback(self, workflow_id: str):
         """
         Clear the callback for a specific workflow
-        
+
         :param workflow_id: Unique identifier for the workflow
         """
         if workflow_id in self._callback_registry:
-            del self._callback_registry[workflow_id]
+            self.unsubscribe(self._callback_registry.pop(workflow_id))
             logger.info(f"Callback cleared for workflow: {workflow_id}")
 
 # Create a singleton instance of the LoopbackManager
-loopback_manager = LoopbackManager()
+loopback_manager = LoopbackManager(
+    max_queue_size=int(os.getenv("LOOPBACK_MAX_QUEUE", "1000")),
+    overflow=os.getenv("LOOPBACK_OVERFLOW", "drop_oldest"),
+    spill_dir=os.getenv("LOOPBACK_SPILL_DIR"),
+    max_pending=int(os.getenv("LOOPBACK_MAX_PENDING", "10000"))
+)
@@ -1,14 +1,18 @@
-# Import phase implementations to ensure they're registered
+# Phase implementations (the registry also resolves them lazily by import path)
 from .base_phase import (
     InputAnalysisPhase, 
     ContentGenerationPhase, 
     register_phases,
-    BasePhase
+    BasePhase,
+    LLMPhase,
+    PhaseExecutionError
 )
 
 __all__ = [
     'InputAnalysisPhase',
     'ContentGenerationPhase',
     'register_phases',
-    'BasePhase'
+    'BasePhase',
+    'LLMPhase',
+    'PhaseExecutionError'
 ]
@@ -2,126 +2,318 @@
 Base Phase Implementation for Workflow Phases
 """
 
-import os
 import logging
-from typing import Dict, Any
+import os
+from typing import Dict, Any, Optional, AsyncIterator, Hashable, Sequence, Set, Tuple, Type
 
 from core.registries.phase_registry import BasePhase, PhaseRegistry, PhaseConfig
+from core.registries.prompt_template import PromptTemplate, compile_template
 from core.loopback.loopback import loopback_manager
-from langchain_openai import ChatOpenAI
+from ai.models.invocation import ModelInvoker, provider_invoker
+from ai.models.retry import RetryPolicy
+from ai.models.clients import get_chat_client
+from ai.models.rate_limit import estimate_tokens
+from core.tracing import tracer
 
 logger = logging.getLogger(__name__)
 
-class InputAnalysisPhase(BasePhase):
-    """Phase for analyzing input requirements"""
+# Model used when no registered model matches a phase
+DEFAULT_MODEL_NAME = "gpt-4-turbo"
+DEFAULT_TEMPERATURE = 0.7
+# Provider of the default model; "fake" runs phases offline
+DEFAULT_PROVIDER = os.getenv("LLM_PROVIDER", "openai")
+
+# Phase input fields every template may use besides the phase's template_defaults
+TEMPLATE_SPEC_FIELDS = ("description", "input", "input_data", "phase_results")
+
+# Default prompt templates. Static instructions come first so every rendering
+# shares a byte-identical prefix that providers can cache.
+INPUT_ANALYSIS_TEMPLATE = """Provide a comprehensive analysis of the input requirements below. Break down the requirements, provide context, and outline key considerations for content creation.
+
+Description: {description}
+Topic: {topic}
+Tone: {tone}
+Length: {length}"""
+
+CONTENT_GENERATION_TEMPLATE = """Generate a technical blog post from the analysis and content requirements below.
+
+Guidelines:
+- Maintain a professional and technical tone
+- Provide in-depth insights into the topic
+- Ensure the content is informative and engaging
+- Structure the post with a clear introduction, body, and conclusion
+- Include relevant technical details and examples
+
+Content Requirements:
+- Topic: {topic}
+- Tone: {tone}
+- Length: {length}
+
+Analysis Background:
+{analysis}
+
+Generate the blog post content:"""
+
+class PhaseExecutionError(Exception):
+    """Raised when a phase fails after its model call retries are exhausted"""
+
+class LLMPhase(BasePhase):
+    """Base class for phases that send one prompt to a chat model"""
+    # Model clients are resolved per execution, so instances can be reused
+    stateless = True
+    # Key holding the model response in the phase result
+    result_key = "response"
+    # Loopback workflow id the result is sent to
+    loopback_workflow_id: Optional[str] = None
+    # Prefix of the error reported when the phase fails
+    failure_message = "Phase failed"
+    # Template used when the phase config has no prompt_template
+    default_prompt_template = ""
+    # Values of template variables missing from the phase input
+    template_defaults: Dict[str, Any] = {}
+    # Reuse responses of near-duplicate prompts unless the config says
+    # otherwise; only safe when one response may serve similar inputs
+    semantic_cache_default = False
+    # Free-text template variables compared by similarity in the semantic
+    # cache; every other variable (topic, tone, length, ...) must match exactly
+    semantic_text_fields: Tuple[str, ...] = ()
+
+    def prompt_template(self) -> PromptTemplate:
+        """
+        Compiled template of the phase
+
+        :return: The config's prompt_template, else default_prompt_template
+        :raises NotImplementedError: If the phase has neither
+        """
+        template = self.config.prompt_template or self.default_prompt_template
+        if not template:
+            raise NotImplementedError("Subclasses must implement build_prompt or set a prompt template")
+        compiled = self.config._compiled_template
+        if compiled is not None and compiled.template == template:
+            return compiled
+        return compile_template(template)
+
+    @classmethod
+    def template_variable_names(cls, dependencies: Sequence[Type[BasePhase]]) -> Optional[Set[str]]:
+        """
+        Variables supplied by template_variables: the template defaults,
+        TEMPLATE_SPEC_FIELDS and the result keys of dependencies
+
+        Other fields of the project input are available as ``{input.name}``.
+        """
+        names = set(cls.template_defaults) | set(TEMPLATE_SPEC_FIELDS)
+        for dependency in dependencies:
+            result_key = getattr(dependency, "result_key", None)
+            if result_key is None:
+                # Results of other phase types have unknown fields
+                return None
+            names.update((result_key, "prompt_tokens"))
+        return names
+
+    def template_variables(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Values available to the prompt template
+
+        Fields of the project input (``input_data``) and of dependency results
+        are available by name, e.g. ``{topic}`` or ``{analysis}``; top-level
+        spec fields override both. ``{input}`` is the project input itself.
+
+        :param input_data: Input data for the phase
+        :return: Template variables
+        """
+        project_input = input_data.get("input_data") or {}
+        variables = dict(self.template_defaults)
+        if isinstance(project_input, dict):
+            variables.update(project_input)
+        for result in (input_data.get("phase_results") or {}).values():
+            if isinstance(result, dict):
+                variables.update((key, value) for key, value in result.items() if key != "input_data")
+        variables.update(input_data)
+        variables["input"] = project_input
+        return variables
+
+    def build_prompt(self, input_data: Dict[str, Any]) -> str:
+        """Build the prompt sent to the model by rendering the phase template"""
+        return self.prompt_template().render(self.template_variables(input_data))
+
+    def semantic_cache_key(
+        self,
+        invoker: ModelInvoker,
+        input_data: Dict[str, Any],
+        prompt: str
+    ) -> Optional[Tuple[Hashable, str]]:
+        """
+        Namespace and text under which the semantic cache stores a prompt
+
+        Templated prompts are compared by their semantic_text_fields only:
+        the static template text is shared by every prompt and would make
+        unrelated inputs look alike, and the other fields are part of the
+        namespace, so a different tone or length never hits.
+
+        :param invoker: Invoker the prompt is sent with
+        :param input_data: Input data for the phase
+        :param prompt: Rendered prompt
+        :return: (namespace, text), None if the phase does not use the cache
+        """
+        enabled = self.semantic_cache_default if self.config.semantic_cache is None else self.config.semantic_cache
+        if not enabled or getattr(self.model_registry, "semantic_cache", None) is None:
+            return None
+        if type(self).build_prompt is LLMPhase.build_prompt:
+            template = self.prompt_template()
+            fields = template.render_fields(self.template_variables(input_data))
+            text = [value for name, value in fields.items() if name.split(".")[0] in self.semantic_text_fields]
+            if not text:
+                # Nothing to compare by similarity; the response cache covers exact repeats
+                return None
+            # Compared exactly, up to case and whitespace
+            exact = sorted(
+                (name, " ".join(value.lower().split()))
+                for name, value in fields.items() if name.split(".")[0] not in self.semantic_text_fields
+            )
+            namespace = invoker.request_key([template.template, exact])
+            return namespace, "\n".join(text)
+        return invoker.request_key(self.config.phase_name), prompt
+
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Analyze input requirements for the workflow
+        Execute phase by invoking the model with the phase prompt
         
-        :param input_data: Input data for the workflow
-        :return: Analysis results
+        :param input_data: Input data for the phase
+        :return: Phase result
         """
-        # Initialize OpenAI model
         try:
-            model = ChatOpenAI(
-                model_name="gpt-4-turbo",
-                temperature=0.7,
-                api_key=os.getenv("OPENAI_API_KEY")
-            )
+            # Resolve the shared model invoker
+            invoker = await self.get_invoker()
 
-            # Prepare prompt for input analysis
-            prompt = f"""Provide a comprehensive analysis of the following input requirements:
-            Description: {input_data.get('description', '')}
-            Topic: {input_data.get('input_data', {}).get('topic', '')}
-            Tone: {input_data.get('input_data', {}).get('tone', 'professional')}
-            Length: {input_data.get('input_data', {}).get('length', 'medium')}
+            prompt = self.build_prompt(input_data)
+            semantic_key = self.semantic_cache_key(invoker, input_data, prompt)
+            response = self.model_registry.semantic_cache.get(*semantic_key) if semantic_key else None
+            if semantic_key:
+                tracer.current_span().set(semantic_cache_hit=response is not None)
 
-            Break down the requirements, provide context, and outline key considerations for content creation."""
-            
-            # Invoke the model
-            response = model.invoke(prompt)
-            
-            analysis_result = {
-                "analysis": response.content,
-                "input_data": input_data
-            }
+            # Invoke the model unless a near-duplicate prompt was answered
+            if response is None:
+                response = await invoker.invoke(prompt)
+                if semantic_key:
+                    self.model_registry.semantic_cache.set(*semantic_key, response)
             
-            # Optional: Use loopback to send analysis to next phase
-            await loopback_manager.send_response("workflow_analysis", analysis_result)
-            
-            return analysis_result
+            return await self._complete(response, input_data, prompt)
         except Exception as e:
-            logger.error(f"Input analysis failed: {e}")
-            return {
-                "error": f"Analysis failed: {str(e)}",
-                "input_data": input_data
-            }
+            raise self._failure(e) from e
 
-class ContentGenerationPhase(BasePhase):
-    """Phase for generating content based on analysis"""
-    async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute_stream(self, input_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
         """
-        Generate content based on previous phase analysis
+        Execute phase, yielding model tokens as they arrive
         
-        :param input_data: Input data from previous phase
-        :return: Generated content
+        :param input_data: Input data for the phase
+        :return: Async iterator of token events and a final result event
         """
         try:
-            # Initialize OpenAI model
-            model = ChatOpenAI(
-                model_name="gpt-4-turbo",
-                temperature=0.7,
-                api_key=os.getenv("OPENAI_API_KEY")
-            )
+            invoker = await self.get_invoker()
 
-            # Extract analysis and original input data
-            analysis = input_data.get('analysis', '')
-            original_input = input_data.get('input_data', {})
-            
-            # Prepare prompt for content generation
-            prompt = f"""Based on the following comprehensive analysis, generate a technical blog post:
+            prompt = self.build_prompt(input_data)
+            semantic_key = self.semantic_cache_key(invoker, input_data, prompt)
+            cached = self.model_registry.semantic_cache.get(*semantic_key) if semantic_key else None
+            if semantic_key:
+                tracer.current_span().set(semantic_cache_hit=cached is not None)
 
-            Analysis Background:
-            {analysis}
+            chunks = []
+            if cached is not None:
+                chunks.append(cached)
+                yield {"type": "token", "content": cached}
+            else:
+                async for chunk in invoker.stream(prompt):
+                    chunks.append(chunk)
+                    yield {"type": "token", "content": chunk}
+                if semantic_key:
+                    self.model_registry.semantic_cache.set(*semantic_key, "".join(chunks))
 
-            Content Requirements:
-            - Topic: {original_input.get('topic', '')}
-            - Tone: {original_input.get('tone', 'professional')}
-            - Length: {original_input.get('length', 'medium')}
+            result = await self._complete("".join(chunks), input_data, prompt)
+        except Exception as e:
+            raise self._failure(e) from e
+        yield {"type": "result", "result": result}
 
-            Guidelines:
-            - Maintain a professional and technical tone
-            - Provide in-depth insights into the topic
-            - Ensure the content is informative and engaging
-            - Structure the post with a clear introduction, body, and conclusion
-            - Include relevant technical details and examples
+    async def _complete(self, response: str, input_data: Dict[str, Any], prompt: str) -> Dict[str, Any]:
+        """Build the phase result and send it through the loopback"""
+        result = {
+            self.result_key: response,
+            "input_data": input_data,
+            # Estimated tokens of the rendered prompt
+            "prompt_tokens": estimate_tokens(prompt)
+        }
+        
+        # Optional: Use loopback to send the result to the next phase
+        if self.loopback_workflow_id:
+            await loopback_manager.send_response(self.loopback_workflow_id, result)
+        
+        return result
 
-            Generate the blog post content:"""
-            
-            # Invoke the model
-            response = model.invoke(prompt)
-            
-            content_result = {
-                "generated_content": response.content,
-                "input_data": input_data
-            }
-            
-            # Optional: Use loopback to send content to next phase or for further processing
-            await loopback_manager.send_response("workflow_content", content_result)
-            
-            return content_result
-        except Exception as e:
-            logger.error(f"Content generation failed: {e}")
-            return {
-                "error": f"Content generation failed: {str(e)}",
-                "input_data": input_data
-            }
+    def _failure(self, error: Exception) -> "PhaseExecutionError":
+        """
+        Build the error raised when the phase fails
+
+        Failures propagate instead of being returned as results so that an
+        error (after retries) fails the phase rather than feeding downstream
+        phases an error payload.
+        """
+        logger.error(f"{self.failure_message}: {error}")
+        return PhaseExecutionError(f"{self.failure_message}: {str(error)}")
+
+    async def get_invoker(self) -> ModelInvoker:
+        """
+        Resolve the model invoker for this phase
+
+        Uses the phase's configured model_id, otherwise the registered model
+        best matching its required capabilities, otherwise the default model.
+
+        :return: Invoker wrapping the shared chat client
+        """
+        if self.model_registry is not None:
+            model_id = self.config.model_id or await self.model_registry.find_best_model({
+                "capabilities": self.config.required_capabilities
+            })
+            if model_id:
+                return await self.model_registry.get_invoker(
+                    model_id, cache_responses=self.config.cache_responses
+                )
+
+        return provider_invoker(
+            get_chat_client(DEFAULT_MODEL_NAME, temperature=DEFAULT_TEMPERATURE, provider=DEFAULT_PROVIDER),
+            model_name=DEFAULT_MODEL_NAME,
+            provider=DEFAULT_PROVIDER,
+            parameters={"temperature": DEFAULT_TEMPERATURE},
+            metrics=self.model_registry.metrics if self.model_registry is not None else None,
+            retry_policy=RetryPolicy()
+        )
+
+class InputAnalysisPhase(LLMPhase):
+    """Phase for analyzing input requirements"""
+    result_key = "analysis"
+    loopback_workflow_id = "workflow_analysis"
+    failure_message = "Analysis failed"
+    default_prompt_template = INPUT_ANALYSIS_TEMPLATE
+    # Analyses of near-identical descriptions are interchangeable when the
+    # topic, tone and length match exactly
+    semantic_cache_default = True
+    semantic_text_fields = ("description",)
+    template_defaults = {"description": "", "topic": "", "tone": "professional", "length": "medium"}
+
+class ContentGenerationPhase(LLMPhase):
+    """Phase for generating content based on analysis"""
+    result_key = "generated_content"
+    loopback_workflow_id = "workflow_content"
+    failure_message = "Content generation failed"
+    default_prompt_template = CONTENT_GENERATION_TEMPLATE
+    semantic_text_fields = ("analysis",)
+    template_defaults = {"analysis": "", "topic": "", "tone": "professional", "length": "medium"}
 
 def register_phases():
-    """Register available phases with the phase registry"""
+    """
+    Register available phases with the phase registry
+
+    The registry already knows these phases by import path; registering the
+    classes restores them if they were overridden.
+    """
     PhaseRegistry.register("input_analysis", InputAnalysisPhase)
     PhaseRegistry.register("content_generation", ContentGenerationPhase)
     logger.info("Phases registered successfully")
-
-# Register phases when module is imported
-register_phases()
@@ -1,10 +1,27 @@
-# Import and expose key registry classes
-from .workflow_registry import WorkflowRegistry
-from .phase_registry import PhaseRegistry
-from .model_registry import AIModelRegistry
-
-__all__ = [
-    'WorkflowRegistry',
-    'PhaseRegistry',
-    'AIModelRegistry'
-]
+# Expose key registry classes, imported on first access (PEP 562)
+import importlib
+
+_exports = {
+    'WorkflowRegistry': '.workflow_registry',
+    'WorkflowType': '.workflow_registry',
+    'PhaseRegistry': '.phase_registry',
+    'PhaseConfig': '.phase_registry',
+    'BasePhase': '.phase_registry',
+    'AIModelRegistry': '.model_registry',
+    'ModelConfig': '.model_registry',
+    'PromptTemplate': '.prompt_template',
+    'compile_template': '.prompt_template'
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name):
+    module = _exports.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,258 @@
+"""
+Live per-model and per-phase call statistics
+
+Statistics are only updated from the event loop thread, so plain counters
+are safe without locks and recording a call costs a few additions.
+"""
+
+import asyncio
+import bisect
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # One count per bucket plus the +Inf overflow bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float):
+        """Record one latency"""
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding quantile ``q`` (0-1), None without samples"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, cumulative count) pairs, ending with +Inf"""
+        pairs, seen = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            pairs.append((bound, seen))
+        return pairs
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add the samples of a histogram with the same buckets"""
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.sum += other.sum
+
+class CallRecord:
+    """Token counts of one tracked call, filled in by the caller"""
+
+    __slots__ = ("prompt_tokens", "completion_tokens")
+
+    def __init__(self, prompt_tokens: int = 0):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = 0
+
+class ModelStats:
+    """
+    Call statistics of one model or phase: in-flight gauge, request and
+    error counts, latency histogram, token counts and exponentially
+    weighted latency and error rate
+    """
+
+    def __init__(self, alpha: float = 0.2):
+        """
+        :param alpha: EWMA smoothing factor, higher reacts faster
+        """
+        self.alpha = alpha
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.ewma_latency = 0.0
+        self.ewma_error_rate = 0.0
+        self.latency = LatencyHistogram()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        # Time spent in successful calls, the denominator of tokens/sec
+        self.busy_seconds = 0.0
+
+    def record(
+        self,
+        latency: float,
+        error: bool = False,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ):
+        """Record a finished call"""
+        self.requests += 1
+        self.prompt_tokens += prompt_tokens
+        if error:
+            self.errors += 1
+        else:
+            self.latency.observe(latency)
+            self.completion_tokens += completion_tokens
+            self.busy_seconds += latency
+            if self.requests - self.errors == 1:
+                # Seed the average with the first successful call
+                self.ewma_latency = latency
+            else:
+                self.ewma_latency = self.alpha * latency + (1 - self.alpha) * self.ewma_latency
+        self.ewma_error_rate = self.alpha * float(error) + (1 - self.alpha) * self.ewma_error_rate
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Completion tokens generated per second of successful calls"""
+        return self.completion_tokens / self.busy_seconds if self.busy_seconds else 0.0
+
+    @contextmanager
+    def track(self, prompt_tokens: int = 0) -> Iterator[CallRecord]:
+        """
+        Count a call as in flight and record its outcome when it ends
+
+        :param prompt_tokens: Tokens sent with the call
+        :return: Record the caller sets completion_tokens on
+        """
+        call = CallRecord(prompt_tokens)
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            yield call
+        except asyncio.CancelledError:
+            # Cancelled calls (e.g. losing hedges) are neither successes nor errors
+            raise
+        except Exception:
+            self.record(time.perf_counter() - start, error=True, prompt_tokens=call.prompt_tokens)
+            raise
+        else:
+            self.record(
+                time.perf_counter() - start,
+                prompt_tokens=call.prompt_tokens,
+                completion_tokens=call.completion_tokens
+            )
+        finally:
+            self.in_flight -= 1
+
+    def merge(self, other: "ModelStats"):
+        """Add the counters of another instance (EWMAs are not merged)"""
+        self.in_flight += other.in_flight
+        self.requests += other.requests
+        self.errors += other.errors
+        self.latency.merge(other.latency)
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.busy_seconds += other.busy_seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the current statistics"""
+        return {
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "ewma_latency": self.ewma_latency,
+            "ewma_error_rate": self.ewma_error_rate,
+            "latency_p50": self.latency.quantile(0.5),
+            "latency_p99": self.latency.quantile(0.99),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "tokens_per_second": self.tokens_per_second
+        }
+
+# Every live collection, so one endpoint can export all of them
+_collections: "weakref.WeakSet[ModelMetrics]" = weakref.WeakSet()
+
+class ModelMetrics:
+    """Statistics of the models and phases run through one registry"""
+
+    def __init__(self):
+        self.models: Dict[str, ModelStats] = {}
+        self.phases: Dict[str, ModelStats] = {}
+        _collections.add(self)
+
+    def model(self, model_id: str) -> ModelStats:
+        """Get (creating if needed) the statistics of a model"""
+        stats = self.models.get(model_id)
+        if stats is None:
+            stats = self.models[model_id] = ModelStats()
+        return stats
+
+    def phase(self, phase_name: str) -> ModelStats:
+        """Get (creating if needed) the statistics of a phase"""
+        stats = self.phases.get(phase_name)
+        if stats is None:
+            stats = self.phases[phase_name] = ModelStats()
+        return stats
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Return {"models": {...}, "phases": {...}} statistics"""
+        return {
+            "models": {name: stats.snapshot() for name, stats in self.models.items()},
+            "phases": {name: stats.snapshot() for name, stats in self.phases.items()}
+        }
+
+def _aggregate(kind: str) -> Dict[str, ModelStats]:
+    """Sum the statistics of every live collection by model or phase name"""
+    totals: Dict[str, ModelStats] = {}
+    for collection in list(_collections):
+        for name, stats in getattr(collection, kind).items():
+            totals.setdefault(name, ModelStats()).merge(stats)
+    return totals
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(bound)
+
+def _render_family(lines: List[str], prefix: str, label: str, totals: Dict[str, ModelStats]):
+    series = [(f'{label}="{_escape(name)}"', stats) for name, stats in sorted(totals.items())]
+
+    def emit(name: str, kind: str, help_text: str, value):
+        lines.append(f"# HELP {prefix}_{name} {help_text}")
+        lines.append(f"# TYPE {prefix}_{name} {kind}")
+        for labels, stats in series:
+            lines.append(f"{prefix}_{name}{{{labels}}} {value(stats)}")
+
+    emit("requests_total", "counter", "Calls started and finished", lambda s: s.requests)
+    emit("errors_total", "counter", "Calls that raised an error", lambda s: s.errors)
+    emit("in_flight", "gauge", "Calls currently running", lambda s: s.in_flight)
+
+    lines.append(f"# HELP {prefix}_latency_seconds Latency of successful calls")
+    lines.append(f"# TYPE {prefix}_latency_seconds histogram")
+    for labels, stats in series:
+        for bound, count in stats.latency.cumulative():
+            lines.append(f'{prefix}_latency_seconds_bucket{{{labels},le="{_format_bound(bound)}"}} {count}')
+        lines.append(f"{prefix}_latency_seconds_sum{{{labels}}} {stats.latency.sum}")
+        lines.append(f"{prefix}_latency_seconds_count{{{labels}}} {stats.latency.count}")
+
+    emit("prompt_tokens_total", "counter", "Tokens sent", lambda s: s.prompt_tokens)
+    emit("completion_tokens_total", "counter", "Tokens generated", lambda s: s.completion_tokens)
+    emit("tokens_per_second", "gauge", "Tokens generated per second of call time",
+         lambda s: s.tokens_per_second)
+
+def render_prometheus() -> str:
+    """
+    Render the statistics of every live collection in the Prometheus text
+    exposition format
+
+    Collections sharing a model or phase name are summed.
+    """
+    lines: List[str] = []
+    _render_family(lines, "spark_model", "model", _aggregate("models"))
+    _render_family(lines, "spark_phase", "phase", _aggregate("phases"))
+    return "\n".join(lines) + "\n"
@@ -1,6 +1,15 @@
-from typing import Dict, Any, Optional
+import itertools
+import os
+from collections import Counter, OrderedDict
+from typing import Dict, Any, Optional, Set
 from datetime import datetime
 from pydantic import BaseModel
+from ai.models.cache import ResponseCache
+from ai.models.semantic_cache import SemanticCache
+from ai.models.rate_limit import RateLimiter, get_provider_limiter
+from ai.models.retry import RetryPolicy, LatencyTracker
+from ai.models.singleflight import SingleFlight
+from .model_metrics import ModelMetrics, ModelStats
 
 class ModelConfig(BaseModel):
     '''AI model configuration'''
@@ -11,49 +20,224 @@ class ModelConfig(BaseModel):
     capabilities: list[str]
     parameters: Dict[str, Any]
     status: str = "active"
+    base_url: Optional[str] = None
+    api_key_env: Optional[str] = None
+    # Cache responses for identical prompts; only safe when callers accept
+    # reusing one sample of a non-deterministic (temperature > 0) model
+    cache_responses: bool = False
+    # Per-model budgets, applied on top of the provider-wide limits
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    retry: RetryPolicy = RetryPolicy()
+    # Relative price, used by load-aware routing to prefer cheaper models
+    cost_per_1k_tokens: float = 0.0
+    # Share one provider call between identical concurrent requests
+    coalesce_requests: bool = True
 
 class AIModelRegistry:
     '''Registry for AI models'''
-    
-    def __init__(self):
-        self._models = {}
-        self._metrics = {}
+
+    ROUTING_MODES = ("capability", "load_aware")
+
+    def __init__(
+        self,
+        response_cache: Optional[ResponseCache] = None,
+        routing: str = "capability",
+        max_error_rate: float = 0.5,
+        cost_weight: float = 0.0,
+        metrics: Optional[ModelMetrics] = None,
+        semantic_cache: Optional[SemanticCache] = None
+    ):
+        '''
+        :param response_cache: Cache shared by invokers of cache-enabled models
+        :param semantic_cache: Near-duplicate prompt cache used by phases that enable it
+        :param routing: Default find_best_model routing mode
+        :param max_error_rate: EWMA error rate above which a model is avoided
+        :param cost_weight: Seconds of expected latency worth one unit of cost_per_1k_tokens
+        :param metrics: Collection recording model and phase calls, a new one by default
+        '''
+        if routing not in self.ROUTING_MODES:
+            raise ValueError(f"Unknown routing mode: {routing}")
+        self.routing = routing
+        self.max_error_rate = max_error_rate
+        self.cost_weight = cost_weight
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self.metrics = metrics or ModelMetrics()
+        self._metrics: Dict[str, ModelStats] = self.metrics.models
+        # Inverted index: capability -> ids of models offering it
+        self._capability_index: Dict[str, Set[str]] = {}
+        self._registration_order = itertools.count()
+        # Shared by every invoker, so identical requests coalesce across phases and projects
+        self._single_flight = SingleFlight()
+        self._rate_limiters: Dict[str, RateLimiter] = {}
+        self._latency: Dict[str, LatencyTracker] = {}
+        # Stateless phases bound to this registry, filled by PhaseRegistry.get_phase;
+        # held here so they never outlive the registry
+        self.phase_instances: OrderedDict = OrderedDict()
+        self.response_cache = response_cache or ResponseCache(
+            path=os.getenv("LLM_CACHE_PATH")
+        )
+        self.semantic_cache = semantic_cache or SemanticCache(
+            threshold=float(os.getenv("LLM_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+        )
     
     async def get_model(self, model_id: str) -> Optional[Dict[str, Any]]:
         '''Get model by ID'''
         return self._models.get(model_id)
     
+    async def get_client(self, model_id: str) -> Any:
+        '''
+        Get the shared, pooled chat client for a registered model
+
+        :param model_id: Registered model ID
+        :return: Chat model client
+        :raises ValueError: If the model is not registered
+        '''
+        from ai.models.clients import get_chat_client
+
+        data = self._models.get(model_id)
+        if not data:
+            raise ValueError(f"Unknown model: {model_id}")
+
+        config = data["config"]
+        parameters = dict(config.parameters)
+        temperature = parameters.pop("temperature", 0.7)
+        return get_chat_client(
+            config.model_name,
+            temperature=temperature,
+            api_key=os.getenv(config.api_key_env) if config.api_key_env else None,
+            base_url=config.base_url,
+            provider=config.provider,
+            **parameters
+        )
+
+    async def get_invoker(self, model_id: str, cache_responses: Optional[bool] = None) -> Any:
+        '''
+        Get an invoker for a registered model
+
+        :param model_id: Registered model ID
+        :param cache_responses: Override the model's cache_responses setting
+        :return: ModelInvoker wrapping the shared client
+        :raises ValueError: If the model is not registered
+        '''
+        from ai.models.invocation import ModelInvoker
+
+        client = await self.get_client(model_id)
+        config = self._models[model_id]["config"]
+        use_cache = config.cache_responses if cache_responses is None else cache_responses
+        return ModelInvoker(
+            client,
+            model_name=config.model_name,
+            parameters=config.parameters,
+            cache=self.response_cache if use_cache else None,
+            rate_limiters=self.get_rate_limiters(model_id),
+            retry_policy=config.retry,
+            latency=self._latency.setdefault(model_id, LatencyTracker()),
+            metrics=self._metrics[model_id],
+            single_flight=self._single_flight if config.coalesce_requests else None,
+            endpoint={"provider": config.provider, "base_url": config.base_url}
+        )
+
+    def get_rate_limiters(self, model_id: str) -> list[RateLimiter]:
+        '''Limiters a call to the model must pass: its provider's, then its own'''
+        config = self._models[model_id]["config"]
+        limiters = [get_provider_limiter(config.provider)]
+        if model_id in self._rate_limiters:
+            limiters.append(self._rate_limiters[model_id])
+        return [limiter for limiter in limiters if not limiter.unlimited]
+
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        '''Wait-time metrics of the per-model limiters'''
+        return {model_id: limiter.stats() for model_id, limiter in self._rate_limiters.items()}
+
     async def register_model(self, config: ModelConfig):
         '''Register new model'''
+        previous = self._models.get(config.model_id)
+        if previous:
+            for capability in previous["capabilities"]:
+                self._capability_index[capability].discard(config.model_id)
+
+        capabilities = frozenset(config.capabilities)
         self._models[config.model_id] = {
             "config": config,
-            "registered_at": datetime.now()
+            "registered_at": datetime.now(),
+            "capabilities": capabilities,
+            "order": previous["order"] if previous else next(self._registration_order)
         }
+        for capability in capabilities:
+            self._capability_index.setdefault(capability, set()).add(config.model_id)
+        self.metrics.model(config.model_id)
+
+        if config.requests_per_minute or config.tokens_per_minute:
+            self._rate_limiters[config.model_id] = RateLimiter(
+                config.requests_per_minute,
+                config.tokens_per_minute,
+                name=config.model_id
+            )
+        else:
+            self._rate_limiters.pop(config.model_id, None)
+
+    def coalescing_stats(self) -> Dict[str, Any]:
+        '''Get how many model calls were shared between identical requests'''
+        return self._single_flight.stats()
+
+    def semantic_cache_stats(self) -> Dict[str, Any]:
+        '''Get hit rate and lookup latency of the semantic cache'''
+        return self.semantic_cache.stats()
+
+    def get_metrics(self, model_id: str) -> Optional[ModelStats]:
+        '''Get live call statistics of a model'''
+        return self._metrics.get(model_id)
+
+    def metrics_snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        '''Get latency, throughput and error statistics of every model and phase'''
+        return self.metrics.snapshot()
     
-    async def find_best_model(self, requirements: Dict[str, Any]) -> str:
-        '''Find best model for requirements'''
-        best_match = None
-        best_score = 0
-        
-        for model_id, data in self._models.items():
-            if data["config"].status != "active":
-                continue
-                
-            score = self._calculate_match_score(data["config"], requirements)
-            if score > best_score:
-                best_score = score
-                best_match = model_id
-        
-        return best_match
-    
-    def _calculate_match_score(self, config: ModelConfig, requirements: Dict[str, Any]) -> float:
-        '''Calculate how well model matches requirements'''
-        score = 0.0
-        
-        # Check capabilities
-        req_capabilities = set(requirements.get("capabilities", []))
-        model_capabilities = set(config.capabilities)
-        if req_capabilities:
-            score += len(req_capabilities & model_capabilities) / len(req_capabilities)
-        
-        return score
\ No newline at end of file
+    async def find_best_model(self, requirements: Dict[str, Any], routing: Optional[str] = None) -> Optional[str]:
+        '''
+        Find best model for requirements
+
+        Candidates come from the capability index, so only models sharing at
+        least one required capability are considered.
+
+        :param requirements: Requirements, e.g. {"capabilities": [...]}
+        :param routing: "capability" picks the best capability match, earliest
+            registered on ties; "load_aware" picks among the best matches the
+            healthy model with the lowest expected latency and cost.
+            Defaults to the registry's routing mode.
+        :return: Model ID, or None if no active model matches
+        '''
+        routing = routing or requirements.get("routing") or self.routing
+        if routing not in self.ROUTING_MODES:
+            raise ValueError(f"Unknown routing mode: {routing}")
+
+        matches: Counter = Counter()
+        for capability in set(requirements.get("capabilities", [])):
+            matches.update(self._capability_index.get(capability, ()))
+
+        candidates = [
+            model_id for model_id in matches
+            if self._models[model_id]["config"].status == "active"
+        ]
+        if not candidates:
+            return None
+
+        best_score = max(matches[model_id] for model_id in candidates)
+        best = [model_id for model_id in candidates if matches[model_id] == best_score]
+
+        if routing == "load_aware":
+            healthy = [
+                model_id for model_id in best
+                if self._metrics[model_id].ewma_error_rate < self.max_error_rate
+            ] or best
+            return min(healthy, key=lambda m: (self._routing_cost(m), self._models[m]["order"]))
+
+        return min(best, key=lambda m: self._models[m]["order"])
+
+    def _routing_cost(self, model_id: str) -> float:
+        '''Expected cost of sending one more request to a model'''
+        stats = self._metrics[model_id]
+        # Requests already in flight queue ahead of this one; errors mean retries
+        expected_latency = stats.ewma_latency * (1 + stats.in_flight)
+        expected_latency /= max(0.05, 1.0 - stats.ewma_error_rate)
+        return expected_latency + self.cost_weight * self._models[model_id]["config"].cost_per_1k_tokens
@@ -2,8 +2,20 @@
 Phase Registry for Workflow Management
 """
 
-from typing import Dict, Any, Type
-from pydantic import BaseModel
+import importlib
+import inspect
+import itertools
+import logging
+from collections import OrderedDict
+from importlib import metadata
+from typing import Dict, Any, Type, Optional, AsyncIterator, Sequence, Set, Tuple, Union
+from pydantic import BaseModel, PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+# Entry point group through which installed packages contribute phases,
+# e.g. [project.entry-points."spark.phases"] my_phase = "my_pkg.phases:MyPhase"
+ENTRY_POINT_GROUP = "spark.phases"
 
 class PhaseConfig(BaseModel):
     """Phase configuration"""
@@ -12,49 +24,202 @@ class PhaseConfig(BaseModel):
     description: str
     required_capabilities: list[str]
     prompt_template: str
+    # Names of phases that must complete first. None keeps the legacy
+    # behaviour of depending on the preceding phase by phase_number;
+    # an empty list marks the phase as independent.
+    depends_on: Optional[list[str]] = None
+    # Registered model to use; falls back to a capability match when unset
+    model_id: Optional[str] = None
+    # Override the model's response caching for this phase
+    cache_responses: Optional[bool] = None
+    # Reuse responses of near-duplicate prompts; None uses the phase default
+    semantic_cache: Optional[bool] = None
+    # prompt_template compiled when the workflow was registered
+    _compiled_template: Optional[Any] = PrivateAttr(default=None)
 
 class BasePhase:
     """Base class for workflow phases"""
+    # Stateless phases keep nothing between executions, so one instance per
+    # configuration is reused instead of constructing a phase per execution
+    stateless = False
     
-    def __init__(self, config: PhaseConfig):
-        """Initialize phase with configuration"""
+    def __init__(self, config: PhaseConfig, model_registry: Optional[Any] = None):
+        """
+        Initialize phase with configuration
+
+        :param config: Phase configuration
+        :param model_registry: AIModelRegistry used to resolve model clients
+        """
         self.config = config
+        self.model_registry = model_registry
     
     async def execute(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Execute phase"""
         raise NotImplementedError("Subclasses must implement execute method")
 
+    @classmethod
+    def template_variable_names(cls, dependencies: Sequence[Type["BasePhase"]]) -> Optional[Set[str]]:
+        """
+        Variables a prompt template of this phase may use, checked when a
+        workflow is registered
+
+        :param dependencies: Classes of the phases this phase depends on
+        :return: Top-level variable names, None if not known in advance
+        """
+        return None
+
+    async def execute_stream(self, input_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute phase, yielding partial output as it is produced
+
+        Yields ``{"type": "token", "content": ...}`` events followed by a
+        final ``{"type": "result", "result": ...}`` event. The default
+        implementation has no partial output and only yields the result.
+
+        :param input_data: Input data for the phase
+        :return: Async iterator of stream events
+        """
+        yield {"type": "result", "result": await self.execute(input_data)}
+
 class PhaseRegistry:
-    """Registry for workflow phases"""
+    """
+    Registry for workflow phases
+
+    Phases are registered as classes or as "module:Class" import paths;
+    import paths (including entry points of the "spark.phases" group) are
+    only imported when a workflow first uses the phase.
+    """
     
-    # Use a class-level dictionary to store phase classes
-    _phases: Dict[str, Type[BasePhase]] = {}
+    # Use a class-level dictionary to store phase classes or import paths
+    _phases: Dict[str, Union[Type[BasePhase], str]] = {
+        "input_analysis": "core.phases.base_phase:InputAnalysisPhase",
+        "content_generation": "core.phases.base_phase:ContentGenerationPhase"
+    }
+    _entry_points_loaded = False
+    # Registration number of each phase name, part of cached instance keys
+    # so re-registering a phase retires its cached instances
+    _registrations: Dict[str, int] = {}
+    _registration_counter = itertools.count(1)
+    # Instances of stateless phases without a model registry by (phase name,
+    # config JSON, registration); instances bound to a model registry are
+    # cached in its phase_instances, so they never outlive it
+    _instances: "OrderedDict[Tuple[str, str, int], BasePhase]" = OrderedDict()
+    max_cached_instances = 1024
+    # Whether each phase class's constructor accepts model_registry
+    _accepts_model_registry: Dict[type, bool] = {}
     
     @classmethod
-    def register(cls, phase_name: str, phase_class: Type[BasePhase]):
+    def register(cls, phase_name: str, phase_class: Union[Type[BasePhase], str]):
         """
         Register a new phase type
         
         :param phase_name: Name of the phase
-        :param phase_class: Phase implementation class
+        :param phase_class: Phase implementation class, or its "module:Class"
+            import path to load it on first use
         """
         cls._phases[phase_name] = phase_class
-        print(f"Registered phase: {phase_name}")  # Add debug print
+        cls._registrations[phase_name] = next(cls._registration_counter)
+        logger.debug(f"Registered phase: {phase_name}")
+
+    @classmethod
+    def load_entry_points(cls, group: str = ENTRY_POINT_GROUP):
+        """
+        Register the phases advertised by installed packages
+
+        Only import paths are recorded; explicitly registered phases take
+        precedence over entry points with the same name.
+
+        :param group: Entry point group
+        """
+        cls._entry_points_loaded = True
+        for entry_point in metadata.entry_points(group=group):
+            if entry_point.name not in cls._phases:
+                cls._phases[entry_point.name] = entry_point.value
+                logger.debug(f"Discovered phase plugin: {entry_point.name} -> {entry_point.value}")
+
+    @classmethod
+    def get_phase_class(cls, phase_name: str) -> Type[BasePhase]:
+        """
+        Resolve a phase class, importing it on first use
+
+        :param phase_name: Name of the phase
+        :return: Phase implementation class
+        :raises ValueError: If phase type is unknown or does not resolve to a phase
+        """
+        phase_class = cls._phases.get(phase_name)
+        if phase_class is None and not cls._entry_points_loaded:
+            cls.load_entry_points()
+            phase_class = cls._phases.get(phase_name)
+        if phase_class is None:
+            raise ValueError(f"Unknown phase type: {phase_name}")
+
+        if isinstance(phase_class, str):
+            module_name, _, attribute = phase_class.partition(":")
+            try:
+                resolved = getattr(importlib.import_module(module_name), attribute)
+            except (ImportError, AttributeError) as e:
+                raise ValueError(f"Cannot load phase {phase_name} from {phase_class}: {e}") from e
+            if not (isinstance(resolved, type) and issubclass(resolved, BasePhase)):
+                raise ValueError(f"Phase {phase_name} ({phase_class}) is not a BasePhase subclass")
+            cls._phases[phase_name] = phase_class = resolved
+        return phase_class
     
     @classmethod
-    def get_phase(cls, config: PhaseConfig) -> BasePhase:
+    def get_phase(cls, config: PhaseConfig, model_registry: Optional[Any] = None) -> BasePhase:
         """
         Get phase implementation
+
+        Stateless phases are cached per configuration and model registry.
         
         :param config: Phase configuration
+        :param model_registry: Optional AIModelRegistry, passed to the phase
+            if its constructor accepts it
         :return: Instantiated phase
         :raises ValueError: If phase type is unknown
         """
-        # Print registered phases for debugging
-        print(f"Registered phases: {list(cls._phases.keys())}")
-        
-        phase_class = cls._phases.get(config.phase_name)
-        if not phase_class:
-            raise ValueError(f"Unknown phase type: {config.phase_name}")
-        
-        return phase_class(config)
+        phase_class = cls.get_phase_class(config.phase_name)
+
+        instances = None
+        if getattr(phase_class, "stateless", False):
+            instances = cls._instance_cache(model_registry)
+        if instances is not None:
+            key = (config.phase_name, config.model_dump_json(), cls._registrations.get(config.phase_name, 0))
+            phase = instances.get(key)
+            if phase is not None:
+                instances.move_to_end(key)
+                return phase
+
+        if model_registry is None or not cls._takes_model_registry(phase_class):
+            phase = phase_class(config)
+        else:
+            phase = phase_class(config, model_registry=model_registry)
+
+        if instances is not None:
+            instances[key] = phase
+            while len(instances) > cls.max_cached_instances:
+                instances.popitem(last=False)
+        return phase
+
+    @classmethod
+    def _instance_cache(cls, model_registry: Optional[Any]) -> Optional["OrderedDict"]:
+        """Cached phase instances for a model registry, None if it does not declare them"""
+        if model_registry is None:
+            return cls._instances
+        instances = getattr(model_registry, "phase_instances", None)
+        return instances if isinstance(instances, OrderedDict) else None
+
+    @classmethod
+    def _takes_model_registry(cls, phase_class: Type[BasePhase]) -> bool:
+        """Whether the constructor accepts model_registry, e.g. not __init__(self, config)"""
+        accepts = cls._accepts_model_registry.get(phase_class)
+        if accepts is None:
+            try:
+                parameters = inspect.signature(phase_class).parameters.values()
+            except (TypeError, ValueError):
+                parameters = ()
+            accepts = any(
+                parameter.name == "model_registry" or parameter.kind is inspect.Parameter.VAR_KEYWORD
+                for parameter in parameters
+            )
+            cls._accepts_model_registry[phase_class] = accepts
+        return accepts
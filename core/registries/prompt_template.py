@@ -0,0 +1,131 @@
+"""
+Compiled prompt templates for PhaseConfig.prompt_template
+"""
+
+import logging
+import re
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from ai.models.rate_limit import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_FIELD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*")
+
+class _Field:
+    """Placeholder resolved from the render variables"""
+
+    __slots__ = ("name", "path", "conversion", "format_spec")
+
+    def __init__(self, name: str, conversion: Optional[str], format_spec: str):
+        self.name = name
+        self.path = tuple(name.split("."))
+        self.conversion = conversion
+        self.format_spec = format_spec
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        value: Any = variables
+        for key in self.path:
+            if isinstance(value, dict) and key in value:
+                value = value[key]
+            else:
+                raise ValueError(f"Missing prompt template variable: {self.name}")
+        if self.conversion == "r":
+            value = repr(value)
+        elif self.conversion == "a":
+            value = ascii(value)
+        return format(value, self.format_spec) if self.format_spec else str(value)
+
+class PromptTemplate:
+    """
+    A prompt template parsed once into literal and placeholder segments
+
+    Placeholders use str.format syntax with named, optionally dotted fields
+    (``{topic}``, ``{input_data.tone}``) looked up in the render variables.
+    The leading literal text is kept as one precomputed prefix so every
+    rendering starts with the same bytes, which lets providers reuse their
+    prompt-prefix cache.
+    """
+
+    def __init__(self, template: str):
+        """
+        Parse and validate a template
+
+        :param template: Template text
+        :raises ValueError: If braces are unbalanced or a placeholder is
+            positional or not a dotted identifier
+        """
+        self.template = template
+        segments: List[Union[str, _Field]] = []
+        try:
+            parsed = list(Formatter().parse(template))
+        except ValueError as e:
+            raise ValueError(f"Invalid prompt template: {e}") from e
+
+        for literal, field_name, format_spec, conversion in parsed:
+            if literal:
+                if segments and isinstance(segments[-1], str):
+                    segments[-1] += literal
+                else:
+                    segments.append(literal)
+            if field_name is None:
+                continue
+            if not _FIELD.fullmatch(field_name):
+                raise ValueError(
+                    f"Invalid prompt template placeholder {{{field_name}}}: "
+                    "use named fields such as {topic} or {input_data.topic}"
+                )
+            if format_spec and "{" in format_spec:
+                raise ValueError(f"Nested placeholders are not supported: {{{field_name}:{format_spec}}}")
+            segments.append(_Field(field_name, conversion, format_spec or ""))
+
+        self.prefix = segments.pop(0) if segments and isinstance(segments[0], str) else ""
+        self._body: Tuple[Union[str, _Field], ...] = tuple(segments)
+        self.variables = tuple(dict.fromkeys(s.name for s in segments if isinstance(s, _Field)))
+        self.prefix_tokens = estimate_tokens(self.prefix) if self.prefix else 0
+
+        if self.variables and not self.prefix and any(isinstance(s, str) for s in segments):
+            logger.warning(
+                "Prompt template starts with a placeholder; put static instructions "
+                f"first so providers can cache the prompt prefix: {template[:60]!r}"
+            )
+
+    def render(self, variables: Dict[str, Any]) -> str:
+        """
+        Render the template
+
+        :param variables: Values for the placeholders
+        :return: Prompt text
+        :raises ValueError: If a placeholder has no value
+        """
+        if not self._body:
+            return self.prefix
+        parts = [self.prefix]
+        for segment in self._body:
+            parts.append(segment if isinstance(segment, str) else segment.render(variables))
+        return "".join(parts)
+
+    def render_fields(self, variables: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Render only the placeholders
+
+        This is the part of the prompt that varies between renderings, e.g.
+        what a similarity comparison of two prompts should look at.
+
+        :param variables: Values for the placeholders
+        :return: Rendered value of each placeholder, by field name
+        """
+        return {segment.name: segment.render(variables) for segment in self._body if isinstance(segment, _Field)}
+
+@lru_cache(maxsize=1024)
+def compile_template(template: str) -> PromptTemplate:
+    """
+    Compile a template once; later calls with the same text reuse it
+
+    :param template: Template text
+    :return: Compiled template
+    :raises ValueError: If the template is invalid
+    """
+    return PromptTemplate(template)
@@ -1,7 +1,11 @@
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 from datetime import datetime
 from pydantic import BaseModel
-from .phase_registry import PhaseConfig
+from .phase_registry import PhaseConfig, PhaseRegistry
+from .prompt_template import compile_template
+
+if TYPE_CHECKING:
+    from core.embeddings import Embedder
 
 class WorkflowType(BaseModel):
     '''Workflow type configuration'''
@@ -10,21 +14,146 @@ class WorkflowType(BaseModel):
     description: str
     phases: List[PhaseConfig]
 
+    def phase_dependencies(self) -> Dict[str, List[str]]:
+        '''Map each phase name to the names of the phases it depends on'''
+        dependencies = {}
+        previous = None
+        for phase in sorted(self.phases, key=lambda p: p.phase_number):
+            if phase.depends_on is None:
+                dependencies[phase.phase_name] = [previous] if previous else []
+            else:
+                dependencies[phase.phase_name] = list(phase.depends_on)
+            previous = phase.phase_name
+        return dependencies
+
+    def topological_order(self) -> List[str]:
+        '''
+        Order phase names so every phase follows its dependencies
+
+        :return: Phase names in a valid execution order
+        :raises ValueError: If a dependency is unknown, duplicated or cyclic
+        '''
+        names = [phase.phase_name for phase in self.phases]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate phase names in workflow {self.type_code}")
+
+        dependencies = self.phase_dependencies()
+        for name, deps in dependencies.items():
+            unknown = [dep for dep in deps if dep not in dependencies]
+            if unknown:
+                raise ValueError(f"Phase {name} depends on unknown phases: {unknown}")
+
+        # Kahn's algorithm, breaking ties by phase_number for a stable order
+        phase_numbers = {phase.phase_name: phase.phase_number for phase in self.phases}
+        remaining = {name: set(deps) for name, deps in dependencies.items()}
+        order = []
+        while remaining:
+            ready = sorted(
+                (name for name, deps in remaining.items() if not deps),
+                key=lambda n: phase_numbers[n]
+            )
+            if not ready:
+                raise ValueError(
+                    f"Dependency cycle between phases: {sorted(remaining)}"
+                )
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
 class WorkflowRegistry:
     '''Registry for workflow types'''
-    
-    def __init__(self):
+
+    def __init__(
+        self,
+        embedder: Optional["Embedder"] = None,
+        min_similarity: float = 0.1,
+        default_workflow_type: Optional[str] = None
+    ):
+        '''
+        Initialize the registry
+
+        :param embedder: Embedder of workflow and project descriptions,
+            a HashingEmbedder by default
+        :param min_similarity: Cosine similarity below which a description
+            matches no workflow
+        :param default_workflow_type: Workflow used when no workflow matches,
+            the first registered one by default
+        '''
+        # Imported here so importing the workflow engine does not load numpy
+        from core.embeddings import HashingEmbedder, VectorIndex
+
         self._workflows: Dict[str, WorkflowType] = {}
-    
+        self.embedder = embedder or HashingEmbedder()
+        self.min_similarity = min_similarity
+        self.default_workflow_type = default_workflow_type
+        self._index = VectorIndex(self.embedder.dim)
+
     async def get_workflow(self, type_code: str) -> Optional[WorkflowType]:
         '''Get workflow by type code'''
         return self._workflows.get(type_code)
-    
+
     async def register_workflow(self, workflow: WorkflowType):
         '''Register new workflow type'''
+        # Reject invalid dependency graphs up front rather than mid-execution
+        workflow.topological_order()
+        # Compile prompt templates once so executions only render them, and
+        # reject placeholders the phase will not supply
+        dependencies = workflow.phase_dependencies()
+        for phase in workflow.phases:
+            if phase.prompt_template:
+                try:
+                    template = compile_template(phase.prompt_template)
+                    self._check_template_variables(phase.phase_name, template.variables, dependencies[phase.phase_name])
+                except ValueError as e:
+                    raise ValueError(f"Phase {phase.phase_name}: {e}") from e
+                phase._compiled_template = template
+        self._index.add(workflow.type_code, self.embedder.embed([workflow.description])[0])
         self._workflows[workflow.type_code] = workflow
-    
-    async def identify_workflow_type(self, description: str) -> str:
-        '''Identify appropriate workflow type'''
-        # TODO: Implement AI-based matching
-        return list(self._workflows.keys())[0] if self._workflows else None
\ No newline at end of file
+
+    @staticmethod
+    def _check_template_variables(phase_name: str, variables: Tuple[str, ...], dependencies: List[str]):
+        '''Raise ValueError for template variables the phase does not supply'''
+        try:
+            phase_class = PhaseRegistry.get_phase_class(phase_name)
+            dependency_classes = [PhaseRegistry.get_phase_class(dep) for dep in dependencies]
+        except ValueError:
+            # Phases registered later are only checked when they render
+            return
+        available = phase_class.template_variable_names(dependency_classes)
+        if available is None:
+            return
+        unknown = [name for name in variables if name.split(".")[0] not in available]
+        if unknown:
+            raise ValueError(
+                f"Unknown prompt template variables {unknown}; available: {sorted(available)}"
+            )
+
+    async def identify_workflow_type(self, description: str) -> Optional[str]:
+        '''
+        Identify the workflow whose description is most similar to a
+        project description
+
+        :param description: Project description
+        :return: Workflow type code; the default workflow if none is similar
+            enough, None if no workflows are registered
+        '''
+        matches = self.rank_workflow_types(description, k=1)
+        if matches:
+            return matches[0][0]
+        return self.default_workflow_type or next(iter(self._workflows), None)
+
+    def rank_workflow_types(self, description: str, k: int = 5) -> List[Tuple[str, float]]:
+        '''
+        Rank workflows by similarity to a project description
+
+        :param description: Project description
+        :param k: Maximum number of workflows returned
+        :return: (type code, cosine similarity) pairs, most similar first
+        '''
+        if not description:
+            return []
+        vector = self.embedder.embed([description])[0]
+        return self._index.search(vector, k=k, threshold=self.min_similarity)
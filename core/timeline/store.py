@@ -0,0 +1,178 @@
+"""
+Batched persistence of timeline events
+"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Awaitable
+
+from core.database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+TIMELINE_TABLE = "timeline_events"
+TIMELINE_COLUMNS = ("project_id", "phase_name", "status", "event_time", "result", "error")
+
+TIMELINE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TIMELINE_TABLE} (
+    id BIGSERIAL PRIMARY KEY,
+    project_id TEXT NOT NULL,
+    phase_name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    event_time TIMESTAMPTZ NOT NULL,
+    result JSONB,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS {TIMELINE_TABLE}_project_idx ON {TIMELINE_TABLE} (project_id, event_time);
+"""
+
+# Async callable persisting a batch of event rows
+EventSink = Callable[[List[tuple]], Awaitable[None]]
+
+# Queued by stop() behind the buffered events to end the writer task
+_STOP = object()
+
+async def ensure_timeline_schema():
+    """Create the timeline events table if it does not exist"""
+    await DatabaseManager.execute_query(TIMELINE_SCHEMA)
+
+async def postgres_event_sink(rows: List[tuple]):
+    """
+    Bulk insert event rows with COPY
+
+    :param rows: Tuples ordered as TIMELINE_COLUMNS
+    """
+    async with DatabaseManager.acquire() as conn:
+        await conn.copy_records_to_table(TIMELINE_TABLE, records=rows, columns=TIMELINE_COLUMNS)
+
+class TimelineWriter:
+    """
+    Buffers timeline events and writes them in the background
+
+    Recording an event only enqueues it, so persistence stays off the phase
+    hot path. Events are flushed when a batch fills up or when the flush
+    interval elapses, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[EventSink] = None,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 100000
+    ):
+        """
+        Initialize the writer
+
+        :param sink: Async callable persisting a batch, Postgres by default
+        :param batch_size: Maximum events written per batch
+        :param flush_interval: Maximum seconds an event waits before being written
+        :param max_queue_size: Events buffered before new ones are dropped
+        """
+        self.sink = sink or postgres_event_sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"written": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+    async def start(self):
+        """Start the background flush task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the background task once it has written every buffered event
+
+        The task is not cancelled, so a batch being written when stop() is
+        called is never lost.
+        """
+        if self._task is not None:
+            if not self._task.done():
+                await self._queue.put(_STOP)
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Events recorded while stopping
+        await self.flush()
+        if self.stats["dropped"]:
+            logger.warning(f"Timeline writer dropped {self.stats['dropped']} events with a full buffer")
+
+    def record(
+        self,
+        project_id: str,
+        phase_name: str,
+        status: str,
+        event_time: datetime,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ):
+        """
+        Enqueue a timeline event without waiting for it to be written
+
+        :param project_id: Project the event belongs to
+        :param phase_name: Phase name
+        :param status: Phase status after the event
+        :param event_time: When the event happened
+        :param result: Phase result for completion events
+        :param error: Error message for failure events
+        """
+        row = (
+            project_id,
+            phase_name,
+            str(status.value if hasattr(status, "value") else status),
+            event_time,
+            json.dumps(result, default=str) if result is not None else None,
+            error
+        )
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logger.warning(f"Timeline buffer full, dropped event for project {project_id}")
+
+    async def flush(self):
+        """Write every buffered event now"""
+        while not self._queue.empty():
+            batch = []
+            while not self._queue.empty() and len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+            await self._write(batch)
+
+    async def _run(self):
+        """Collect events into batches and write them until stop() is called"""
+        loop = asyncio.get_running_loop()
+        while True:
+            row = await self._queue.get()
+            if row is _STOP:
+                return
+            batch = [row]
+            stopping = False
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    row = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if row is _STOP:
+                    stopping = True
+                    break
+                batch.append(row)
+            await self._write(batch)
+            if stopping:
+                return
+
+    async def _write(self, batch: List[tuple]):
+        """Persist one batch, logging rather than raising on failure"""
+        try:
+            await self.sink(batch)
+            self.stats["written"] += len(batch)
+            self.stats["batches"] += 1
+        except Exception as e:
+            self.stats["failed"] += len(batch)
+            logger.error(f"Failed to persist {len(batch)} timeline events: {e}")
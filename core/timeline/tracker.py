@@ -1,7 +1,11 @@
-from typing import Dict, Any
-from datetime import datetime
+import uuid
+from typing import Dict, Any, Optional, TYPE_CHECKING
+from datetime import datetime, timezone
 from enum import Enum
 
+if TYPE_CHECKING:
+    from .store import TimelineWriter
+
 class PhaseStatus(str, Enum):
     NOT_STARTED = "not_started"
     IN_PROGRESS = "in_progress"
@@ -10,32 +14,48 @@ class PhaseStatus(str, Enum):
 
 class ProjectTimeline:
     '''Tracks project execution timeline'''
-    
-    def __init__(self):
+
+    def __init__(self, project_id: Optional[str] = None, writer: Optional["TimelineWriter"] = None):
+        self.project_id = project_id or uuid.uuid4().hex
+        self.writer = writer
         self.phases: Dict[str, Dict[str, Any]] = {}
-        self.start_time = datetime.now()
-    
+        self.start_time = datetime.now(timezone.utc)
+
     async def start_phase(self, phase_name: str):
         '''Start a phase'''
         self.phases[phase_name] = {
             "status": PhaseStatus.IN_PROGRESS,
-            "start_time": datetime.now()
+            "start_time": datetime.now(timezone.utc)
         }
-    
+        self._persist(phase_name, self.phases[phase_name]["start_time"])
+
     async def complete_phase(self, phase_name: str, result: Dict[str, Any] = None):
         '''Complete a phase'''
         if phase_name in self.phases:
             self.phases[phase_name].update({
                 "status": PhaseStatus.COMPLETED,
-                "end_time": datetime.now(),
+                "end_time": datetime.now(timezone.utc),
                 "result": result
             })
-    
+            self._persist(phase_name, self.phases[phase_name]["end_time"], result=result)
+
     async def fail_phase(self, phase_name: str, error: str):
         '''Mark phase as failed'''
         if phase_name in self.phases:
             self.phases[phase_name].update({
                 "status": PhaseStatus.FAILED,
-                "end_time": datetime.now(),
+                "end_time": datetime.now(timezone.utc),
                 "error": error
-            })
\ No newline at end of file
+            })
+            self._persist(phase_name, self.phases[phase_name]["end_time"], error=error)
+
+    def _persist(self, phase_name: str, event_time: datetime, **details):
+        '''Hand the phase's new state to the background writer, if any'''
+        if self.writer is not None:
+            self.writer.record(
+                self.project_id,
+                phase_name,
+                self.phases[phase_name]["status"],
+                event_time,
+                **details
+            )
@@ -0,0 +1,252 @@
+"""
+Lightweight span tracing with Chrome trace and OpenTelemetry JSON export
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Dict, Any, List, Optional
+
+class Span:
+    """A timed operation, nested under the span that was current when it started"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "lane")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any], lane: int):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64) or 1:016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = "ok"
+        # Task (or thread) the span ran on; spans of one lane nest properly
+        self.lane = lane
+
+    def set(self, **attributes):
+        """Add attributes, e.g. token counts known only at the end"""
+        self.attributes.update(attributes)
+
+    @property
+    def duration_ns(self) -> int:
+        return (self.end_ns or time.perf_counter_ns()) - self.start_ns
+
+class _NoopSpan:
+    """Stand-in span of a disabled tracer; setting attributes does nothing"""
+
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("spark_current_span", default=None)
+
+class _ActiveSpan:
+    """Context manager making a span current until it ends"""
+
+    __slots__ = ("tracer", "span", "token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self.tracer = tracer
+        self.span = span
+        self.token = None
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_span.reset(self.token)
+        self.tracer.end(self.span, exc)
+        return False
+
+def _lane() -> int:
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return id(task) if task is not None else threading.get_ident()
+
+class Tracer:
+    """
+    Records spans of the engine, phases, model calls and loopback delivery
+
+    Spans use the monotonic perf_counter_ns clock and find their parent
+    through a context variable, so concurrent tasks build separate trees.
+    A disabled tracer hands out one shared no-op span without reading the
+    clock or allocating.
+    """
+
+    def __init__(self, enabled: bool = False, max_spans: int = 100000):
+        """
+        Initialize the tracer
+
+        :param enabled: Record spans
+        :param max_spans: Finished spans kept; the oldest are discarded
+        """
+        self.enabled = enabled
+        self._spans: deque = deque(maxlen=max_spans)
+        # Offset converting perf_counter_ns readings to Unix time
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def span(self, name: str, root: bool = False, **attributes):
+        """
+        Start a span, used as ``with tracer.span("phase", phase=name) as span:``
+
+        :param name: Operation name
+        :param root: Start a new trace instead of nesting under the current span
+        :param attributes: Span attributes
+        :return: Context manager yielding the Span (a no-op span when disabled)
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        parent = None if root else _current_span.get()
+        return _ActiveSpan(self, self._new_span(name, parent, attributes))
+
+    @staticmethod
+    def _new_span(name: str, parent: Optional[Span], attributes: Dict[str, Any]) -> Span:
+        if parent is None:
+            return Span(name, f"{random.getrandbits(128) or 1:032x}", None, attributes, _lane())
+        return Span(name, parent.trace_id, parent.span_id, attributes, _lane())
+
+    def start(self, name: str, **attributes):
+        """
+        Start a span without making it current, for operations that
+        suspend across yields (async generators); finish it with ``end``
+
+        :param name: Operation name
+        :param attributes: Span attributes
+        :return: The Span, a no-op span when disabled
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+        return self._new_span(name, _current_span.get(), attributes)
+
+    def end(self, span, error: Optional[BaseException] = None):
+        """
+        Finish a span started with ``start``
+
+        :param span: Span to finish
+        :param error: Exception the operation failed with, if any
+        """
+        if span is NOOP_SPAN:
+            return
+        span.end_ns = time.perf_counter_ns()
+        if error is not None:
+            span.status = "cancelled" if isinstance(error, asyncio.CancelledError) else "error"
+            span.attributes["error"] = str(error) or type(error).__name__
+        self._finish(span)
+
+    def current_span(self):
+        """The innermost active span, a no-op span if there is none or tracing is off"""
+        span = _current_span.get() if self.enabled else None
+        return span if span is not None else NOOP_SPAN
+
+    def _finish(self, span: Span):
+        self._spans.append(span)
+
+    @property
+    def spans(self) -> List[Span]:
+        """Finished spans in the order they ended"""
+        return list(self._spans)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._spans.clear()
+
+    def export_chrome(self) -> Dict[str, Any]:
+        """
+        Finished spans as Chrome trace event JSON, loadable in Perfetto or
+        chrome://tracing
+
+        Each task gets its own track so concurrent phases do not overlap.
+        """
+        lanes: Dict[int, int] = {}
+        events = []
+        for span in sorted(self._spans, key=lambda s: s.start_ns):
+            tid = lanes.setdefault(span.lane, len(lanes) + 1)
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": span.start_ns / 1000,
+                "dur": span.duration_ns / 1000,
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {
+                    **span.attributes,
+                    "trace_id": span.trace_id,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "status": span.status
+                }
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_otel(self, service_name: str = "spark") -> Dict[str, Any]:
+        """Finished spans in the OpenTelemetry OTLP/JSON trace format"""
+        spans = []
+        for span in self._spans:
+            otel_span = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns + self._epoch_offset_ns),
+                "endTimeUnixNano": str((span.end_ns or span.start_ns) + self._epoch_offset_ns),
+                "attributes": [_otel_attribute(key, value) for key, value in span.attributes.items()],
+                # OTLP status codes: 1 ok, 2 error
+                "status": {"code": 1} if span.status == "ok" else {"code": 2, "message": span.status}
+            }
+            if span.parent_id:
+                otel_span["parentSpanId"] = span.parent_id
+            spans.append(otel_span)
+        return {"resourceSpans": [{
+            "resource": {"attributes": [_otel_attribute("service.name", service_name)]},
+            "scopeSpans": [{"scope": {"name": "spark.tracing"}, "spans": spans}]
+        }]}
+
+    def write(self, path: str, format: str = "chrome"):
+        """
+        Write finished spans to a JSON file
+
+        :param path: Output file
+        :param format: "chrome" or "otel"
+        """
+        if format not in ("chrome", "otel"):
+            raise ValueError(f"Unknown trace format: {format}")
+        data = self.export_chrome() if format == "chrome" else self.export_otel()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, default=str)
+
+def _otel_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+# Process-wide tracer, enabled with SPARK_TRACING=1
+tracer = Tracer(enabled=os.getenv("SPARK_TRACING", "").lower() in ("1", "true", "yes"))
@@ -11,26 +11,64 @@ const AIWorkflowViewer = () => {
     { id: "5", data: { label: "Finalization", input: "", output: "" }, position: { x: 250, y: 300 } },
   ]);
 
+  const updateContentNode = (data) =>
+    setNodes((prevNodes) =>
+      prevNodes.map((node) =>
+        node.id === "3" // Assuming Content Generation node updates
+          ? { ...node, data: { ...node.data, ...data } }
+          : node
+      )
+    );
+
   const fetchAIResponse = async () => {
+    const prompt = "Explain how AI improves workflow automation in business.";
+    updateContentNode({ label: "Content Generation ⏳", input: prompt, output: "" });
+
     try {
-      const response = await fetch("http://localhost:8000/generate", {
+      // Stream tokens as Server-Sent Events so output renders as it arrives
+      const response = await fetch("http://localhost:8000/generate/stream", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ prompt: "Explain how AI improves workflow automation in business." }),
+        body: JSON.stringify({ prompt }),
       });
 
-      const data = await response.json();
-      console.log("🔹 AI Response Received:", data);
+      // Overload (503), timeout (504) and validation errors arrive as plain responses, not a stream
+      if (!response.ok) {
+        const detail = await response.text();
+        throw new Error(`HTTP ${response.status}: ${detail || response.statusText}`);
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let output = "";
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const messages = buffer.split("\n\n");
+        buffer = messages.pop();
+
+        for (const message of messages) {
+          const event = message.match(/^event: (.*)$/m)?.[1];
+          const data = JSON.parse(message.match(/^data: (.*)$/m)?.[1] || "{}");
 
-      setNodes((prevNodes) =>
-        prevNodes.map((node) =>
-          node.id === "3" // Assuming Content Generation node updates
-            ? { ...node, data: { label: "Content Generation ✅", input: data.input, output: data.output } }
-            : node
-        )
-      );
+          if (event === "token") {
+            output += data.content;
+            updateContentNode({ output });
+          } else if (event === "done") {
+            console.log("🔹 AI Response Received:", data);
+            updateContentNode({ label: "Content Generation ✅", input: data.input, output: data.output });
+          } else if (event === "error") {
+            throw new Error(data.detail);
+          }
+        }
+      }
     } catch (error) {
       console.error("❌ Error fetching AI response:", error);
+      updateContentNode({ label: "Content Generation ❌", output: error.message });
     }
   };
 
@@ -5,90 +5,57 @@ Spark Project Main Entry Point
 import os
 import asyncio
 import logging
+from typing import Optional
 from dotenv import load_dotenv
 
-# Explicitly import to ensure phases are registered
-from core.phases.base_phase import register_phases
-
-from ai.workflow_engine import DetailedAIWorkflowEngine
-from core.registries.model_registry import ModelConfig
-from core.registries.workflow_registry import WorkflowType
-from core.registries.phase_registry import PhaseConfig
-
-# Load environment variables
-load_dotenv()
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("spark_project.log"),
-        logging.StreamHandler()
-    ]
-)
+# The workflow engine, model clients and database driver are imported inside
+# main(), after argument parsing, so `main.py --help` starts instantly
+
 logger = logging.getLogger(__name__)
 
-async def setup_project_registry(engine):
-    """Setup initial project registries"""
-    try:
-        # Ensure phases are registered
-        register_phases()
-        logger.info("Phases registered")
-
-        # Register a GPT model
-        gpt_model_config = ModelConfig(
-            model_id="gpt_default",
-            provider="openai",
-            model_name="gpt-4-turbo",
-            version="1.0.0",
-            capabilities=["text_generation", "qa", "summarization"],
-            parameters={
-                "temperature": 0.7,
-                "max_tokens": 1000
-            }
-        )
-        await engine.model_registry.register_model(gpt_model_config)
-
-        # Define multiple workflow types
-        workflows = [
-            WorkflowType(
-                type_code="text_generation",
-                name="Text Generation Workflow",
-                description="Workflow for generating text-based content",
-                phases=[
-                    PhaseConfig(
-                        phase_number=1,
-                        phase_name="input_analysis",
-                        description="Analyze input requirements",
-                        required_capabilities=["text_generation"],
-                        prompt_template="Analyze the following input: {input}"
-                    ),
-                    PhaseConfig(
-                        phase_number=2,
-                        phase_name="content_generation",
-                        description="Generate content based on analysis",
-                        required_capabilities=["text_generation"],
-                        prompt_template="Generate content based on: {analysis}"
-                    )
-                ]
-            )
+def configure_logging(level: str = "INFO"):
+    """Log to the console and spark_project.log; done by cli(), not on import"""
+    logging.basicConfig(
+        level=getattr(logging, level),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler("spark_project.log"),
+            logging.StreamHandler()
         ]
+    )
 
-        # Register workflows
-        for workflow in workflows:
-            await engine.workflow_registry.register_workflow(workflow)
-        
-        logger.info("Project registries setup complete")
-    except Exception as e:
-        logger.error(f"Error setting up project registries: {e}", exc_info=True)
-        raise
-
-async def main():
+async def main(
+    max_concurrency: int = 10,
+    persist_timeline: bool = False,
+    checkpoint_dir: Optional[str] = None,
+    trace_path: Optional[str] = None,
+    trace_format: str = "chrome"
+):
     """Main application entry point"""
+    from ai.workflow_engine import DetailedAIWorkflowEngine
+    from ai.workflow_setup import setup_project_registry
+    from core.timeline.store import TimelineWriter, ensure_timeline_schema
+    from core.database import DatabaseManager
+    from core.checkpoint import FileCheckpointStore
+    from core.tracing import tracer
+
+    if trace_path:
+        tracer.enable()
+
+    timeline_writer = None
     try:
+        # Optionally persist timelines to Postgres in the background
+        if persist_timeline:
+            await ensure_timeline_schema()
+            timeline_writer = TimelineWriter()
+            await timeline_writer.start()
+
         # Initialize workflow engine
-        engine = DetailedAIWorkflowEngine()
+        engine = DetailedAIWorkflowEngine(
+            max_concurrency=max_concurrency,
+            timeline_writer=timeline_writer,
+            checkpoint_store=FileCheckpointStore(checkpoint_dir) if checkpoint_dir else None
+        )
         
         # Setup project registries
         await setup_project_registry(engine)
@@ -106,16 +73,24 @@ async def main():
             }
         ]
         
-        # Execute multiple project workflows
+        # Execute multiple project workflows concurrently
         for spec in project_specs:
             logger.info(f"Starting project: {spec['description']}")
-            
-            # Identify workflow type or use a default
-            workflow_type = spec.get('workflow_type') or await engine.workflow_registry.identify_workflow_type(spec['description'])
-            
-            # Execute project workflow
-            result = await engine.execute_project({**spec, 'workflow_type': workflow_type})
-            
+
+        results = await engine.execute_projects(
+            project_specs,
+            max_concurrency=max_concurrency,
+            return_exceptions=True
+        )
+
+        for spec, result in zip(project_specs, results):
+            if isinstance(result, BaseException):
+                logger.error(
+                    f"Project failed: {spec['description']}: {result} "
+                    f"(run id: {getattr(result, 'run_id', None)})"
+                )
+                continue
+
             # Log and process results
             logger.info(f"Project Execution Complete: {spec['description']}")
             logger.info(f"Workflow Type: {result.get('workflow_type')}")
@@ -126,6 +101,13 @@ async def main():
         
     except Exception as e:
         logger.error(f"Project execution failed: {e}", exc_info=True)
+    finally:
+        if timeline_writer is not None:
+            await timeline_writer.stop()
+            await DatabaseManager.close_pool()
+        if trace_path:
+            tracer.write(trace_path, format=trace_format)
+            logger.info(f"Trace written to {trace_path}")
 
 def cli():
     """Command-line interface to run the project"""
@@ -136,14 +118,36 @@ def cli():
                         choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], 
                         default='INFO', 
                         help='Set the logging level')
+    parser.add_argument('--max-concurrency',
+                        type=int,
+                        default=10,
+                        help='Maximum number of projects executed concurrently')
+    parser.add_argument('--persist-timeline',
+                        action='store_true',
+                        help='Persist phase timelines and results to the database')
+    parser.add_argument('--checkpoint-dir',
+                        help='Directory for phase checkpoints used to resume failed runs')
+    parser.add_argument('--trace',
+                        help='Record spans and write them to this JSON file')
+    parser.add_argument('--trace-format',
+                        choices=['chrome', 'otel'],
+                        default='chrome',
+                        help='Trace file format: Chrome trace/Perfetto or OpenTelemetry JSON')
     
     args = parser.parse_args()
 
-    # Set log level
-    logging.getLogger().setLevel(getattr(logging, args.log_level))
+    # Load environment variables and configure logging
+    load_dotenv()
+    configure_logging(args.log_level)
 
     # Run the async main function
-    asyncio.run(main())
+    asyncio.run(main(
+        max_concurrency=args.max_concurrency,
+        persist_timeline=args.persist_timeline,
+        checkpoint_dir=args.checkpoint_dir,
+        trace_path=args.trace,
+        trace_format=args.trace_format
+    ))
 
 if __name__ == "__main__":
     cli()
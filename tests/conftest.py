@@ -2,6 +2,8 @@ import pytest
 import os
 import asyncio
 from dotenv import load_dotenv
+from ai.workflow_engine import DetailedAIWorkflowEngine
+from core.registries import WorkflowType, PhaseConfig, PhaseRegistry, BasePhase
 
 # Load environment variables
 load_dotenv()
@@ -16,4 +18,36 @@ def pytest_configure(config):
 def event_loop():
     loop = asyncio.get_event_loop()
     yield loop
-    loop.close()
\ No newline at end of file
+    loop.close()
+
+class SleepPhase(BasePhase):
+    async def execute(self, input_data):
+        await asyncio.sleep(input_data.get("delay", 0.05))
+        if input_data.get("fail"):
+            raise RuntimeError("boom")
+        return {"name": input_data["name"]}
+
+PhaseRegistry.register("sleep-phase", SleepPhase)
+
+async def _make_sleep_engine(max_concurrency=10):
+    engine = DetailedAIWorkflowEngine(max_concurrency=max_concurrency)
+    await engine.workflow_registry.register_workflow(WorkflowType(
+        type_code="sleep-workflow",
+        name="Sleep Workflow",
+        description="Sleeps",
+        phases=[
+            PhaseConfig(
+                phase_number=1,
+                phase_name="sleep-phase",
+                description="Sleep phase",
+                required_capabilities=[],
+                prompt_template=""
+            )
+        ]
+    ))
+    return engine
+
+@pytest.fixture
+def make_sleep_engine():
+    """Factory of engines running one "sleep-phase" workflow, shared by router and backend tests"""
+    return _make_sleep_engine
@@ -0,0 +1,218 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from backend import websocket_server
+
+class FakeCompletions:
+    async def create(self, model, messages, stream=False):
+        if not stream:
+            content = "Hello world"
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+        async def chunks():
+            for token in ["Hello", " ", "world"]:
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+        return chunks()
+
+@pytest.fixture
+def client(monkeypatch):
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    monkeypatch.setattr(websocket_server, "get_async_client", lambda: fake)
+    return TestClient(websocket_server.app)
+
+def test_sse_stream_forwards_tokens(client):
+    with client.stream("POST", "/generate/stream", json={"prompt": "hi"}) as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    events = [
+        (block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+        for block in body.strip().split("\n\n")
+    ]
+    assert [e for e, _ in events] == ["token", "token", "token", "done"]
+    assert events[-1][1] == {"input": "hi", "output": "Hello world"}
+
+def test_websocket_stream_forwards_tokens(client):
+    with client.websocket_connect("/ws/generate") as ws:
+        ws.send_json({"prompt": "hi"})
+        messages = [ws.receive_json() for _ in range(4)]
+
+    assert [m["type"] for m in messages] == ["token", "token", "token", "done"]
+    assert messages[-1]["output"] == "Hello world"
+
+def test_metrics_endpoint_exports_model_calls(client):
+    with client.stream("POST", "/generate/stream", json={"prompt": "hi"}) as response:
+        "".join(response.iter_text())
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE spark_model_latency_seconds histogram" in body
+    assert f'spark_model_latency_seconds_bucket{{model="{websocket_server.MODEL_NAME}",le="+Inf"}}' in body
+    assert f'spark_model_completion_tokens_total{{model="{websocket_server.MODEL_NAME}"}}' in body
+
+@pytest.mark.asyncio
+async def test_generate_coalesces_identical_prompts(monkeypatch):
+    calls = []
+
+    async def fake_complete(prompt):
+        calls.append(prompt)
+        await asyncio.sleep(0.05)
+        return prompt.upper()
+
+    monkeypatch.setattr(websocket_server, "complete", fake_complete)
+    transport = httpx.ASGITransport(app=websocket_server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        responses = await asyncio.gather(
+            *(http.post("/generate", json={"prompt": "same"}) for _ in range(4)),
+            http.post("/generate", json={"prompt": "other"})
+        )
+
+    assert [r.json()["output"] for r in responses] == ["SAME"] * 4 + ["OTHER"]
+    assert sorted(calls) == ["other", "same"]
+
+class SlowCompletions:
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def create(self, model, messages, stream=False):
+        content = messages[0]["content"]
+        if stream:
+            async def chunks():
+                await asyncio.sleep(self.delay)
+                yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+            return chunks()
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+@pytest.fixture
+def slow_backend(monkeypatch):
+    def configure(delay, **limits):
+        fake = SimpleNamespace(chat=SimpleNamespace(completions=SlowCompletions(delay)))
+        monkeypatch.setattr(websocket_server, "get_async_client", lambda: fake)
+        websocket_server.configure_generate_limits(**limits)
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=websocket_server.app), base_url="http://test")
+
+    yield configure
+    websocket_server.configure_generate_limits()
+
+def test_generate_uses_async_client(client):
+    response = client.post("/generate", json={"prompt": "hi"})
+    assert response.json() == {"input": "hi", "output": "Hello world"}
+
+@pytest.mark.asyncio
+async def test_generate_runs_requests_concurrently_and_sheds_overflow(slow_backend):
+    async with slow_backend(0.1, max_concurrency=2, max_queue=2) as http:
+        responses = await asyncio.gather(
+            *(http.post("/generate", json={"prompt": f"p{i}"}) for i in range(6))
+        )
+        statuses = sorted(r.status_code for r in responses)
+        assert statuses == [200] * 4 + [503] * 2
+        shed = next(r for r in responses if r.status_code == 503)
+        assert shed.headers["retry-after"] == "1"
+
+        metrics = (await http.get("/metrics")).text
+        assert "spark_generate_rejected_total 2" in metrics
+
+@pytest.mark.asyncio
+async def test_generate_times_out(slow_backend):
+    async with slow_backend(1.0, timeout=0.05) as http:
+        response = await http.post("/generate", json={"prompt": "slow"})
+    assert response.status_code == 504
+    assert websocket_server.generate_gate.active == 0
+
+def sse_events(body):
+    return [block.split("\n")[0][len("event: "):] for block in body.strip().split("\n\n")]
+
+@pytest.mark.asyncio
+async def test_streaming_endpoints_share_the_generate_gate(slow_backend):
+    async with slow_backend(0.1, max_concurrency=1, max_queue=0) as http:
+        async def second_request():
+            await asyncio.sleep(0.02)
+            return await http.post("/generate/stream", json={"prompt": "second"})
+
+        first, second = await asyncio.gather(
+            http.post("/generate/stream", json={"prompt": "first"}), second_request()
+        )
+        assert sse_events(first.text) == ["token", "done"]
+        assert second.status_code == 503
+        assert websocket_server.generate_gate.active == 0
+
+@pytest.mark.asyncio
+async def test_streaming_endpoints_time_out(slow_backend):
+    async with slow_backend(1.0, timeout=0.05) as http:
+        response = await http.post("/generate/stream", json={"prompt": "slow"})
+    assert sse_events(response.text) == ["error"]
+    assert "timed out" in response.text
+    assert websocket_server.generate_gate.active == 0
+
+def test_websocket_reports_overload(client):
+    websocket_server.configure_generate_limits(max_concurrency=1, max_queue=0)
+    try:
+        gate = websocket_server.generate_gate
+        gate._semaphore = asyncio.Semaphore(0)
+        with client.websocket_connect("/ws/generate") as ws:
+            ws.send_json({"prompt": "hi"})
+            message = ws.receive_json()
+        assert message["type"] == "error" and message["detail"].startswith("Server overloaded")
+        assert gate.rejected == 1
+    finally:
+        websocket_server.configure_generate_limits()
+
+@pytest.mark.parametrize("limits", [{"max_concurrency": 0}, {"max_queue": -1}, {"timeout": 0}])
+def test_invalid_generate_limits_are_rejected(limits):
+    gate = websocket_server.generate_gate
+    with pytest.raises(ValueError):
+        websocket_server.configure_generate_limits(**limits)
+    assert websocket_server.generate_gate is gate
+
+@pytest.mark.asyncio
+async def test_load_harness_against_fake_openai():
+    import argparse
+    from benchmarks.load_generate import main_async
+
+    args = argparse.Namespace(
+        url=None, requests=20, concurrency=5, unique_prompts=1000, latency=0.01, jitter=0.0,
+        max_concurrency=4, max_queue=100, timeout=10.0
+    )
+    result = await main_async(args)
+    websocket_server.configure_generate_limits()
+
+    assert result["statuses"] == {200: 20}
+    assert result["rps"] > 0
+    assert result["p99_ms"] >= result["p50_ms"]
+
+@pytest.mark.asyncio
+async def test_job_endpoints_submit_poll_stream_and_fetch(make_sleep_engine):
+    from ai.job_queue import JobQueue
+
+    websocket_server.set_job_queue(JobQueue(await make_sleep_engine(), workers=2))
+    transport = httpx.ASGITransport(app=websocket_server.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            response = await http.post("/jobs", json={"name": "job", "delay": 0.05})
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+
+            assert (await http.get(f"/jobs/{job_id}/result")).status_code == 409
+
+            async with http.stream("GET", f"/jobs/{job_id}/events") as stream:
+                body = "".join([chunk async for chunk in stream.aiter_text()])
+            names = [block.split("\n")[0][len("event: "):] for block in body.strip().split("\n\n")]
+            assert names == ["phase_started", "phase_completed", "project_completed", "job_finished"]
+
+            status = (await http.get(f"/jobs/{job_id}")).json()
+            assert status["status"] == "completed"
+            assert status["timeline"]["phases"]["sleep-phase"]["status"] == "completed"
+
+            result = (await http.get(f"/jobs/{job_id}/result")).json()
+            assert result["result"]["results"]["sleep-phase"] == {"name": "job"}
+
+            assert (await http.get("/jobs/unknown")).status_code == 404
+    finally:
+        await (await websocket_server.get_job_queue()).stop()
+        websocket_server.set_job_queue(None)
@@ -0,0 +1,47 @@
+import pytest
+from core.checkpoint import FileCheckpointStore, SQLiteCheckpointStore, phase_fingerprint
+
+@pytest.fixture(params=["file", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "file":
+        yield FileCheckpointStore(str(tmp_path / "checkpoints"))
+    else:
+        store = SQLiteCheckpointStore(str(tmp_path / "checkpoints.db"))
+        yield store
+        store.close()
+
+@pytest.mark.asyncio
+async def test_checkpoint_round_trip(store):
+    await store.save("run-1", "analysis", "fp-a", {"analysis": "text"})
+    await store.save("run-1", "generation", "fp-g", {"generated_content": "post"})
+    await store.save("run-1", "analysis", "fp-a2", {"analysis": "newer"})
+    await store.save("run-2", "analysis", "fp-x", {"analysis": "other"})
+
+    checkpoints = await store.load("run-1")
+    assert checkpoints == {
+        "analysis": {"fingerprint": "fp-a2", "result": {"analysis": "newer"}},
+        "generation": {"fingerprint": "fp-g", "result": {"generated_content": "post"}}
+    }
+
+    await store.delete("run-1")
+    assert await store.load("run-1") == {}
+    assert list(await store.load("run-2")) == ["analysis"]
+
+@pytest.mark.asyncio
+async def test_file_store_keeps_hostile_names_inside_its_directory(tmp_path):
+    directory = tmp_path / "checkpoints"
+    store = FileCheckpointStore(str(directory))
+    await store.save("../../outside", "../../../escaped", "fp", {"analysis": "text"})
+    await store.save("/absolute", "a/b", "fp", {})
+
+    assert [path for path in tmp_path.rglob("*") if directory not in path.parents and path != directory] == []
+    assert await store.load("../../outside") == {"../../../escaped": {"fingerprint": "fp", "result": {"analysis": "text"}}}
+    assert list(await store.load("/absolute")) == ["a/b"]
+
+def test_fingerprint_ignores_run_ids_but_not_inputs():
+    config = {"phase_name": "analysis"}
+    base = phase_fingerprint(config, {"topic": "a", "run_id": "1"}, [])
+    assert base == phase_fingerprint(config, {"topic": "a", "run_id": "2"}, [])
+    assert base != phase_fingerprint(config, {"topic": "b"}, [])
+    assert base != phase_fingerprint(config, {"topic": "a"}, ["upstream"])
+    assert base != phase_fingerprint({"phase_name": "other"}, {"topic": "a"}, [])
@@ -1,4 +1,5 @@
 import pytest
+from contextlib import asynccontextmanager
 from core.database import DatabaseManager
 
 @pytest.mark.asyncio
@@ -9,4 +10,95 @@ async def test_database_connection():
         result = await DatabaseManager.execute_query(query)
         assert result is not None
     except Exception as e:
-        pytest.fail(f"Database connection failed: {str(e)}")
\ No newline at end of file
+        pytest.fail(f"Database connection failed: {str(e)}")
+
+class FakeTransaction:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        self.conn.calls.append(("begin",))
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.conn.calls.append(("rollback",) if exc_type else ("commit",))
+
+class FakeConnection:
+    def __init__(self):
+        self.calls = []
+
+    async def execute(self, query, *args):
+        self.calls.append(("execute", query, args))
+        return "OK"
+
+    async def executemany(self, query, args):
+        self.calls.append(("executemany", query, list(args)))
+
+    async def fetch(self, query, *args):
+        return [{"value": 1}]
+
+    async def fetchrow(self, query, *args):
+        return {"value": 1}
+
+    async def fetchval(self, query, *args):
+        return 1
+
+    def transaction(self):
+        return FakeTransaction(self)
+
+class FakePool:
+    def __init__(self, **options):
+        self.options = options
+        self.conn = FakeConnection()
+        self.acquired = 0
+        self.closed = False
+
+    @asynccontextmanager
+    async def acquire(self):
+        self.acquired += 1
+        yield self.conn
+
+    async def close(self):
+        self.closed = True
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    pools = []
+
+    async def create_pool(**options):
+        pools.append(FakePool(**options))
+        return pools[-1]
+
+    monkeypatch.setattr("asyncpg.create_pool", create_pool)
+    monkeypatch.setenv("DB_POOL_MAX_SIZE", "4")
+    monkeypatch.setattr(DatabaseManager, "_pool", None)
+    return pools
+
+@pytest.mark.asyncio
+async def test_queries_share_one_pool(fake_pool):
+    assert await DatabaseManager.execute_query("SELECT 1") == "OK"
+    assert await DatabaseManager.fetch("SELECT 1") == [{"value": 1}]
+    assert await DatabaseManager.fetchrow("SELECT 1") == {"value": 1}
+    assert await DatabaseManager.fetchval("SELECT 1") == 1
+    await DatabaseManager.executemany("INSERT INTO t VALUES ($1)", [(1,), (2,)])
+
+    assert len(fake_pool) == 1
+    pool = fake_pool[0]
+    assert pool.acquired == 5
+    assert pool.options["max_size"] == 4
+    assert pool.options["statement_cache_size"] == 100
+
+    await DatabaseManager.close_pool()
+    assert pool.closed
+
+@pytest.mark.asyncio
+async def test_transaction_commits_and_rolls_back(fake_pool):
+    async with DatabaseManager.transaction() as conn:
+        await conn.execute("INSERT INTO t VALUES (1)")
+
+    with pytest.raises(RuntimeError):
+        async with DatabaseManager.transaction() as conn:
+            raise RuntimeError("fail")
+
+    calls = [call[0] for call in fake_pool[0].conn.calls]
+    assert calls == ["begin", "execute", "commit", "begin", "rollback"]
+    await DatabaseManager.close_pool()
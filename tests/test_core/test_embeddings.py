@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+from core.embeddings import HashingEmbedder, VectorIndex
+from core.registries import WorkflowRegistry, WorkflowType, PhaseConfig
+
+def workflow(type_code, description):
+    return WorkflowType(
+        type_code=type_code,
+        name=type_code,
+        description=description,
+        phases=[PhaseConfig(
+            phase_number=1,
+            phase_name="input_analysis",
+            description="Analyze",
+            required_capabilities=[],
+            prompt_template=""
+        )]
+    )
+
+def test_hashing_embedder_is_deterministic_and_word_based():
+    embedder = HashingEmbedder(dim=256)
+    first, second, other = embedder.embed(["Write a blog post", "write a BLOG post!", "translate legal contracts"])
+
+    assert first.shape == (256,) and first.dtype == np.float32
+    assert np.array_equal(first, second)
+    assert not np.array_equal(first, other)
+
+    with pytest.raises(ValueError):
+        HashingEmbedder(dim=300)
+
+def test_vector_index_search_add_replace_remove():
+    index = VectorIndex(dim=3, capacity=1)
+    index.add("x", np.array([1.0, 0.0, 0.0]))
+    index.add("y", np.array([0.0, 2.0, 0.0]))
+    index.add("xy", np.array([1.0, 1.0, 0.0]))
+
+    assert len(index) == 3
+    assert index.search(np.array([3.0, 0.1, 0.0]), k=2)[0][0] == "x"
+    ranked = index.search(np.array([1.0, 1.0, 0.0]), k=3)
+    assert ranked[0] == ("xy", pytest.approx(1.0))
+    assert sorted(key for key, _ in ranked[1:]) == ["x", "y"]
+    assert index.search(np.array([0.0, 0.0, 1.0]), threshold=0.5) == []
+
+    index.add("x", np.array([0.0, 0.0, 1.0]))
+    assert index.search(np.array([0.0, 0.0, 1.0]))[0] == ("x", pytest.approx(1.0))
+
+    assert index.remove("x") and not index.remove("x")
+    assert sorted(index.keys) == ["xy", "y"]
+    assert index.search(np.array([0.0, 1.0, 0.0]))[0][0] == "y"
+
+@pytest.mark.asyncio
+async def test_identify_workflow_type_picks_most_similar_description():
+    registry = WorkflowRegistry()
+    await registry.register_workflow(workflow("blog", "Write long-form blog posts and technical articles"))
+    await registry.register_workflow(workflow("translation", "Translate documents between languages"))
+    await registry.register_workflow(workflow("summary", "Summarize meeting notes into action items"))
+
+    assert await registry.identify_workflow_type("Translate this contract into German and other languages") == "translation"
+    assert await registry.identify_workflow_type("A technical blog post about caching") == "blog"
+    assert await registry.identify_workflow_type("Summarize the notes from our meeting") == "summary"
+    # Unmatched descriptions fall back to the default workflow
+    assert await registry.identify_workflow_type("zzz qqq") == "blog"
+    registry.default_workflow_type = "summary"
+    assert await registry.identify_workflow_type("") == "summary"
+    assert await WorkflowRegistry().identify_workflow_type("anything") is None
+
+    ranked = registry.rank_workflow_types("technical articles", k=3)
+    assert ranked[0][0] == "blog"
+    assert all(score >= registry.min_similarity for _, score in ranked)
+
+@pytest.mark.asyncio
+async def test_identify_workflow_type_uses_pluggable_embedder():
+    class KeywordEmbedder:
+        dim = 2
+
+        def embed(self, texts):
+            return np.array([[text.count("red"), text.count("blue")] for text in texts], dtype=np.float32)
+
+    registry = WorkflowRegistry(embedder=KeywordEmbedder())
+    await registry.register_workflow(workflow("red", "red"))
+    await registry.register_workflow(workflow("blue", "blue"))
+
+    assert await registry.identify_workflow_type("blue blue red") == "blue"
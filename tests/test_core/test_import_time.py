@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+from benchmarks.bench_import_time import HEAVY_MODULES, measure_import
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Generous regression budget; importing main takes well under 100 ms when
+# nothing heavy leaks in, and over a second when LangChain does
+MAIN_IMPORT_BUDGET_MS = 500
+
+def test_cli_startup_skips_heavy_imports(tmp_path):
+    result = measure_import("main", repeat=1)
+    assert result["heavy_modules"] == []
+    assert result["total_ms"] < MAIN_IMPORT_BUDGET_MS
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(ROOT, "main.py"), "--help"],
+        capture_output=True, text=True, cwd=tmp_path, check=True
+    )
+    assert "usage:" in completed.stdout
+    loaded = {line.split("|")[-1].strip() for line in completed.stderr.splitlines()}
+    assert not loaded & set(HEAVY_MODULES)
+    # Importing main and printing help write no log file
+    assert list(tmp_path.iterdir()) == []
+
+def test_engine_import_defers_provider_sdks():
+    assert measure_import("ai.workflow_engine", repeat=1)["heavy_modules"] == []
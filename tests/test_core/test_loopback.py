@@ -0,0 +1,209 @@
+import asyncio
+import pytest
+from core.loopback.loopback import LoopbackManager
+
+@pytest.mark.asyncio
+async def test_responses_queue_in_order_without_callback():
+    manager = LoopbackManager()
+    for i in range(3):
+        await manager.send_response("wf", {"i": i})
+
+    assert await manager.retrieve_queued_response("wf") == {"i": 0}
+    assert [await manager.retrieve_queued_response("wf") for _ in range(3)] == [{"i": 1}, {"i": 2}, None]
+    assert await manager.retrieve_queued_response("unknown") is None
+
+@pytest.mark.asyncio
+async def test_failed_callback_queues_the_response():
+    manager = LoopbackManager()
+
+    async def failing(response):
+        raise RuntimeError("consumer down")
+
+    await manager.register_callback("wf", failing)
+    await manager.send_response("wf", {"i": 1})
+    await manager.flush()
+    assert await manager.retrieve_queued_response("wf") == {"i": 1}
+    assert manager.subscription_stats()["subscriptions"]["wf#1"]["failed"] == 1
+    await manager.close()
+
+@pytest.mark.asyncio
+async def test_drop_oldest_bounds_the_queue():
+    manager = LoopbackManager(max_queue_size=2, overflow="drop_oldest")
+    for i in range(5):
+        await manager.send_response("wf", {"i": i})
+
+    stats = manager.queue_stats()["wf"]
+    assert stats["depth"] == 2 and stats["dropped"] == 3 and stats["max_depth"] == 2
+    assert [await manager.retrieve_queued_response("wf") for _ in range(2)] == [{"i": 3}, {"i": 4}]
+
+@pytest.mark.asyncio
+async def test_block_policy_applies_backpressure():
+    manager = LoopbackManager()
+    manager.configure_queue("wf", max_size=1, overflow="block")
+    await manager.send_response("wf", {"i": 0})
+
+    producer = asyncio.create_task(manager.send_response("wf", {"i": 1}))
+    await asyncio.sleep(0.02)
+    assert not producer.done()
+
+    received = []
+    async for response in manager.consume("wf"):
+        received.append(response)
+        if len(received) == 2:
+            break
+    await producer
+    assert received == [{"i": 0}, {"i": 1}]
+    assert manager.queue_stats()["wf"]["blocked_seconds"] > 0
+
+@pytest.mark.asyncio
+async def test_spill_keeps_every_response_in_order(tmp_path):
+    manager = LoopbackManager(max_queue_size=2, overflow="spill", spill_dir=str(tmp_path))
+    for i in range(5):
+        await manager.send_response("wf/1", {"i": i})
+    assert manager.queue_stats()["wf/1"]["spill_pending"] == 3
+
+    received = [await manager.retrieve_queued_response("wf/1") for _ in range(3)]
+    # Responses sent while older ones are still spilled go behind them
+    await manager.send_response("wf/1", {"i": 5})
+    received += [await manager.retrieve_queued_response("wf/1") for _ in range(4)]
+
+    assert received == [{"i": i} for i in range(6)] + [None]
+    assert manager.queue_stats()["wf/1"]["spilled"] == 4
+    assert list(tmp_path.iterdir()) == []
+
+def test_configure_queue_validates_policy():
+    manager = LoopbackManager()
+    with pytest.raises(ValueError):
+        manager.configure_queue("wf", overflow="unbounded")
+    with pytest.raises(ValueError):
+        LoopbackManager(overflow="unbounded")
+
+@pytest.mark.asyncio
+async def test_publish_fans_out_to_exact_and_wildcard_subscribers():
+    manager = LoopbackManager()
+    received = {"exact": [], "wildcard": [], "other": []}
+
+    def collect(name):
+        async def callback(message):
+            received[name].append(message)
+        return callback
+
+    manager.subscribe("workflow_analysis", collect("exact"))
+    manager.subscribe("workflow_*", collect("wildcard"))
+    manager.subscribe("other", collect("other"))
+
+    assert await manager.publish("workflow_analysis", 1) == 2
+    assert await manager.publish("workflow_content", 2) == 1
+    await manager.flush()
+
+    assert received == {"exact": [1], "wildcard": [1, 2], "other": []}
+    await manager.close()
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_does_not_delay_publishers_or_others():
+    manager = LoopbackManager()
+    fast, slow = [], []
+
+    async def slow_callback(message):
+        await asyncio.sleep(0.05)
+        slow.append(message)
+
+    async def fast_callback(message):
+        fast.append(message)
+
+    manager.subscribe("topic", slow_callback)
+    manager.subscribe("topic", fast_callback)
+
+    start = asyncio.get_running_loop().time()
+    for i in range(5):
+        await manager.publish("topic", i)
+    assert asyncio.get_running_loop().time() - start < 0.02
+
+    await asyncio.sleep(0.01)
+    assert fast == [0, 1, 2, 3, 4]
+    await manager.flush()
+    # Each subscriber receives messages in publish order
+    assert slow == [0, 1, 2, 3, 4]
+    await manager.close()
+
+@pytest.mark.asyncio
+async def test_bounded_in_flight_and_micro_batching():
+    manager = LoopbackManager()
+    batches = []
+    release = asyncio.Event()
+
+    async def batched(messages):
+        await release.wait()
+        batches.append(messages)
+
+    subscription = manager.subscribe("topic", batched, max_in_flight=3, batch_size=4, batch_interval=0.01)
+    for i in range(10):
+        await manager.publish("topic", i)
+    await asyncio.sleep(0.05)
+    # The first batch holds the newest max_in_flight messages and is stuck in the callback
+    for i in range(10, 15):
+        await manager.publish("topic", i)
+    await asyncio.sleep(0.01)
+    assert subscription.queue.depth == 3
+    release.set()
+    await manager.flush()
+
+    assert batches == [[7, 8, 9], [12, 13, 14]]
+    assert manager.subscription_stats()["subscriptions"][subscription.name]["queue"]["dropped"] == 9
+    await manager.close()
+
+@pytest.mark.asyncio
+async def test_register_callback_replaces_previous_callback():
+    manager = LoopbackManager()
+    first, second = [], []
+
+    async def first_callback(message):
+        first.append(message)
+
+    async def second_callback(message):
+        second.append(message)
+
+    await manager.register_callback("wf", first_callback)
+    await manager.register_callback("wf", second_callback)
+    await manager.send_response("wf", {"i": 1})
+    await manager.flush()
+    assert first == [] and second == [{"i": 1}]
+
+    manager.clear_callback("wf")
+    await manager.send_response("wf", {"i": 2})
+    assert await manager.retrieve_queued_response("wf") == {"i": 2}
+    await manager.close()
+
+@pytest.mark.asyncio
+async def test_publish_waits_behind_a_blocked_subscriber():
+    manager = LoopbackManager(max_pending=3)
+    received = []
+    release = asyncio.Event()
+
+    async def blocked(message):
+        await release.wait()
+        received.append(message)
+
+    subscription = manager.subscribe("topic", blocked, max_in_flight=2, overflow="block")
+
+    async def produce():
+        for i in range(100):
+            await manager.publish("topic", i)
+
+    producer = asyncio.create_task(produce())
+    await asyncio.sleep(0.05)
+    # Buffered messages stay bounded instead of growing with each publish
+    assert not producer.done()
+    assert manager.subscription_stats()["dispatch_pending"] <= 3
+    assert subscription.queue.depth <= 2
+
+    release.set()
+    await producer
+    await manager.flush()
+    assert received == list(range(100))
+    assert manager.subscription_stats()["publish_blocked_seconds"] > 0
+    await manager.close()
+
+def test_max_pending_must_be_positive():
+    with pytest.raises(ValueError):
+        LoopbackManager(max_pending=0)
@@ -0,0 +1,81 @@
+import pytest
+from core.phases.base_phase import InputAnalysisPhase, ContentGenerationPhase
+from core.registries import WorkflowRegistry, WorkflowType, PhaseConfig, PromptTemplate, compile_template
+
+def phase_config(name, template=""):
+    return PhaseConfig(
+        phase_number=1,
+        phase_name=name,
+        description=name,
+        required_capabilities=[],
+        prompt_template=template
+    )
+
+def test_template_keeps_static_prefix_and_renders_fields():
+    template = PromptTemplate("Summarize for a {tone} reader.\nTopic: {topic}\nTone: {input_data.tone!r}")
+
+    assert template.prefix == "Summarize for a "
+    assert template.variables == ("tone", "topic", "input_data.tone")
+    assert template.prefix_tokens > 0
+    assert template.render({"tone": "casual", "topic": "caching", "input_data": {"tone": "casual"}}) == \
+        "Summarize for a casual reader.\nTopic: caching\nTone: 'casual'"
+
+def test_template_rejects_invalid_placeholders():
+    for text in ("Positional {}", "Index {0}", "Unbalanced {topic", "Expression {a-b}"):
+        with pytest.raises(ValueError):
+            PromptTemplate(text)
+
+    with pytest.raises(ValueError, match="topic"):
+        PromptTemplate("Topic: {topic}").render({})
+
+def test_compile_template_is_cached():
+    assert compile_template("Static {x}") is compile_template("Static {x}")
+
+@pytest.mark.asyncio
+async def test_register_workflow_validates_templates():
+    registry = WorkflowRegistry()
+    with pytest.raises(ValueError, match="broken"):
+        await registry.register_workflow(WorkflowType(
+            type_code="broken",
+            name="Broken",
+            description="Broken template",
+            phases=[phase_config("broken", "Use {0}")]
+        ))
+
+@pytest.mark.asyncio
+async def test_register_workflow_checks_template_variables():
+    registry = WorkflowRegistry()
+    analysis = phase_config("input_analysis", "Analyze {topic} for {input.audience}")
+    generation = phase_config("content_generation", "Write about {topic}:\n{analysis}")
+    generation.depends_on = ["input_analysis"]
+    await registry.register_workflow(WorkflowType(
+        type_code="valid", name="Valid", description="Valid templates", phases=[analysis, generation]
+    ))
+    # The compiled template is kept with the config and used when rendering
+    assert ContentGenerationPhase(generation).prompt_template() is generation._compiled_template
+
+    misspelled = phase_config("content_generation", "Write about {topic}:\n{analysys}")
+    with pytest.raises(ValueError, match="analysys"):
+        await registry.register_workflow(WorkflowType(
+            type_code="typo", name="Typo", description="Unknown variable", phases=[misspelled]
+        ))
+
+def test_phase_prompts_share_static_prefix():
+    phase = InputAnalysisPhase(phase_config("input_analysis"))
+    prompts = [
+        phase.build_prompt({"description": "d", "input_data": {"topic": topic}})
+        for topic in ("queues", "caches")
+    ]
+
+    prefix = phase.prompt_template().prefix
+    assert all(prompt.startswith(prefix) for prompt in prompts)
+    assert "Topic: queues" in prompts[0] and "Tone: professional" in prompts[0]
+
+def test_config_template_overrides_default_and_reads_dependency_results():
+    phase = ContentGenerationPhase(phase_config("content_generation", "Write about {topic}:\n{analysis}"))
+    prompt = phase.build_prompt({
+        "input_data": {"topic": "tracing"},
+        "phase_results": {"input_analysis": {"analysis": "spans", "input_data": {}}}
+    })
+
+    assert prompt == "Write about tracing:\nspans"
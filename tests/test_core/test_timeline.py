@@ -1,6 +1,11 @@
+import asyncio
+import json
 import pytest
+from contextlib import asynccontextmanager
 from datetime import datetime
+from core.database import DatabaseManager
 from core.timeline.tracker import ProjectTimeline, PhaseStatus
+from core.timeline.store import TimelineWriter, postgres_event_sink
 
 @pytest.fixture
 def timeline():
@@ -21,4 +26,104 @@ async def test_phase_tracking(timeline):
     
     # Verify timing
     assert isinstance(timeline.phases[phase_name]["start_time"], datetime)
-    assert isinstance(timeline.phases[phase_name]["end_time"], datetime)
\ No newline at end of file
+    assert isinstance(timeline.phases[phase_name]["end_time"], datetime)
+    # Persisted to a TIMESTAMPTZ column, so timestamps carry their zone
+    assert timeline.phases[phase_name]["end_time"].tzinfo is not None
+
+class MemorySink:
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, rows):
+        self.batches.append(rows)
+
+@pytest.mark.asyncio
+async def test_timeline_events_are_persisted_in_batches():
+    sink = MemorySink()
+    writer = TimelineWriter(sink=sink, batch_size=3, flush_interval=10)
+    await writer.start()
+
+    timeline = ProjectTimeline(project_id="project-1", writer=writer)
+    await timeline.start_phase("analysis")
+    await timeline.complete_phase("analysis", {"output": "x"})
+    await timeline.start_phase("generation")
+    await timeline.fail_phase("generation", "boom")
+
+    # The first full batch is written without waiting for the interval
+    await asyncio.sleep(0.05)
+    assert [len(batch) for batch in sink.batches] == [3]
+
+    await writer.stop()
+    rows = [row for batch in sink.batches for row in batch]
+    assert [(row[1], row[2]) for row in rows] == [
+        ("analysis", "in_progress"),
+        ("analysis", "completed"),
+        ("generation", "in_progress"),
+        ("generation", "failed")
+    ]
+    assert all(row[0] == "project-1" for row in rows)
+    assert json.loads(rows[1][4]) == {"output": "x"}
+    assert rows[3][5] == "boom"
+    assert writer.stats["written"] == 4
+
+@pytest.mark.asyncio
+async def test_timeline_writer_flushes_on_interval():
+    sink = MemorySink()
+    writer = TimelineWriter(sink=sink, batch_size=100, flush_interval=0.05)
+    await writer.start()
+
+    await ProjectTimeline(writer=writer).start_phase("analysis")
+    await asyncio.sleep(0.15)
+    assert len(sink.batches) == 1
+    await writer.stop()
+
+class SlowSink(MemorySink):
+    def __init__(self):
+        super().__init__()
+        self.writing = asyncio.Event()
+
+    async def __call__(self, rows):
+        self.writing.set()
+        await asyncio.sleep(0.05)
+        self.batches.append(rows)
+
+@pytest.mark.asyncio
+async def test_stop_during_a_write_persists_every_event():
+    sink = SlowSink()
+    writer = TimelineWriter(sink=sink, batch_size=2, flush_interval=10)
+    await writer.start()
+    for i in range(5):
+        writer.record("project-1", f"phase-{i}", "completed", datetime.now())
+
+    await sink.writing.wait()
+    await writer.stop()
+    assert [row[1] for batch in sink.batches for row in batch] == [f"phase-{i}" for i in range(5)]
+    assert writer.stats["written"] == 5 and writer.stats["dropped"] == 0
+
+@pytest.mark.asyncio
+async def test_full_buffer_drops_are_counted():
+    sink = MemorySink()
+    writer = TimelineWriter(sink=sink, max_queue_size=2)
+    for i in range(5):
+        writer.record("project-1", f"phase-{i}", "completed", datetime.now())
+
+    assert writer.stats["dropped"] == 3
+    await writer.stop()
+    assert writer.stats["written"] == 2
+
+@pytest.mark.asyncio
+async def test_postgres_sink_uses_copy(monkeypatch):
+    copied = {}
+
+    class FakeConnection:
+        async def copy_records_to_table(self, table, records, columns):
+            copied.update(table=table, records=records, columns=columns)
+
+    @asynccontextmanager
+    async def acquire():
+        yield FakeConnection()
+
+    monkeypatch.setattr(DatabaseManager, "acquire", acquire)
+    await postgres_event_sink([("p", "phase", "completed", datetime.now(), None, None)])
+    assert copied["table"] == "timeline_events"
+    assert len(copied["records"]) == 1
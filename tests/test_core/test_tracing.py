@@ -0,0 +1,151 @@
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from ai.models.clients import register_provider
+from ai.workflow_engine import DetailedAIWorkflowEngine
+from core.registries import WorkflowType, PhaseConfig, ModelConfig
+from core.tracing import Tracer, NOOP_SPAN, tracer
+
+def test_disabled_tracer_records_nothing():
+    disabled = Tracer()
+    with disabled.span("work", key="value") as span:
+        span.set(more=1)
+    assert span is NOOP_SPAN
+    assert disabled.current_span() is NOOP_SPAN
+    assert disabled.spans == []
+
+def test_spans_nest_and_record_errors():
+    local = Tracer(enabled=True)
+    with local.span("outer", kind="test") as outer:
+        with local.span("inner") as inner:
+            assert local.current_span() is inner
+        with pytest.raises(RuntimeError):
+            with local.span("failing"):
+                raise RuntimeError("boom")
+        with local.span("detached", root=True) as detached:
+            pass
+    assert local.current_span() is NOOP_SPAN
+
+    failing = next(s for s in local.spans if s.name == "failing")
+    assert [s.name for s in local.spans] == ["inner", "failing", "detached", "outer"]
+    assert inner.parent_id == failing.parent_id == outer.span_id
+    assert inner.trace_id == outer.trace_id != detached.trace_id
+    assert detached.parent_id is None and outer.parent_id is None
+    assert failing.status == "error" and failing.attributes["error"] == "boom"
+    assert outer.start_ns <= inner.start_ns <= inner.end_ns <= outer.end_ns
+
+@pytest.mark.asyncio
+async def test_concurrent_tasks_build_separate_subtrees():
+    local = Tracer(enabled=True)
+
+    async def child(name):
+        with local.span(name):
+            await asyncio.sleep(0.01)
+
+    with local.span("parent") as parent:
+        await asyncio.gather(child("a"), child("b"))
+
+    children = [s for s in local.spans if s.name in ("a", "b")]
+    assert all(s.parent_id == parent.span_id for s in children)
+    assert children[0].lane != children[1].lane
+
+def test_chrome_and_otel_export(tmp_path):
+    local = Tracer(enabled=True)
+    with local.span("outer"):
+        with local.span("inner", model="m", cache_hit=True, tokens=3):
+            pass
+
+    events = local.export_chrome()["traceEvents"]
+    assert [e["name"] for e in events] == ["outer", "inner"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+    assert events[1]["args"]["parent_id"] == events[0]["args"]["span_id"]
+    assert events[1]["args"]["model"] == "m"
+
+    otel = local.export_otel(service_name="test")
+    spans = otel["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    inner = spans[0]
+    assert inner["parentSpanId"] == spans[1]["spanId"] and "parentSpanId" not in spans[1]
+    assert {"key": "cache_hit", "value": {"boolValue": True}} in inner["attributes"]
+    assert {"key": "tokens", "value": {"intValue": "3"}} in inner["attributes"]
+    assert int(inner["endTimeUnixNano"]) >= int(inner["startTimeUnixNano"])
+
+    path = tmp_path / "trace.json"
+    local.write(str(path), format="otel")
+    assert json.loads(path.read_text())["resourceSpans"][0]["scopeSpans"] == otel["resourceSpans"][0]["scopeSpans"]
+    with pytest.raises(ValueError):
+        local.write(str(path), format="xml")
+
+class TracedChatModel:
+    async def ainvoke(self, prompt):
+        return SimpleNamespace(content="traced response")
+
+register_provider("traced-fake", lambda *args, **kwargs: TracedChatModel())
+
+@pytest.fixture
+def enabled_tracer():
+    tracer.clear()
+    tracer.enable()
+    yield tracer
+    tracer.disable()
+    tracer.clear()
+
+@pytest.mark.asyncio
+async def test_engine_run_produces_span_tree(enabled_tracer):
+    engine = DetailedAIWorkflowEngine()
+    await engine.model_registry.register_model(ModelConfig(
+        model_id="traced-fake",
+        provider="traced-fake",
+        model_name="traced",
+        version="1.0",
+        capabilities=["text_generation"],
+        parameters={}
+    ))
+    await engine.workflow_registry.register_workflow(WorkflowType(
+        type_code="traced-workflow",
+        name="Traced Workflow",
+        description="Traced",
+        phases=[PhaseConfig(
+            phase_number=1,
+            phase_name="content_generation",
+            description="Generation",
+            required_capabilities=["text_generation"],
+            prompt_template="",
+            model_id="traced-fake"
+        )]
+    ))
+
+    result = await engine.execute_project({"workflow_type": "traced-workflow", "input_data": {"topic": "t"}})
+    spans = {s.name: s for s in enabled_tracer.spans}
+
+    project, phase = spans["execute_project"], spans["phase"]
+    assert project.attributes["run_id"] == result["run_id"]
+    assert project.attributes["workflow_type"] == "traced-workflow"
+    assert phase.parent_id == project.span_id
+    assert phase.attributes["phase"] == "content_generation" and phase.attributes["prompt_tokens"] > 0
+    assert spans["model.invoke"].parent_id == phase.span_id
+    assert spans["model.call"].parent_id == spans["model.invoke"].span_id
+    assert spans["model.call"].attributes["model"] == "traced"
+    assert all(s.trace_id == project.trace_id for s in (phase, spans["model.invoke"], spans["model.call"]))
+
+@pytest.mark.asyncio
+async def test_loopback_delivery_starts_its_own_trace(enabled_tracer):
+    from core.loopback.loopback import LoopbackManager
+    manager = LoopbackManager()
+    received = []
+
+    async def callback(message):
+        received.append(message)
+
+    manager.subscribe("topic", callback)
+    with tracer.span("producer") as producer:
+        await manager.publish("topic", 1)
+    await manager.flush()
+    await manager.close()
+
+    spans = {s.name: s for s in enabled_tracer.spans}
+    assert received == [1]
+    assert spans["loopback.publish"].parent_id == producer.span_id
+    assert spans["loopback.publish"].attributes == {"topic": "topic", "subscribers": 1}
+    assert spans["loopback.deliver"].parent_id is None
+    assert spans["loopback.deliver"].attributes["messages"] == 1
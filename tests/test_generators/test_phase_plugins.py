@@ -0,0 +1,121 @@
+import gc
+import sys
+import weakref
+from collections import OrderedDict
+from importlib import metadata
+import pytest
+from core.registries import PhaseRegistry, PhaseConfig, BasePhase
+from core.registries import phase_registry
+
+PLUGIN_SOURCE = '''
+from core.registries import BasePhase
+
+class PluginPhase(BasePhase):
+    stateless = True
+
+    async def execute(self, input_data):
+        return {"plugin": self.config.phase_name}
+'''
+
+def config(name, **kwargs):
+    return PhaseConfig(
+        phase_number=1,
+        phase_name=name,
+        description="Plugin phase",
+        required_capabilities=[],
+        prompt_template="",
+        **kwargs
+    )
+
+@pytest.fixture
+def plugin_module(tmp_path, monkeypatch):
+    (tmp_path / "spark_test_plugin.py").write_text(PLUGIN_SOURCE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "spark_test_plugin", raising=False)
+    monkeypatch.setattr(PhaseRegistry, "_phases", dict(PhaseRegistry._phases))
+    monkeypatch.setattr(PhaseRegistry, "_instances", type(PhaseRegistry._instances)())
+    return "spark_test_plugin"
+
+def test_import_path_is_resolved_on_first_use(plugin_module):
+    PhaseRegistry.register("lazy_plugin", f"{plugin_module}:PluginPhase")
+    assert plugin_module not in sys.modules
+
+    phase = PhaseRegistry.get_phase(config("lazy_plugin"))
+    assert type(phase).__name__ == "PluginPhase"
+    assert plugin_module in sys.modules
+
+    PhaseRegistry.register("broken_plugin", f"{plugin_module}:Missing")
+    with pytest.raises(ValueError):
+        PhaseRegistry.get_phase(config("broken_plugin"))
+
+def test_entry_points_are_discovered_lazily(plugin_module, monkeypatch):
+    entry_point = metadata.EntryPoint(
+        name="entry_plugin", value=f"{plugin_module}:PluginPhase", group=phase_registry.ENTRY_POINT_GROUP
+    )
+    monkeypatch.setattr(
+        phase_registry.metadata, "entry_points",
+        lambda group: [entry_point] if group == phase_registry.ENTRY_POINT_GROUP else []
+    )
+    monkeypatch.setattr(PhaseRegistry, "_entry_points_loaded", False)
+
+    phase = PhaseRegistry.get_phase(config("entry_plugin"))
+    assert type(phase).__name__ == "PluginPhase"
+    with pytest.raises(ValueError):
+        PhaseRegistry.get_phase(config("not_installed"))
+
+class Registry:
+    def __init__(self):
+        self.phase_instances = OrderedDict()
+
+class PlainRegistry:
+    pass
+
+def test_stateless_phases_are_reused_per_config(plugin_module):
+    class StatefulPhase(BasePhase):
+        pass
+
+    PhaseRegistry.register("stateless_plugin", f"{plugin_module}:PluginPhase")
+    PhaseRegistry.register("stateful", StatefulPhase)
+    registry_a, registry_b = Registry(), Registry()
+
+    first = PhaseRegistry.get_phase(config("stateless_plugin"), model_registry=registry_a)
+    assert PhaseRegistry.get_phase(config("stateless_plugin"), model_registry=registry_a) is first
+    assert PhaseRegistry.get_phase(config("stateless_plugin"), model_registry=registry_b) is not first
+    assert PhaseRegistry.get_phase(config("stateless_plugin", model_id="other"), model_registry=registry_a) is not first
+
+    assert PhaseRegistry.get_phase(config("stateful")) is not PhaseRegistry.get_phase(config("stateful"))
+
+    # Registries without a phase cache get fresh instances and are left untouched
+    plain = PlainRegistry()
+    assert PhaseRegistry.get_phase(config("stateless_plugin"), model_registry=plain) is not \
+        PhaseRegistry.get_phase(config("stateless_plugin"), model_registry=plain)
+    assert vars(plain) == {}
+
+    # Re-registering drops cached instances
+    PhaseRegistry.register("stateless_plugin", f"{plugin_module}:PluginPhase")
+    assert PhaseRegistry.get_phase(config("stateless_plugin"), model_registry=registry_a) is not first
+
+def test_cached_phases_do_not_keep_model_registries_alive(plugin_module):
+    PhaseRegistry.register("stateless_plugin", f"{plugin_module}:PluginPhase")
+    registry = Registry()
+    phase = PhaseRegistry.get_phase(config("stateless_plugin"), model_registry=registry)
+    assert phase.model_registry is registry
+
+    registry_ref = weakref.ref(registry)
+    del registry, phase
+    gc.collect()
+    assert registry_ref() is None
+
+def test_model_registry_is_only_passed_when_accepted(plugin_module):
+    class ConfigOnlyPhase(BasePhase):
+        def __init__(self, config):
+            super().__init__(config)
+
+    PhaseRegistry.register("config_only", ConfigOnlyPhase)
+    phase = PhaseRegistry.get_phase(config("config_only"), model_registry=Registry())
+    assert isinstance(phase, ConfigOnlyPhase) and phase.model_registry is None
+
+def test_builtin_phases_resolve_without_importing_them_first():
+    phase_class = PhaseRegistry.get_phase_class("input_analysis")
+    assert phase_class.__name__ == "InputAnalysisPhase"
+    assert phase_class.stateless
@@ -0,0 +1,53 @@
+import pytest
+from ai.models import clients
+from core.registries.model_registry import AIModelRegistry, ModelConfig
+
+class RecordingClient:
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+@pytest.fixture(autouse=True)
+def recording_provider():
+    settings = dict(clients._pool_settings)
+    clients.register_provider("recording", RecordingClient)
+    yield
+    clients.clear_clients()
+    clients._pool_settings.update(settings)
+
+def test_clients_are_reused_per_configuration():
+    first = clients.get_chat_client("m", 0.2, provider="recording")
+    assert clients.get_chat_client("m", 0.2, provider="recording") is first
+    assert clients.get_chat_client("m", 0.5, provider="recording") is not first
+    assert clients.get_chat_client("m", 0.2, base_url="http://x", provider="recording") is not first
+
+def test_unknown_provider():
+    with pytest.raises(ValueError):
+        clients.get_chat_client("m", provider="missing")
+
+def test_openai_client_uses_pool_limits():
+    clients.configure_pool(max_connections=7, keepalive_expiry=5)
+    client = clients.get_chat_client("gpt-4-turbo", api_key="test-key")
+    pool = client.http_async_client._transport._pool
+    assert pool._max_connections == 7
+    assert pool._keepalive_expiry == 5
+
+@pytest.mark.asyncio
+async def test_registry_resolves_shared_client():
+    registry = AIModelRegistry()
+    await registry.register_model(ModelConfig(
+        model_id="rec",
+        provider="recording",
+        model_name="rec-model",
+        version="1.0",
+        capabilities=["qa"],
+        parameters={"temperature": 0.1, "max_tokens": 10}
+    ))
+
+    client = await registry.get_client("rec")
+    assert await registry.get_client("rec") is client
+    assert client.args[:2] == ("rec-model", 0.1)
+    assert client.kwargs == {"max_tokens": 10}
+
+    with pytest.raises(ValueError):
+        await registry.get_client("missing")
@@ -0,0 +1,59 @@
+import asyncio
+import time
+import pytest
+from ai.models.clients import get_chat_client, clear_clients
+from ai.models.fake import FakeChatModel, FakeProviderError
+from ai.models.gpt import GPTModel
+from ai.models.invocation import ModelInvoker
+from ai.models.retry import RetryPolicy, is_retryable
+
+@pytest.mark.asyncio
+async def test_responses_are_deterministic_regardless_of_interleaving():
+    prompts = ["a", "b", "a", "c"]
+    first = FakeChatModel(latency=0.01, latency_distribution="exponential", seed=7)
+    second = FakeChatModel(latency=0.01, latency_distribution="exponential", seed=7)
+
+    forward = await asyncio.gather(*(first.ainvoke(p) for p in prompts))
+    shuffled = ["c", "a", "b", "a"]
+    other = [await second.ainvoke(p) for p in shuffled]
+
+    def by_prompt(order, messages):
+        grouped = {}
+        for prompt, message in zip(order, messages):
+            grouped.setdefault(prompt, []).append(message.content)
+        return grouped
+
+    assert by_prompt(prompts, forward) == by_prompt(shuffled, other)
+    # Repeated prompts still get distinct responses
+    assert forward[0].content != forward[2].content
+    assert forward[0].usage_metadata["output_tokens"] == 32
+
+@pytest.mark.asyncio
+async def test_latency_throughput_and_streaming():
+    model = FakeChatModel(latency=0.05, tokens_per_second=200, response_tokens=10)
+    start = time.perf_counter()
+    chunks = [chunk.content async for chunk in model.astream("hi")]
+    assert time.perf_counter() - start >= 0.09
+    assert len(chunks) == 10
+    assert "".join(chunks) == (await FakeChatModel(response_tokens=10, latency=0).ainvoke("hi")).content
+
+@pytest.mark.asyncio
+async def test_injected_errors_are_retryable():
+    model = FakeChatModel(latency=0, error_rate=1.0)
+    with pytest.raises(FakeProviderError) as error:
+        await model.ainvoke("hi")
+    assert is_retryable(error.value)
+
+    flaky = FakeChatModel(latency=0, error_rate=0.5, seed=1)
+    invoker = ModelInvoker(flaky, "fake", retry_policy=RetryPolicy(max_attempts=10, base_delay=0))
+    results = [await invoker.invoke(f"prompt {i}") for i in range(20)]
+    assert all(results)
+    assert flaky.errors > 0
+
+@pytest.mark.asyncio
+async def test_gpt_model_runs_on_fake_provider():
+    model = GPTModel({"model_name": "fake-gpt", "provider": "fake", "client_parameters": {"latency": 0}})
+    result = await model.process({"prompt": "Test prompt"})
+    assert isinstance(result["response"], str) and result["response"]
+    assert isinstance(get_chat_client("fake-gpt", provider="fake", latency=0), FakeChatModel)
+    clear_clients()
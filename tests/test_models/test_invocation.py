@@ -0,0 +1,29 @@
+import asyncio
+import time
+import pytest
+from ai.models.invocation import ainvoke
+
+class SyncOnlyModel:
+    def invoke(self, prompt):
+        time.sleep(0.1)
+        return f"sync:{prompt}"
+
+class AsyncModel:
+    def invoke(self, prompt):
+        raise AssertionError("sync path should not be used")
+
+    async def ainvoke(self, prompt):
+        await asyncio.sleep(0.1)
+        return f"async:{prompt}"
+
+@pytest.mark.asyncio
+async def test_ainvoke_prefers_native_coroutine():
+    assert await ainvoke(AsyncModel(), "hi") == "async:hi"
+
+@pytest.mark.asyncio
+async def test_ainvoke_runs_sync_models_off_the_event_loop():
+    start = time.perf_counter()
+    results = await asyncio.gather(*(ainvoke(SyncOnlyModel(), str(i)) for i in range(3)))
+    assert results == ["sync:0", "sync:1", "sync:2"]
+    # Three blocking calls overlap in the executor instead of serializing
+    assert time.perf_counter() - start < 0.25
@@ -1,4 +1,5 @@
 import pytest
+from ai.models import clients
 from core.registries.model_registry import AIModelRegistry, ModelConfig
 
 @pytest.fixture
@@ -48,4 +49,103 @@ async def test_find_best_model(model_registry):
         "capabilities": ["text-generation", "code"]
     })
     
-    assert best_model == "model1"  # Should match model with more capabilities
\ No newline at end of file
+    assert best_model == "model1"  # Should match model with more capabilities
+
+def _config(model_id, capabilities, **kwargs):
+    return ModelConfig(
+        model_id=model_id,
+        provider="openai",
+        model_name="gpt-4",
+        version="1.0",
+        capabilities=capabilities,
+        parameters={},
+        **kwargs
+    )
+
+@pytest.mark.asyncio
+async def test_capability_index_follows_reregistration(model_registry):
+    await model_registry.register_model(_config("model1", ["code"]))
+    await model_registry.register_model(_config("model2", ["code"]))
+    assert await model_registry.find_best_model({"capabilities": ["code"]}) == "model1"
+
+    # Re-registering drops stale capabilities but keeps the registration order
+    await model_registry.register_model(_config("model1", ["vision"]))
+    assert await model_registry.find_best_model({"capabilities": ["code"]}) == "model2"
+    assert await model_registry.find_best_model({"capabilities": ["vision"]}) == "model1"
+    assert await model_registry.find_best_model({"capabilities": ["audio"]}) is None
+
+    await model_registry.register_model(_config("model2", ["code"], status="inactive"))
+    assert await model_registry.find_best_model({"capabilities": ["code"]}) is None
+
+@pytest.mark.asyncio
+async def test_load_aware_routing_prefers_fast_healthy_models(model_registry):
+    for model_id in ("slow", "fast", "flaky"):
+        await model_registry.register_model(_config(model_id, ["text-generation"]))
+    await model_registry.register_model(_config("partial", ["code"]))
+
+    model_registry.get_metrics("slow").record(2.0)
+    model_registry.get_metrics("fast").record(0.5)
+    model_registry.get_metrics("flaky").record(0.1)
+    for _ in range(5):
+        model_registry.get_metrics("flaky").record(0.1, error=True)
+
+    requirements = {"capabilities": ["text-generation"]}
+    assert await model_registry.find_best_model(requirements) == "slow"
+    assert await model_registry.find_best_model(requirements, routing="load_aware") == "fast"
+
+    # Queued requests count against a model's expected latency
+    model_registry.get_metrics("fast").in_flight = 4
+    assert await model_registry.find_best_model(requirements, routing="load_aware") == "slow"
+
+    with pytest.raises(ValueError):
+        await model_registry.find_best_model(requirements, routing="random")
+
+@pytest.mark.asyncio
+async def test_invoker_records_model_metrics(model_registry):
+    class EchoModel:
+        async def ainvoke(self, prompt):
+            return prompt
+
+    clients.register_provider("echo", lambda *args, **kwargs: EchoModel())
+    await model_registry.register_model(ModelConfig(
+        model_id="model1",
+        provider="echo",
+        model_name="echo",
+        version="1.0",
+        capabilities=["code"],
+        parameters={}
+    ))
+    invoker = await model_registry.get_invoker("model1")
+    assert await invoker.invoke("hello") == "hello"
+
+    stats = model_registry.get_metrics("model1").snapshot()
+    assert stats["requests"] == 1
+    assert stats["errors"] == 0
+    assert stats["in_flight"] == 0
+    clients.clear_clients()
+
+def test_model_stats_histogram_and_prometheus_export():
+    from core.registries.model_metrics import ModelMetrics, render_prometheus
+
+    metrics = ModelMetrics()
+    stats = metrics.model("metrics-model")
+    with stats.track(prompt_tokens=10) as call:
+        call.completion_tokens = 40
+    stats.record(0.3, completion_tokens=20)
+    with pytest.raises(RuntimeError):
+        with stats.track(prompt_tokens=5):
+            raise RuntimeError("boom")
+
+    snapshot = stats.snapshot()
+    assert snapshot["requests"] == 3
+    assert snapshot["errors"] == 1
+    assert snapshot["prompt_tokens"] == 15
+    assert snapshot["completion_tokens"] == 60
+    assert snapshot["in_flight"] == 0
+    assert snapshot["latency_p99"] == 0.5
+    assert stats.tokens_per_second > 0
+
+    text = render_prometheus()
+    assert 'spark_model_requests_total{model="metrics-model"} 3' in text
+    assert 'spark_model_latency_seconds_bucket{model="metrics-model",le="0.05"} 1' in text
+    assert 'spark_model_latency_seconds_bucket{model="metrics-model",le="+Inf"} 2' in text
@@ -0,0 +1,107 @@
+import asyncio
+import time
+import pytest
+from ai.models import clients
+from ai.models.invocation import ModelInvoker
+from ai.models.rate_limit import RateLimiter, configure_provider_limits, get_provider_limiter
+from core.registries.model_registry import AIModelRegistry, ModelConfig
+
+class EchoModel:
+    async def ainvoke(self, prompt):
+        return prompt
+
+@pytest.mark.asyncio
+async def test_unlimited_limiter_never_waits():
+    limiter = RateLimiter()
+    assert limiter.unlimited
+    assert await limiter.acquire(10_000) == 0.0
+
+@pytest.mark.asyncio
+async def test_request_budget_spaces_out_bursts():
+    # 600/min = one request per 0.1s once the burst capacity is spent
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter._requests.available = 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limiter.acquire() for _ in range(3)))
+    assert time.perf_counter() - start >= 0.18
+
+    stats = limiter.stats()
+    assert stats["admitted"] == 3
+    assert stats["max_wait"] >= 0.18
+    assert stats["waiting"] == 0
+
+@pytest.mark.asyncio
+async def test_token_budget_and_fifo_admission():
+    limiter = RateLimiter(tokens_per_minute=6000)
+    limiter._tokens.available = 0
+    order = []
+
+    async def request(name, tokens):
+        await limiter.acquire(tokens)
+        order.append(name)
+
+    # The large request queued first is admitted first
+    first = asyncio.create_task(request("large", 20))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(request("small", 1))
+    await asyncio.gather(first, second)
+    assert order == ["large", "small"]
+
+@pytest.mark.asyncio
+async def test_invoker_passes_through_limiters():
+    limiter = RateLimiter(requests_per_minute=60)
+    invoker = ModelInvoker(EchoModel(), "echo", rate_limiters=[limiter])
+    assert await invoker.invoke("hi") == "hi"
+    assert limiter.stats()["admitted"] == 1
+
+@pytest.mark.asyncio
+async def test_registry_combines_provider_and_model_limits():
+    clients.register_provider("limited", lambda *args, **kwargs: EchoModel())
+    configure_provider_limits("limited", requests_per_minute=1000)
+    registry = AIModelRegistry()
+    await registry.register_model(ModelConfig(
+        model_id="limited-model",
+        provider="limited",
+        model_name="echo",
+        version="1.0",
+        capabilities=[],
+        parameters={},
+        tokens_per_minute=10_000
+    ))
+
+    invoker = await registry.get_invoker("limited-model")
+    assert invoker.rate_limiters[0] is get_provider_limiter("limited")
+    assert invoker.rate_limiters[1].name == "limited-model"
+    await invoker.invoke("hi")
+    assert registry.rate_limit_stats()["limited-model"]["admitted"] == 1
+    clients.clear_clients()
+
+@pytest.mark.asyncio
+async def test_unregistered_models_share_provider_limit_and_metrics(monkeypatch):
+    from ai.models.gpt import GPTModel
+    from ai.models.invocation import default_metrics
+    from core.phases import base_phase
+    from core.registries import PhaseConfig
+    clients.register_provider("limited-gpt", lambda *args, **kwargs: EchoModel())
+    limiter = configure_provider_limits("limited-gpt", requests_per_minute=1000)
+
+    model = GPTModel({"provider": "limited-gpt", "model_name": "echo-gpt"})
+    assert model.invoker.rate_limiters == [limiter]
+    await model.invoker.invoke("hi")
+    assert limiter.stats()["admitted"] == 1
+    assert default_metrics.model("echo-gpt").requests == 1
+
+    monkeypatch.setattr(base_phase, "DEFAULT_PROVIDER", "limited-gpt")
+    registry = AIModelRegistry()
+    phase = base_phase.ContentGenerationPhase(PhaseConfig(
+        phase_number=1,
+        phase_name="content_generation",
+        description="Generation",
+        required_capabilities=["text_generation"],
+        prompt_template=""
+    ), registry)
+    invoker = await phase.get_invoker()
+    assert invoker.rate_limiters == [limiter]
+    assert invoker.metrics is registry.metrics.model(base_phase.DEFAULT_MODEL_NAME)
+    clients.clear_clients()
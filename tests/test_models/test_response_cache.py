@@ -0,0 +1,113 @@
+import pytest
+from ai.models import clients
+from ai.models.cache import ResponseCache, cache_key
+from ai.models.invocation import ModelInvoker
+from core.registries.model_registry import AIModelRegistry, ModelConfig
+
+class CountingModel:
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        return f"answer to {prompt}"
+
+def test_cache_key_is_content_addressed():
+    key = cache_key("gpt", {"temperature": 0, "max_tokens": 5}, "hello")
+    assert key == cache_key("gpt", {"max_tokens": 5, "temperature": 0}, "hello")
+    assert key != cache_key("gpt", {"temperature": 0.7, "max_tokens": 5}, "hello")
+    assert key != cache_key("other", {"temperature": 0, "max_tokens": 5}, "hello")
+    assert key != cache_key("gpt", {"temperature": 0, "max_tokens": 5}, "hello", {"provider": "openai", "base_url": None})
+
+@pytest.mark.asyncio
+async def test_memory_tier_lru_and_ttl(monkeypatch):
+    cache = ResponseCache(max_entries=2, ttl=10)
+    await cache.set("a", "1")
+    await cache.set("b", "2")
+    assert await cache.get("a") == "1"
+    await cache.set("c", "3")
+
+    # "b" was least recently used
+    assert await cache.get("b") is None
+    assert await cache.get("c") == "3"
+
+    now = __import__("time").time()
+    monkeypatch.setattr("ai.models.cache.time.time", lambda: now + 60)
+    assert await cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+
+@pytest.mark.asyncio
+async def test_disk_tier_persists_and_respects_size(tmp_path):
+    path = str(tmp_path / "responses.db")
+    cache = ResponseCache(path=path, disk_max_bytes=10)
+    await cache.set("a", "12345")
+    await cache.set("b", "67890")
+    await cache.set("c", "abcde")
+    cache.close()
+
+    reopened = ResponseCache(path=path, disk_max_bytes=10)
+    assert await reopened.get("a") is None
+    assert await reopened.get("c") == "abcde"
+    assert reopened.stats()["disk_hits"] == 1
+    # Promoted into memory on the disk hit
+    assert await reopened.get("c") == "abcde"
+    assert reopened.stats()["memory_hits"] == 1
+    reopened.close()
+
+@pytest.mark.asyncio
+async def test_invoker_uses_cache():
+    model = CountingModel()
+    invoker = ModelInvoker(model, "counting", {"temperature": 0}, cache=ResponseCache())
+    assert await invoker.invoke("x") == "answer to x"
+    assert await invoker.invoke("x") == "answer to x"
+    assert model.calls == 1
+
+@pytest.mark.asyncio
+async def test_caching_is_opt_in_per_model_and_override():
+    clients.register_provider("counting", CountingModel)
+    registry = AIModelRegistry()
+    await registry.register_model(ModelConfig(
+        model_id="counting",
+        provider="counting",
+        model_name="counting",
+        version="1.0",
+        capabilities=[],
+        parameters={"temperature": 0}
+    ))
+
+    assert (await registry.get_invoker("counting")).cache is None
+    assert (await registry.get_invoker("counting", cache_responses=True)).cache is registry.response_cache
+    clients.clear_clients()
+
+@pytest.mark.asyncio
+async def test_same_model_name_on_other_endpoints_does_not_share_entries():
+    clients.register_provider("counting", CountingModel)
+    clients.register_provider("counting-mirror", CountingModel)
+    registry = AIModelRegistry()
+    for model_id, provider, base_url in (
+        ("primary", "counting", None),
+        ("mirror", "counting-mirror", None),
+        ("local", "counting", "http://localhost:8000/v1")
+    ):
+        await registry.register_model(ModelConfig(
+            model_id=model_id,
+            provider=provider,
+            model_name="counting",
+            version="1.0",
+            capabilities=[],
+            parameters={"temperature": 0},
+            base_url=base_url,
+            cache_responses=True
+        ))
+
+    invokers = [await registry.get_invoker(model_id) for model_id in ("primary", "mirror", "local")]
+    for invoker in invokers:
+        await invoker.invoke("x")
+    assert [invoker.model.calls for invoker in invokers] == [1, 1, 1]
+    await invokers[0].invoke("x")
+    assert invokers[0].model.calls == 1
+    clients.clear_clients()
@@ -0,0 +1,162 @@
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from ai.models.invocation import ModelInvoker
+from ai.models.retry import RetryPolicy, LatencyTracker, call_with_retry, is_retryable
+
+FAST = dict(base_delay=0.001, max_delay=0.002)
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+class RateLimitError(Exception):
+    pass
+
+def test_error_classification():
+    assert is_retryable(asyncio.TimeoutError())
+    assert is_retryable(StatusError(429))
+    assert is_retryable(StatusError(503))
+    assert is_retryable(RateLimitError())
+    assert not is_retryable(StatusError(400))
+    assert not is_retryable(ValueError("bad prompt"))
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried():
+    failures = [StatusError(429), StatusError(500)]
+
+    async def call():
+        if failures:
+            raise failures.pop(0)
+        return "ok"
+
+    assert await call_with_retry(call, RetryPolicy(**FAST)) == "ok"
+
+@pytest.mark.asyncio
+async def test_permanent_errors_and_exhaustion_raise():
+    attempts = []
+
+    async def bad_request():
+        attempts.append(1)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        await call_with_retry(bad_request, RetryPolicy(**FAST))
+    assert len(attempts) == 1
+
+    async def always_503():
+        attempts.append(1)
+        raise StatusError(503)
+
+    with pytest.raises(StatusError):
+        await call_with_retry(always_503, RetryPolicy(max_attempts=3, **FAST))
+    assert len(attempts) == 4
+
+@pytest.mark.asyncio
+async def test_attempt_timeout_and_deadline():
+    calls = []
+
+    async def hang():
+        calls.append(1)
+        await asyncio.sleep(10)
+
+    start = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        await call_with_retry(hang, RetryPolicy(attempt_timeout=0.05, deadline=0.12, max_attempts=10, **FAST))
+    assert time.perf_counter() - start < 0.3
+    assert 2 <= len(calls) <= 3
+
+@pytest.mark.asyncio
+async def test_hedged_request_cuts_tail_latency():
+    delays = [1.0, 0.01]
+    started = []
+
+    async def call():
+        delay = delays[len(started)]
+        started.append(delay)
+        await asyncio.sleep(delay)
+        return delay
+
+    start = time.perf_counter()
+    result = await call_with_retry(call, RetryPolicy(hedge=True, hedge_delay=0.05))
+    assert result == 0.01
+    assert time.perf_counter() - start < 0.2
+    assert started == [1.0, 0.01]
+
+@pytest.mark.asyncio
+async def test_hedge_delay_follows_latency_quantile():
+    latency = LatencyTracker()
+    for _ in range(20):
+        latency.record(0.02)
+    started = []
+
+    async def call():
+        started.append(1)
+        await asyncio.sleep(0.2 if len(started) == 1 else 0.0)
+        return len(started)
+
+    policy = RetryPolicy(hedge=True, hedge_min_samples=20)
+    assert await call_with_retry(call, policy, latency=latency) == 2
+
+@pytest.mark.asyncio
+async def test_hedged_attempt_raises_when_every_request_fails():
+    started = []
+
+    async def call():
+        started.append(1)
+        await asyncio.sleep(0.05 if len(started) == 1 else 0.0)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        await call_with_retry(call, RetryPolicy(hedge=True, hedge_delay=0.01, **FAST))
+    assert len(started) == 2
+
+@pytest.mark.asyncio
+async def test_slow_admission_counts_against_deadline_only():
+    admitted, calls = [], []
+
+    async def slow_limiter():
+        await asyncio.sleep(0.1)
+        admitted.append(1)
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "ok"
+
+    policy = RetryPolicy(attempt_timeout=0.05, deadline=0.3, hedge=True, hedge_delay=0.03, **FAST)
+    assert await call_with_retry(call, policy, before_attempt=slow_limiter) == "ok"
+    assert admitted == [1] and calls == [1]
+
+@pytest.mark.asyncio
+async def test_saturated_limiter_does_not_outlast_deadline():
+    calls = []
+
+    async def saturated():
+        await asyncio.sleep(10)
+
+    async def call():
+        calls.append(1)
+        return "ok"
+
+    start = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        await call_with_retry(call, RetryPolicy(deadline=0.05, **FAST), before_attempt=saturated)
+    assert time.monotonic() - start < 1 and calls == []
+
+@pytest.mark.asyncio
+async def test_invoker_retries_model_calls():
+    class FlakyModel:
+        calls = 0
+
+        async def ainvoke(self, prompt):
+            FlakyModel.calls += 1
+            if FlakyModel.calls == 1:
+                raise asyncio.TimeoutError()
+            return SimpleNamespace(content="recovered")
+
+    invoker = ModelInvoker(FlakyModel(), "flaky", retry_policy=RetryPolicy(**FAST))
+    assert await invoker.invoke("hi") == "recovered"
+    assert FlakyModel.calls == 2
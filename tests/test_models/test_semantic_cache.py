@@ -0,0 +1,118 @@
+import time
+from types import SimpleNamespace
+import pytest
+from ai.models.clients import register_provider
+from ai.models.semantic_cache import SemanticCache
+from core.phases.base_phase import InputAnalysisPhase, ContentGenerationPhase
+from core.registries import AIModelRegistry, ModelConfig, PhaseConfig
+
+def test_near_duplicate_prompts_hit():
+    cache = SemanticCache(threshold=0.9)
+    cache.set("model", "Summarize the quarterly sales report for the board", "summary")
+
+    assert cache.get("model", "summarize   the QUARTERLY sales report, for the board!") == "summary"
+    assert cache.get("model", "Translate the employee handbook into French") is None
+    # Responses never cross namespaces
+    assert cache.get("other-model", "Summarize the quarterly sales report for the board") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+    assert stats["entries"] == 1 and stats["mean_lookup_us"] > 0
+
+def test_batched_lookup_eviction_and_expiry():
+    cache = SemanticCache(threshold=0.9, max_entries=2)
+    cache.set("m", "first prompt text", "1")
+    cache.set("m", "second prompt text", "2")
+    assert cache.get_many("m", ["first prompt text", "second prompt text", "third prompt text"]) == ["1", "2", None]
+
+    cache.set("m", "third prompt text", "3")
+    assert len(cache) == 2 and cache.stats()["evictions"] == 1
+    # The least recently used entry was evicted
+    assert cache.get_many("m", ["first prompt text", "third prompt text"]) == [None, "3"]
+
+    expiring = SemanticCache(ttl=0.01)
+    expiring.set("m", "short lived", "value")
+    time.sleep(0.02)
+    assert expiring.get("m", "short lived") is None
+    assert len(expiring) == 0
+
+class CountingChatModel:
+    calls = []
+
+    async def ainvoke(self, prompt):
+        CountingChatModel.calls.append(prompt)
+        return SimpleNamespace(content=f"response {len(CountingChatModel.calls)}")
+
+register_provider("counting-fake", lambda *args, **kwargs: CountingChatModel())
+
+async def counting_registry():
+    CountingChatModel.calls = []
+    registry = AIModelRegistry()
+    await registry.register_model(ModelConfig(
+        model_id="counting",
+        provider="counting-fake",
+        model_name="counting",
+        version="1.0",
+        capabilities=["text_generation"],
+        parameters={},
+        coalesce_requests=False
+    ))
+    return registry
+
+def phase_config(name, semantic_cache=None):
+    return PhaseConfig(
+        phase_number=1,
+        phase_name=name,
+        description=name,
+        required_capabilities=["text_generation"],
+        prompt_template="",
+        model_id="counting",
+        semantic_cache=semantic_cache
+    )
+
+@pytest.mark.asyncio
+async def test_analysis_phase_reuses_near_duplicate_responses():
+    registry = await counting_registry()
+    phase = InputAnalysisPhase(phase_config("input_analysis"), model_registry=registry)
+
+    first = await phase.execute({"description": "Explain caching layers", "input_data": {"topic": "Caching"}})
+    second = await phase.execute({"description": "explain  caching layers.", "input_data": {"topic": "caching"}})
+    other = await phase.execute({"description": "Explain caching layers", "input_data": {"topic": "Databases"}})
+
+    assert len(CountingChatModel.calls) == 2
+    assert first["analysis"] == second["analysis"] != other["analysis"]
+    assert registry.semantic_cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_changed_tone_or_length_misses_the_cache():
+    registry = await counting_registry()
+    phase = InputAnalysisPhase(phase_config("input_analysis"), model_registry=registry)
+    description = "Write a detailed guide to caching layers in web services, " * 5
+
+    def spec(**input_data):
+        return {"description": description, "input_data": {"topic": "caching", **input_data}}
+
+    await phase.execute(spec(tone="professional", length="long"))
+    await phase.execute(spec(tone="casual", length="long"))
+    await phase.execute(spec(tone="professional", length="short"))
+    assert len(CountingChatModel.calls) == 3
+
+    await phase.execute(spec(tone="Professional ", length="long"))
+    assert len(CountingChatModel.calls) == 3
+
+@pytest.mark.asyncio
+async def test_generation_phase_semantic_cache_is_opt_in():
+    registry = await counting_registry()
+    spec = {"input_data": {"topic": "caching"}, "analysis": "Caches trade memory for latency"}
+
+    phase = ContentGenerationPhase(phase_config("content_generation"), model_registry=registry)
+    await phase.execute(spec)
+    await phase.execute(spec)
+    assert len(CountingChatModel.calls) == 2
+
+    enabled = ContentGenerationPhase(phase_config("content_generation", semantic_cache=True), model_registry=registry)
+    await enabled.execute(spec)
+    events = [event async for event in enabled.execute_stream(spec)]
+    assert len(CountingChatModel.calls) == 3
+    assert events[-1]["result"]["generated_content"] == "response 3"
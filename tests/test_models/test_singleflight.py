@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from ai.models import clients
+from ai.models.singleflight import SingleFlight
+from core.registries.model_registry import AIModelRegistry, ModelConfig
+
+@pytest.mark.asyncio
+async def test_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    results = await asyncio.gather(*(flight.do("key", call) for _ in range(5)), flight.do("other", call))
+    assert results == ["result"] * 6
+    assert len(calls) == 2
+    assert flight.stats()["followers"] == 4
+    assert flight.in_flight == 0
+
+    # Finished calls are not reused
+    await flight.do("key", call)
+    assert len(calls) == 3
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_cancelled_followers_do_not_cancel_the_call():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def failing():
+        await release.wait()
+        raise ValueError("boom")
+
+    leader = asyncio.create_task(flight.do("key", failing))
+    follower = asyncio.create_task(flight.do("key", failing))
+    quitter = asyncio.create_task(flight.do("key", failing))
+    await asyncio.sleep(0)
+    quitter.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    for task in (leader, follower):
+        with pytest.raises(ValueError):
+            await task
+    assert quitter.cancelled()
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_when_every_caller_leaves():
+    flight = SingleFlight()
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def slow():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    task = asyncio.create_task(flight.do("key", slow))
+    await started.wait()
+    task.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flight.in_flight == 0
+
+@pytest.mark.asyncio
+async def test_registry_invokers_coalesce_identical_prompts():
+    calls = []
+
+    class SlowEcho:
+        async def ainvoke(self, prompt):
+            calls.append(prompt)
+            await asyncio.sleep(0.05)
+            return prompt
+
+    clients.register_provider("coalesce", lambda *args, **kwargs: SlowEcho())
+    registry = AIModelRegistry()
+    for model_id, coalesce in (("shared", True), ("separate", False)):
+        await registry.register_model(ModelConfig(
+            model_id=model_id,
+            provider="coalesce",
+            model_name=model_id,
+            version="1.0",
+            capabilities=["text-generation"],
+            parameters={},
+            coalesce_requests=coalesce
+        ))
+
+    shared = [await registry.get_invoker("shared") for _ in range(3)]
+    assert await asyncio.gather(*(i.invoke("topic") for i in shared)) == ["topic"] * 3
+    assert len(calls) == 1
+    assert registry.coalescing_stats()["followers"] == 2
+
+    separate = [await registry.get_invoker("separate") for _ in range(3)]
+    await asyncio.gather(*(i.invoke("topic") for i in separate))
+    assert len(calls) == 4
+    clients.clear_clients()
@@ -0,0 +1,21 @@
+import pytest
+from benchmarks.bench_engine import run_benchmark, build_engine
+
+@pytest.mark.asyncio
+async def test_engine_benchmark_runs_offline():
+    rows = await run_benchmark(["chain", "fanout"], [1, 4], projects=4, phases=3, model={"latency": 0.001})
+    assert [(row["shape"], row["concurrency"]) for row in rows] == [
+        ("chain", 1), ("chain", 4), ("fanout", 1), ("fanout", 4)
+    ]
+    assert all(row["failures"] == 0 and row["projects_per_sec"] > 0 for row in rows)
+    assert all(row["p99_ms"] >= row["p50_ms"] for row in rows)
+
+@pytest.mark.asyncio
+async def test_llm_phases_stream_from_fake_provider():
+    engine = await build_engine("fanout", 3, {"latency": 0.0, "response_tokens": 5, "seed": 3}, 1)
+    events = [event async for event in engine.execute_project_stream({"workflow_type": "bench_fanout", "topic": "x"})]
+
+    assert sum(1 for event in events if event["event"] == "token") == 15
+    result = events[-1]["result"]
+    assert set(result["results"]) == {"bench_0", "bench_1", "bench_2"}
+    assert len(result["results"]["bench_2"]["response"].split()) == 5
@@ -0,0 +1,52 @@
+import asyncio
+import time
+import pytest
+from ai.job_queue import JobQueue, JobStatus, QueueFull
+
+async def wait_finished(job):
+    async for _ in job.follow():
+        pass
+    assert job.finished
+
+@pytest.mark.asyncio
+async def test_jobs_run_in_background_on_bounded_workers(make_sleep_engine):
+    queue = JobQueue(await make_sleep_engine(), workers=2)
+    start = time.perf_counter()
+    jobs = [await queue.submit({"name": f"p{i}", "delay": 0.05}) for i in range(4)]
+    # Submission returns before any project has run
+    assert time.perf_counter() - start < 0.05
+    assert all(job.status == JobStatus.QUEUED for job in jobs)
+
+    await asyncio.gather(*(wait_finished(job) for job in jobs))
+    assert time.perf_counter() - start >= 0.1
+    assert [job.result["results"]["sleep-phase"]["name"] for job in jobs] == ["p0", "p1", "p2", "p3"]
+    assert queue.stats()["completed"] == 4
+    await queue.stop()
+
+@pytest.mark.asyncio
+async def test_followers_replay_progress_and_see_failures(make_sleep_engine):
+    queue = JobQueue(await make_sleep_engine(), workers=1)
+    job = await queue.submit({"name": "bad", "delay": 0.01, "fail": True})
+
+    live = [event["event"] async for event in job.follow()]
+    replayed = [event["event"] async for event in job.follow()]
+    assert live == replayed == ["phase_started", "phase_failed", "project_failed"]
+    assert job.status == JobStatus.FAILED
+    assert "boom" in job.error
+    assert job.snapshot()["timeline"]["phases"]["sleep-phase"]["status"] == "failed"
+    await queue.stop()
+
+@pytest.mark.asyncio
+async def test_cancel_and_queue_capacity(make_sleep_engine):
+    queue = JobQueue(await make_sleep_engine(), workers=1, max_pending=1)
+    running = await queue.submit({"name": "running", "delay": 10})
+    await asyncio.sleep(0.01)
+    queued = await queue.submit({"name": "queued", "delay": 0.01})
+    with pytest.raises(QueueFull):
+        await queue.submit({"name": "rejected"})
+
+    await queue.cancel(queued.id)
+    await queue.cancel(running.id)
+    assert running.status == queued.status == JobStatus.CANCELLED
+    assert queue.stats()["rejected"] == 1
+    await queue.stop()
@@ -1,6 +1,12 @@
+import asyncio
+import time
+from types import SimpleNamespace
 import pytest
-from ai.workflow_engine import DetailedAIWorkflowEngine
-from core.registries import WorkflowRegistry, WorkflowType, PhaseConfig
+from ai.workflow_engine import DetailedAIWorkflowEngine, ProjectExecutionError
+from core.checkpoint import FileCheckpointStore
+from core.timeline.tracker import ProjectTimeline, PhaseStatus
+from ai.models.clients import register_provider
+from core.registries import WorkflowRegistry, WorkflowType, PhaseConfig, PhaseRegistry, BasePhase, ModelConfig
 
 @pytest.fixture
 async def workflow_engine():
@@ -39,4 +45,290 @@ async def test_execute_project(workflow_engine):
         assert "results" in result
         assert "timeline" in result
     except Exception as e:
-        pytest.fail(f"Project execution failed: {str(e)}")
\ No newline at end of file
+        pytest.fail(f"Project execution failed: {str(e)}")
+
+@pytest.mark.asyncio
+async def test_execute_projects_runs_concurrently_in_order(make_sleep_engine):
+    engine = await make_sleep_engine()
+    specs = [{"name": f"p{i}", "delay": 0.1 - i * 0.01} for i in range(5)]
+
+    start = time.perf_counter()
+    results = await engine.execute_projects(specs, max_concurrency=5)
+    elapsed = time.perf_counter() - start
+
+    assert [r["results"]["sleep-phase"]["name"] for r in results] == [s["name"] for s in specs]
+    assert elapsed < 0.3
+    # Each project keeps its own timeline
+    assert results[0]["timeline"] is not results[1]["timeline"]
+
+@pytest.mark.asyncio
+async def test_execute_projects_respects_max_concurrency(make_sleep_engine):
+    engine = await make_sleep_engine()
+    specs = [{"name": f"p{i}", "delay": 0.05} for i in range(4)]
+
+    start = time.perf_counter()
+    await engine.execute_projects(specs, max_concurrency=2)
+    assert time.perf_counter() - start >= 0.1
+
+@pytest.mark.asyncio
+async def test_execute_projects_rejects_non_positive_max_concurrency(make_sleep_engine):
+    engine = await make_sleep_engine()
+    for limit in (0, -1):
+        with pytest.raises(ValueError):
+            await engine.execute_projects([{"name": "p"}], max_concurrency=limit)
+    with pytest.raises(ValueError):
+        DetailedAIWorkflowEngine(max_concurrency=0)
+
+@pytest.mark.asyncio
+async def test_execute_projects_as_completed_and_exceptions(make_sleep_engine):
+    engine = await make_sleep_engine()
+    specs = [
+        {"name": "slow", "delay": 0.1},
+        {"name": "fast", "delay": 0.01},
+        {"name": "bad", "delay": 0.02, "fail": True}
+    ]
+
+    order = [index async for index, _ in engine.execute_projects_as_completed(specs, return_exceptions=True)]
+    assert order == [1, 2, 0]
+
+    results = await engine.execute_projects(specs, return_exceptions=True)
+    assert isinstance(results[2], Exception)
+
+    with pytest.raises(Exception):
+        await engine.execute_projects(specs)
+
+
+class RecordingPhase(BasePhase):
+    async def execute(self, input_data):
+        await asyncio.sleep(0.05)
+        return {
+            "phase": self.config.phase_name,
+            "saw": sorted(input_data.get("phase_results", {}))
+        }
+
+for _name in ("analysis-a", "analysis-b", "analysis-c", "generation"):
+    PhaseRegistry.register(_name, RecordingPhase)
+
+def dag_phase(number, name, depends_on=None):
+    return PhaseConfig(
+        phase_number=number,
+        phase_name=name,
+        description=name,
+        required_capabilities=[],
+        prompt_template="",
+        depends_on=depends_on
+    )
+
+@pytest.mark.asyncio
+async def test_fan_out_phases_run_concurrently():
+    engine = DetailedAIWorkflowEngine()
+    await engine.workflow_registry.register_workflow(WorkflowType(
+        type_code="fan-out",
+        name="Fan out",
+        description="Independent analyses feeding one generation step",
+        phases=[
+            dag_phase(1, "analysis-a", []),
+            dag_phase(2, "analysis-b", []),
+            dag_phase(3, "analysis-c", []),
+            dag_phase(4, "generation", ["analysis-a", "analysis-b", "analysis-c"])
+        ]
+    ))
+
+    start = time.perf_counter()
+    result = await engine.execute_project({"workflow_type": "fan-out"})
+    elapsed = time.perf_counter() - start
+
+    # Critical path is two phases long, not four
+    assert elapsed < 0.15
+    assert result["results"]["generation"]["saw"] == ["analysis-a", "analysis-b", "analysis-c"]
+    assert list(result["results"]) == ["analysis-a", "analysis-b", "analysis-c", "generation"]
+
+def test_default_dependencies_are_sequential():
+    workflow = WorkflowType(
+        type_code="legacy",
+        name="Legacy",
+        description="Legacy",
+        phases=[dag_phase(2, "generation"), dag_phase(1, "analysis-a")]
+    )
+    assert workflow.phase_dependencies() == {"analysis-a": [], "generation": ["analysis-a"]}
+    assert workflow.topological_order() == ["analysis-a", "generation"]
+
+@pytest.mark.asyncio
+async def test_invalid_dependency_graphs_are_rejected():
+    registry = WorkflowRegistry()
+    cyclic = WorkflowType(
+        type_code="cyclic",
+        name="Cyclic",
+        description="Cyclic",
+        phases=[dag_phase(1, "analysis-a", ["generation"]), dag_phase(2, "generation", ["analysis-a"])]
+    )
+    unknown = WorkflowType(
+        type_code="unknown",
+        name="Unknown",
+        description="Unknown",
+        phases=[dag_phase(1, "analysis-a", ["missing"])]
+    )
+
+    for workflow in (cyclic, unknown):
+        with pytest.raises(ValueError):
+            await registry.register_workflow(workflow)
+
+
+class SlowFakeChatModel:
+    def invoke(self, prompt):
+        # Blocking call, as the real provider client would be
+        time.sleep(0.2)
+        return SimpleNamespace(content="fake response")
+
+register_provider("slow-fake", lambda *args, **kwargs: SlowFakeChatModel())
+
+@pytest.mark.asyncio
+async def test_llm_phases_do_not_block_concurrent_workflows():
+    engine = DetailedAIWorkflowEngine()
+    await engine.model_registry.register_model(ModelConfig(
+        model_id="slow-fake",
+        provider="slow-fake",
+        model_name="slow",
+        version="1.0",
+        capabilities=["text_generation"],
+        parameters={}
+    ))
+    await engine.workflow_registry.register_workflow(WorkflowType(
+        type_code="llm-workflow",
+        name="LLM Workflow",
+        description="Analysis followed by generation",
+        phases=[dag_phase(1, "input_analysis"), dag_phase(2, "content_generation")]
+    ))
+    for phase in (await engine.workflow_registry.get_workflow("llm-workflow")).phases:
+        phase.model_id = "slow-fake"
+
+    specs = [{"workflow_type": "llm-workflow", "input_data": {"topic": f"t{i}"}} for i in range(2)]
+    start = time.perf_counter()
+    results = await engine.execute_projects(specs)
+    elapsed = time.perf_counter() - start
+
+    assert all(r["results"]["content_generation"]["generated_content"] == "fake response" for r in results)
+    # Two workflows of two 0.2s phases each overlap instead of taking 0.8s
+    assert elapsed < 0.6
+
+
+class StreamingFakeChatModel:
+    async def astream(self, prompt):
+        for token in ["one ", "two ", "three"]:
+            await asyncio.sleep(0.01)
+            yield SimpleNamespace(content=token)
+
+register_provider("streaming-fake", lambda *args, **kwargs: StreamingFakeChatModel())
+
+@pytest.mark.asyncio
+async def test_execute_project_stream_pipes_tokens():
+    engine = DetailedAIWorkflowEngine()
+    await engine.model_registry.register_model(ModelConfig(
+        model_id="streaming-fake",
+        provider="streaming-fake",
+        model_name="streaming",
+        version="1.0",
+        capabilities=["text_generation"],
+        parameters={}
+    ))
+    phases = [dag_phase(1, "input_analysis"), dag_phase(2, "content_generation")]
+    for phase in phases:
+        phase.required_capabilities = ["text_generation"]
+    await engine.workflow_registry.register_workflow(WorkflowType(
+        type_code="streaming-workflow",
+        name="Streaming Workflow",
+        description="Streams",
+        phases=phases
+    ))
+
+    events = [e async for e in engine.execute_project_stream({"workflow_type": "streaming-workflow"})]
+    kinds = [e["event"] for e in events]
+
+    assert kinds[0] == "phase_started"
+    assert kinds.count("token") == 6
+    assert kinds[-1] == "project_completed"
+    # Tokens arrive before their phase completes
+    assert kinds.index("token") < kinds.index("phase_completed")
+
+    result = events[-1]["result"]
+    assert result["results"]["input_analysis"]["analysis"] == "one two three"
+    assert result["results"]["content_generation"]["generated_content"] == "one two three"
+
+
+class CountingPhase(BasePhase):
+    calls = {}
+    failing = set()
+
+    async def execute(self, input_data):
+        name = self.config.phase_name
+        CountingPhase.calls[name] = CountingPhase.calls.get(name, 0) + 1
+        if name in CountingPhase.failing:
+            raise RuntimeError(f"{name} failed")
+        return {"phase": name}
+
+for _name in ("resume-a", "resume-b", "resume-c"):
+    PhaseRegistry.register(_name, CountingPhase)
+
+@pytest.mark.asyncio
+async def test_resume_skips_checkpointed_phases(tmp_path):
+    CountingPhase.calls = {}
+    CountingPhase.failing = {"resume-c"}
+    engine = DetailedAIWorkflowEngine(checkpoint_store=FileCheckpointStore(str(tmp_path)))
+    await engine.workflow_registry.register_workflow(WorkflowType(
+        type_code="resumable",
+        name="Resumable",
+        description="Three sequential phases",
+        phases=[dag_phase(1, "resume-a"), dag_phase(2, "resume-b"), dag_phase(3, "resume-c")]
+    ))
+    spec = {"workflow_type": "resumable", "topic": "x"}
+
+    with pytest.raises(ProjectExecutionError) as failure:
+        await engine.execute_project(spec)
+    run_id = failure.value.run_id
+
+    CountingPhase.failing = set()
+    result = await engine.execute_project(spec, resume_run_id=run_id)
+
+    assert result["run_id"] == run_id
+    assert CountingPhase.calls == {"resume-a": 1, "resume-b": 1, "resume-c": 2}
+    assert result["timeline"]["resume-a"]["resumed"] is True
+    assert result["results"]["resume-c"] == {"phase": "resume-c"}
+
+    # A changed spec invalidates every checkpoint
+    await engine.execute_project({**spec, "topic": "y"}, resume_run_id=run_id)
+    assert CountingPhase.calls == {"resume-a": 2, "resume-b": 2, "resume-c": 3}
+
+
+class BrokenChatModel:
+    async def ainvoke(self, prompt):
+        raise ValueError("invalid request")
+
+register_provider("broken-fake", lambda *args, **kwargs: BrokenChatModel())
+
+@pytest.mark.asyncio
+async def test_failed_model_call_fails_the_phase():
+    engine = DetailedAIWorkflowEngine()
+    await engine.model_registry.register_model(ModelConfig(
+        model_id="broken-fake",
+        provider="broken-fake",
+        model_name="broken",
+        version="1.0",
+        capabilities=[],
+        parameters={}
+    ))
+    phases = [dag_phase(1, "input_analysis"), dag_phase(2, "content_generation")]
+    for phase in phases:
+        phase.model_id = "broken-fake"
+    await engine.workflow_registry.register_workflow(WorkflowType(
+        type_code="broken-workflow",
+        name="Broken Workflow",
+        description="Fails",
+        phases=phases
+    ))
+
+    timeline = ProjectTimeline()
+    with pytest.raises(ProjectExecutionError, match="Analysis failed: invalid request"):
+        await engine.execute_project({"workflow_type": "broken-workflow"}, timeline=timeline)
+    assert timeline.phases["input_analysis"]["status"] == PhaseStatus.FAILED
+    # The downstream phase never ran on an error payload
+    assert "content_generation" not in timeline.phases